@@ -21,25 +21,121 @@
     >>> solver = set_solver(method="lax_friedrichs", backend="numpy")
     >>> solver(n0, x, t, f, g)
 
+    n0 may be (N,) or a (batch, N) ensemble on the same grid x,
+    advanced together with f and g evaluated on the whole batch
+
+    x may be a raw (N,) array or a Grid from set_grid(x) that
+    caches its spacings (and uses scalar 1/Δx on uniform grids)
+    to reuse across runs
+
     available `method`s:
     pde:
         - "lax_friedrichs" (default)
         - "lax_wendroff"
-        - "method_of_characteristics" (experimental)
+        - "flux_limited" (second-order TVD finite volume with limiter=
+          "minmod", "van_leer" (default), or "superbee"; stability ≤ 1)
+        - "finite_volume" (first-order upwind; conserves sum(n Δx) on
+          any grid, with Δx the Grid widths)
+        - "moving_grid" (faces move with f and n is remapped onto cells
+          gathered where n is every remesh= steps; solver(...) returns
+          (tims, sols, grids) with the faces of each snapshot; no stream)
+        - "strang_splitting" (2-D, on the grid of x and y; solver(t, n0,
+          (x, y), f, g, stability, scheme="lax_friedrichs") with f(n, x, y)
+          returning (f_x, f_y) and the 1-D scheme split along each axis)
+        - "split_step" (explicit scheme= for f and an implicit or, for
+          g = k n + s declared with set_term(g, "linear"), an exact
+          sink="exponential" step for stiff g, so that Δt is only
+          limited by f)
+        - "crank_nicolson" (implicit θ-method, theta=0.5 or 1.0 for
+          backward Euler, with O(N) pivoting banded solves and upwind ends;
+          stability may be far above 1, and steady=True reuses the
+          factorization across steps)
+        - "method_of_characteristics" (semi-Lagrangian, kind="linear" or
+          "pchip"; stability may be far above 1, and steady=True reuses
+          the characteristics across steps)
+        - "linear_operator" (for f of x only and g = k n + s, else a
+          ValueError: the step of scheme= is assembled once as a banded
+          map, and jump=True takes the m steps between saved times at
+          once, as the map to the power m by repeated squaring where
+          that is cheaper (small x, large m); lax_wendroff drops its
+          Δg/Δt term here)
     ode:
         - "runge_kutta_2"
+        - "runge_kutta_45" (adaptive Dormand-Prince; solver(t, n0, x, f,
+          rtol, atol) saves n exactly at every t)
+
+    streaming:
+    >>> stream = set_solver(method="lax_friedrichs", stream=True)
+    >>> for t_, n_ in stream(t, n0, x, f, g, stability): ...
+
+    yields (t, n) at each requested t instead of stacking them,
+    optionally calling callback(t, n) at each (see stream.py)
+
+    storing:
+    >>> solver = set_solver(method="lax_friedrichs", store="run.npy")
+    >>> solver(t, n0, x, f, g, stability, resume=False)
+
+    writes n at each requested t to a .npy memmap with a .json
+    sidecar, and restarts from the last row with resume=True
+    (see store.py)
 
     available `backend`s:
         - "numpy" (default)
         - "numba" (numpy + numba; experimental)
 
+    parallel=True with numba swaps in loop-based stencil kernels
+    split across NUMBA_NUM_THREADS threads (for large grids)
+
+    early termination:
+    >>> solver(t, n0, x, f, g, stability, halt=1e-6, event=event)
+
+    stops once the relative rate of change of n falls to halt
+    (checked every check=10 steps) or event(t, n) changes sign,
+    with the state and time it stopped at as the last snapshot;
+    for all but moving_grid, strang_splitting and linear_operator
+
+    diagnostics:
+    >>> solver = set_solver(method="lax_friedrichs", diagnostics=True)
+    >>> tims, sols, diags = solver(t, n0, x, f, g, stability)
+
+    diags holds ∫n dx, ∫x n dx, min n, max n and the count of
+    n < 0 at every step, reduced within the loop so that few
+    snapshots need to be saved (see Diagnostics); for the
+    methods with early termination
+
+    declared terms:
+    >>> from hypersolver import set_term
+    >>> solver(t, n0, x, set_term(f, "space"), set_term(g, "linear"), stability)
+
+    f and g of x only ("space"), of neither n nor x ("constant"),
+    or affine in n ("linear") are evaluated once per grid x and
+    kept in an LRU cache keyed on x across runs, instead of being
+    called at every step (see Term)
+
+    instrumentation:
+    >>> solver = set_solver(method="lax_friedrichs", stats=True)
+    >>> tims, sols, stats = solver(t, n0, x, f, g, stability)
+
+    stats counts the steps, saves and f/g calls, and splits the
+    time between f/g, the scheme steps and the rest (see Stats)
+
+    benchmarks:
+    $ python -m hypersolver.benchmark --backends numpy numba --output bench.json
+
+    times the loops and kernels across grid sizes and backends,
+    and compares against a stored --baseline (see benchmark.py)
+
 """
 
 import os
+from time import perf_counter
+from collections import OrderedDict
 
-from hypersolver.lax_friedrichs import lx_loop
-from hypersolver.lax_wendroff import lw_loop
-from hypersolver.runge_kutta import rk_loop
+from hypersolver.util import Grid, Stats, set_grid  # noqa: F401
+from hypersolver.util import Term, set_term  # noqa: F401
+from hypersolver.util import cache_util, compile_util, key_util, terms_util
+from hypersolver.util import counters_util, set_stats, load_util
+from hypersolver.util import Diagnostics, set_diagnostics  # noqa: F401
 from hypersolver.util import jxt, xnp
 
 __version__ = "0.0.9"
@@ -47,34 +143,171 @@ __version__ = "0.0.9"
 __hyper_methods__ = [
     "lax_friedrichs",
     "lax_wendroff",
+    "flux_limited",
+    "finite_volume",
+    "moving_grid",
+    "strang_splitting",
+    "split_step",
+    "crank_nicolson",
+    "method_of_characteristics",
+    "linear_operator",
     "runge_kutta_2",
+    "runge_kutta_45",
 ]
 
+# loops are imported on first use of their method (see load_util)
+__hyper_loops__ = {
+    "lax_friedrichs": "hypersolver.lax_friedrichs.lx_loop",
+    "lax_wendroff": "hypersolver.lax_wendroff.lw_loop",
+    "flux_limited": "hypersolver.flux_limited.fl_loop",
+    "finite_volume": "hypersolver.finite_volume.fv_loop",
+    "moving_grid": "hypersolver.moving_grid.mg_loop",
+    "strang_splitting": "hypersolver.strang_splitting.ss_loop",
+    "split_step": "hypersolver.split_step.sp_loop",
+    "crank_nicolson": "hypersolver.crank_nicolson.cn_loop",
+    "method_of_characteristics": "hypersolver.method_of_characteristics.moc_loop",
+    "linear_operator": "hypersolver.linear_operator.lo_loop",
+    "runge_kutta_2": "hypersolver.runge_kutta.rk_loop",
+    "runge_kutta_45": "hypersolver.runge_kutta.rk45_loop",
+}
+
+__moving_methods__ = ("moving_grid", "strang_splitting")
+
+# methods whose loops neither stop early nor keep diagnostics
+__plain_methods__ = ("moving_grid", "strang_splitting", "linear_operator")
+
+__solver_cache__ = OrderedDict()
+
 np = xnp
 jit = jxt
 
 
+def options_util(method, stream, store, diagnostics, stats):
+    """ utility to reject options a method or mode cannot honor
+
+        raises a ValueError naming the conflict
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if diagnostics and method in __plain_methods__:
+        raise ValueError(f"diagnostics not supported with {method}")
+
+    for name, option in (("diagnostics", diagnostics), ("stats", stats)):
+        if option and (stream or store is not None):
+            raise ValueError(f"{name} not supported with stream or store")
+
+
 def set_solver(
-    method=os.environ.get("HS_METHOD", "lax_friedrichs"),
-    backend=os.environ.get("HS_BACKEND", "numpy"),
+    method=None,
+    backend=None,
+    stream=False,
+    store=None,
+    parallel=False,
+    stats=False,
+    diagnostics=False,
 ):
-    """ wrapper function to select solvers """
+    """ wrapper function to select solvers
+
+        compiled loops are shared across solvers in an LRU cache
+        keyed on method, backend, the identity of the callables
+        (f, g), and the dtypes of the arrays passed; it holds
+        HS_CACHE (default 32) entries, and the numba backend also
+        caches compiled kernels on disk
+
+        solver.warmup(t, n0, ...) compiles for these arguments
+        ahead of the run by solving up to t[0] only
+
+        method and backend default to HS_METHOD and HS_BACKEND
+        when the solver is set; the loop of the method is only
+        imported then, and numba only once a loop is compiled
+        for it; every helper the loop calls runs on `backend`
+
+        parallel=True runs the stencils across threads with numba
+
+        f and g may be declared with set_term(f, kind) as constant,
+        depending on x only, or linear in n, and are then evaluated
+        once per grid x and kept across runs (see terms_util);
+        moving_grid and strang_splitting, whose grids move or are
+        2-D, raise a ValueError for any but set_term(f, "state")
+
+        stats=True returns (tims, sols, Stats) with the number of
+        steps, saves and f/g calls, and the time spent in f/g, in
+        the scheme steps and in the rest of the loop (see Stats);
+        it raises a ValueError with stream or store
+
+        diagnostics=True returns (tims, sols, Diagnostics) with the
+        mass, first moment, min, max and count of negatives of n at
+        every step, before the Stats if kept (see Diagnostics); it
+        raises a ValueError for moving_grid, strang_splitting and
+        linear_operator, and with stream or store
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    method = method or os.environ.get("HS_METHOD", "lax_friedrichs")
+    backend = backend or os.environ.get("HS_BACKEND", "numpy")
 
     if method not in __hyper_methods__:
         raise ValueError("method not supported")
 
-    os.environ["HS_METHOD"] = str(method)
-    os.environ["HS_BACKEND"] = str(backend)
+    options_util(method, stream, store, diagnostics, stats)
+
+    if stream:
+        return load_util("hypersolver.stream.set_stream")(
+            method, backend, parallel)
+
+    if store is not None:
+        return load_util("hypersolver.store.set_store")(
+            method, store, backend, parallel)
+
+    loop = load_util(__hyper_loops__[method])
 
-    @jit(nopython=True)
-    def _solver(*args):
-        """ jit a loop """
-        if method == "lax_friedrichs":
-            return lx_loop(*args)
+    def _solver(*args, **kwargs):
+        """ run the loop compiled for these arguments """
 
-        return lw_loop(*args) if method == "lax_wendroff" else rk_loop(*args)
+        if stats:
+            kwargs["stats"] = counters_util()
+
+        if diagnostics:
+            kwargs["diags"] = True
+
+        start = perf_counter()
+
+        args = terms_util(
+            args, None if method in __moving_methods__ else args[2],
+            int(os.environ.get("HS_CACHE", "32")), backend)
+
+        result = cache_util(
+            __solver_cache__,
+            (method, backend, parallel) + tuple(map(key_util, args)) + tuple(
+                (key, key_util(arg)) for key, arg in sorted(kwargs.items())),
+            lambda: compile_util(loop, backend, fresh=True, parallel=parallel),
+            int(os.environ.get("HS_CACHE", "32")),
+        )(*(compile_util(arg, backend) for arg in args), **{
+            key: compile_util(arg, backend) for key, arg in kwargs.items()})
+
+        if diagnostics:
+            result = result[:2] + (set_diagnostics(*result[2:]),)
+
+        if not stats:
+            return result
+
+        return result + (set_stats(kwargs["stats"], perf_counter() - start),)
+
+    def warmup(time, *args, **kwargs):
+        """ compile ahead of the run by solving up to time[0] only """
+
+        return _solver(np.asarray(time)[:1], *args, **kwargs)
+
+    _solver.warmup = warmup
 
     return _solver
 
 
-solver = set_solver()
+def __getattr__(name):
+    """ set the default solver on first use """
+
+    if name == "solver":
+        globals()["solver"] = set_solver()
+        return globals()["solver"]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,95 @@
+""" adaptive time stepping shared by the schemes
+
+    Δt ≤ λΔx/f ∀ x is recomputed from the current f every few
+    steps (adapt_util) and clipped to land exactly on each of
+    the requested times (clip_util); each scheme has its own
+    adaptive loop (lx_adapt, lw_adapt, fl_adapt and fv_adapt),
+    started with start_util and advanced with mark_util, which
+    steps n with the next step of that scheme
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import time_step_util
+from hypersolver.util import count_util
+from hypersolver.util import eval_util, halt_util
+from hypersolver.util import diags_util, record_util
+
+
+@jit(nopython=True)
+def adapt_util(vars_vals, flux_term, stability, time_, grow, shrink):
+    """ utility to update the time_step from the current flux
+
+        the CFL-limited time_step is bounded to grow at most by
+        `grow` and to shrink at most by `shrink` relative to the
+        previous `time_`; a positive `shrink` trades stability
+        for smoothness of the time_step
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    return min(max(
+        time_step_util(vars_vals, flux_term, stability), shrink * time_
+    ), grow * time_)
+
+
+@jit(nopython=True)
+def start_util(time, init_, grid, _flux_, stability, check, event, diags, stats):
+    """ utility to start an adaptive loop
+
+        returns the requested times, the solutions at each with
+        n at the first, n and a buffer for the next step, the
+        CFL-limited Δt from the initial f, event(t, n) and the
+        diagnostics at the first time
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    tims = np.empty(np.asarray(time).size)
+    tims[:] = time
+
+    sols = np.empty((tims.size,) + np.asarray(init_).shape)
+    sols[0] = init_
+
+    _yvar = sols[0].copy()
+
+    time_ = time_step_util(grid, eval_util(_flux_, _yvar, grid.vars_), stability)
+    count_util(stats, fluxes=1)
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    diag = diags_util(diags, tims.size, tims[0], _yvar, grid)
+
+    return tims, sols, _yvar, np.empty(_yvar.shape), time_, event_, diag
+
+
+@jit(nopython=True)
+def clip_util(vars_vals, flux_term, stability, time_, itrs, every, grow, shrink, left):
+    """ utility to get the time_step and the next step to take
+
+        the time_step is adapted every `every` steps (adapt_util)
+        and the step is clipped to what is `left` until the next
+        requested time
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if itrs > 0 and itrs % every == 0:
+        time_ = adapt_util(vars_vals, flux_term, stability, time_, grow, shrink)
+
+    return time_, min(time_, left)
+
+
+@jit(nopython=True)
+def mark_util(
+        next_, init_, itrs, tval, step_, target,
+        halt, check, event, event_, diags, diag, grid):
+    """ utility to mark a step of an adaptive loop
+
+        returns the time after the step, landing exactly on the
+        `target` time when clipped to it, whether the loop stops
+        there (halt_util), event(t, n) and the diagnostics
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    tval = target if step_ == target - tval else tval + step_
+    stop, event_ = halt_util(next_, init_, itrs, tval, step_, halt, check, event, event_)
+    diag = record_util(diags, diag, itrs + 1, tval, next_, grid)
+
+    return tval, stop, event_, diag
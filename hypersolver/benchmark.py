@@ -0,0 +1,316 @@
+""" benchmarks of the hot loops and kernels
+
+    times lx_loop, lw_loop, fl_loop, fv_loop, cn_loop, rk_loop,
+    moc_loop, lo_loop and the ord* derivative kernels on uniform grids
+    of several sizes, for each backend, cold (first call, including
+    any compilation) and warm (best of the repeated calls)
+
+    Usage:
+    $ python -m hypersolver.benchmark --sizes 100 10000 1000000 \\
+    >     --backends numpy numba --output bench.json
+    $ python -m hypersolver.benchmark --baseline bench.json
+
+    reports, per case, backend and size:
+        steps_per_s:        warm steps per second
+        step_bytes:         peak bytes allocated while taking one
+                            step with preallocated buffers
+        peak_bytes:         peak bytes allocated over a warm run
+        allocs_per_step:    numba allocations per warm step
+
+    bytes are traced with tracemalloc, which does not see the
+    allocations made inside numba-compiled code; those are only
+    counted, in allocs_per_step, for the numba backend
+
+    with --baseline, cases slower than (1 - threshold) of the
+    baseline steps_per_s or allocating more than (1 + threshold)
+    of its step_bytes are reported and the exit status is 1
+
+    timings depend on the machine, so no baseline is shipped; save
+    one with --output from the commit to compare against, on the
+    same machine, then pass it with --baseline after the change:
+    $ git stash && python -m hypersolver.benchmark --output base.json
+    $ git stash pop && python -m hypersolver.benchmark --baseline base.json
+"""
+
+import sys
+import json
+import argparse
+import platform
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from hypersolver.util import jxt as jit
+from hypersolver.util import compile_util, set_grid, steps_util
+from hypersolver.util import time_step_util
+from hypersolver.derivative import ord1_acc2, ord1_acc4
+from hypersolver.derivative import ord2_acc2, ord2_acc4
+from hypersolver.lax_friedrichs import lx_loop, lx_next
+from hypersolver.lax_wendroff import lw_loop, lw_next
+from hypersolver.flux_limited import fl_loop, fl_next
+from hypersolver.finite_volume import fv_loop, fv_next
+from hypersolver.crank_nicolson import cn_loop, cn_next
+from hypersolver.runge_kutta import rk_loop, rk2_next
+from hypersolver.method_of_characteristics import moc_loop, moc_next
+from hypersolver.linear_operator import lo_loop, operator_util, apply_util
+
+
+@jit(nopython=True)
+def flux_bench(init_, vars_):
+    """ flux of the benchmarks """
+
+    _ = init_
+    return 1.0 + 0.5 * vars_
+
+
+@jit(nopython=True)
+def sink_bench(init_, vars_):
+    """ sink of the benchmarks """
+
+    _ = vars_
+    return -0.1 * init_
+
+
+def loop_bench(loop, step, size, steps, backend):
+    """ benchmark a time loop over about `steps` steps """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    grid = set_grid(np.linspace(0, 1, size))
+    init_ = np.exp(-((grid.vars_ - 0.3) / 0.05)**2)
+    funcs = (flux_bench, sink_bench) if loop is not rk_loop else (sink_bench,)
+
+    time_ = compile_util(time_step_util)(
+        grid, compile_util(funcs[0])(init_, grid.vars_), 0.9)
+    time = np.array([0.0, steps * time_])
+
+    args = (init_, grid) + tuple(compile_util(func, backend) for func in funcs)
+
+    if loop is rk_loop:
+        step_args = (init_, grid.vars_, args[2], 0.0, time_)
+    elif loop is lo_loop:
+        step_args = compile_util(operator_util)(
+            grid, funcs[0](init_, grid.vars_), args[3], time_) + (
+            init_, np.empty(init_.shape), np.empty(init_.shape))
+    elif loop in (cn_loop, moc_loop):
+        terms = tuple(func(init_, grid.vars_) for func in funcs)
+        step_args = (init_, grid) + terms + (time_,)
+    elif loop is fl_loop:
+        terms = tuple(func(init_, grid.vars_) for func in funcs)
+        step_args = (init_, grid) + terms + (time_,) + buffers_bench(init_, 0)[:1]
+    else:
+        terms = tuple(func(init_, grid.vars_) for func in funcs)
+        terms = terms if loop is not lw_loop else (terms[0], (terms[1], terms[1]))
+        step_args = (init_, grid) + terms + (time_,) + buffers_bench(init_, 3)
+
+    return {
+        "run": (compile_util(loop, backend, fresh=True), (time,) + args + (0.9,), {"dense": True}),
+        "step": (compile_util(step, backend), step_args),
+        "steps": compile_util(steps_util)(time, time_, dense=True)[0].size - 1,
+    }
+
+
+def kernel_bench(kernel, size, backend):
+    """ benchmark a derivative kernel, one call being one step """
+
+    grid = set_grid(np.linspace(0, 1, size))
+    args = (np.sin(grid.vars_), grid) + buffers_bench(grid.vars_, 1)
+
+    return {
+        "run": (compile_util(kernel, backend, fresh=True), args, {}),
+        "step": (compile_util(kernel, backend), args),
+        "steps": 1,
+    }
+
+
+def buffers_bench(init_, size):
+    """ preallocated out and (size, ...) work buffers """
+
+    return np.empty(init_.shape), np.empty((size,) + init_.shape)
+
+
+__bench_cases__ = {
+    "lx_loop": lambda size, steps, backend: loop_bench(
+        lx_loop, lx_next, size, steps, backend),
+    "lw_loop": lambda size, steps, backend: loop_bench(
+        lw_loop, lw_next, size, steps, backend),
+    "fl_loop": lambda size, steps, backend: loop_bench(
+        fl_loop, fl_next, size, steps, backend),
+    "fv_loop": lambda size, steps, backend: loop_bench(
+        fv_loop, fv_next, size, steps, backend),
+    "cn_loop": lambda size, steps, backend: loop_bench(
+        cn_loop, cn_next, size, steps, backend),
+    "rk_loop": lambda size, steps, backend: loop_bench(
+        rk_loop, rk2_next, size, steps, backend),
+    "moc_loop": lambda size, steps, backend: loop_bench(
+        moc_loop, moc_next, size, steps, backend),
+    "lo_loop": lambda size, steps, backend: loop_bench(
+        lo_loop, apply_util, size, steps, backend),
+    "ord1_acc2": lambda size, steps, backend: kernel_bench(ord1_acc2, size, backend),
+    "ord1_acc4": lambda size, steps, backend: kernel_bench(ord1_acc4, size, backend),
+    "ord2_acc2": lambda size, steps, backend: kernel_bench(ord2_acc2, size, backend),
+    "ord2_acc4": lambda size, steps, backend: kernel_bench(ord2_acc4, size, backend),
+}
+
+
+def traced_bench(func, args, kwargs=None):
+    """ peak bytes allocated by a warm func(*args, **kwargs) """
+
+    func(*args, **(kwargs or {}))
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    try:
+        func(*args, **(kwargs or {}))
+        return tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+
+
+def allocs_bench(func, args, kwargs, backend):
+    """ numba allocations made by func(*args, **kwargs) """
+
+    if backend != "numba":
+        return None
+
+    # pylint: disable=import-outside-toplevel
+    from numba.core.runtime import rtsys, _nrt_python
+
+    _nrt_python.memsys_enable_stats()  # pylint: disable=c-extension-no-member
+    start = rtsys.get_allocation_stats().alloc
+    func(*args, **kwargs)
+
+    return rtsys.get_allocation_stats().alloc - start
+
+
+def run_bench(case, size, backend, steps=100, repeat=3):
+    """ benchmark one case on a grid of `size` points
+
+        returns the timings and allocations as a dict
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    bench = __bench_cases__[case](size, steps, backend)
+    func, args, kwargs = bench["run"]
+
+    start = perf_counter()
+    func(*args, **kwargs)
+    cold = perf_counter() - start
+
+    warm = np.inf
+    for _ in range(repeat):
+        start = perf_counter()
+        func(*args, **kwargs)
+        warm = min(warm, perf_counter() - start)
+
+    allocs = allocs_bench(func, args, kwargs, backend)
+
+    return {
+        "case": case,
+        "backend": backend,
+        "size": size,
+        "steps": bench["steps"],
+        "cold_s": cold,
+        "warm_s": warm,
+        "steps_per_s": bench["steps"] / warm,
+        "step_bytes": traced_bench(*bench["step"]),
+        "peak_bytes": traced_bench(func, args, kwargs),
+        "allocs_per_step": None if allocs is None else allocs / bench["steps"],
+    }
+
+
+def suite_bench(cases, sizes, backends, steps=100, repeat=3):
+    """ benchmark every case, size and backend
+
+        returns the results with the versions in use
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    meta = {"python": platform.python_version(), "numpy": np.__version__}
+
+    if "numba" in backends:
+        import numba  # pylint: disable=import-outside-toplevel
+        meta["numba"] = numba.__version__
+        meta["threads"] = numba.get_num_threads()
+
+    return {"meta": meta, "results": [
+        run_bench(case, size, backend, steps, repeat)
+        for backend in backends for case in cases for size in sizes
+    ]}
+
+
+def compare_bench(results, baseline, threshold=0.25):
+    """ regressions of results against a baseline
+
+        returns a message for each case, backend and size found
+        in both that is slower or allocates more than threshold
+    """
+
+    stored = {
+        (item["case"], item["backend"], item["size"]): item
+        for item in baseline["results"]
+    }
+
+    regressions = []
+
+    for item in results["results"]:
+        base = stored.get((item["case"], item["backend"], item["size"]))
+
+        if base is None:
+            continue
+
+        label = f"{item['case']} [{item['backend']}, {item['size']}]"
+
+        if item["steps_per_s"] < (1.0 - threshold) * base["steps_per_s"]:
+            regressions.append(
+                f"{label}: {item['steps_per_s']:.4g} steps/s "
+                f"vs {base['steps_per_s']:.4g} in baseline")
+
+        if item["step_bytes"] > (1.0 + threshold) * base["step_bytes"]:
+            regressions.append(
+                f"{label}: {item['step_bytes']} bytes/step "
+                f"vs {base['step_bytes']} in baseline")
+
+    return regressions
+
+
+def main(argv=None):
+    """ run the benchmarks from the command line """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m hypersolver.benchmark", description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=list(__bench_cases__))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10**2, 10**4, 10**6])
+    parser.add_argument("--backends", nargs="+", default=["numpy"])
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = suite_bench(
+        args.cases, args.sizes, args.backends, args.steps, args.repeat)
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        regressions = compare_bench(results, json.load(file), args.threshold)
+
+    for line in regressions:
+        print(line, file=sys.stderr)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
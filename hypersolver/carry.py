@@ -0,0 +1,91 @@
+""" carrying a loop across the intervals of a stream
+
+    a stream (see stream.py) calls a loop once per interval of
+    the requested times; the loop keeps what it needs to go on
+    as one flat float64 array per slot of a carry, a list typed
+    for numba (carry_util), and takes it back at the next
+    interval, such that the stream steps as the loop would in
+    one call; slot 0 holds the steps taken, the last value of
+    event(t, n) and whether the loop stopped, slot 1 holds Δt
+    and the other scalars of the loop, and the next slots hold
+    its arrays, flattened
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+
+
+def carry_util(backend="numpy"):
+    """ utility to allocate the carry of a stream
+
+        a list of flat float64 arrays, typed for numba, in which
+        a loop keeps what it needs to go on from one interval of
+        a stream to the next (see keep_util)
+    """
+
+    if backend == "numba":
+        from numba import types as nbtypes, typed  # pylint: disable=import-outside-toplevel
+        return typed.List.empty_list(nbtypes.float64[::1])
+
+    return []
+
+
+@jit(nopython=True)
+def fetch_util(carry, slot, value):
+    """ utility to get the flat `value` kept in `slot` of carry
+
+        returns `value` as given without carry, or before the
+        first interval of a stream kept it
+    """
+
+    if carry is None:
+        return value
+
+    if len(carry) <= slot:
+        return value
+
+    return carry[slot]
+
+
+@jit(nopython=True)
+def keep_util(carry, slot, value):
+    """ utility to keep `value` in `slot` of carry, if given
+
+        value is kept flat, as a copy, for the next interval of a
+        stream; slot 0 holds the steps taken, the last value of
+        event(t, n) and whether the loop stopped (see pause_util),
+        and the slots after it what a loop keeps across steps
+    """
+
+    if carry is None:
+        return
+
+    flat = value.flatten().astype(np.float64)
+
+    if len(carry) <= slot:
+        carry.append(flat)
+    else:
+        carry[slot] = flat
+
+
+@jit(nopython=True)
+def resume_util(carry, event_):
+    """ utility to resume a loop from the carry of a stream
+
+        returns the steps taken and the last value of event(t, n)
+        over the intervals before, or 0 and `event_` without carry
+    """
+
+    state = fetch_util(carry, 0, np.array([0.0, event_, 0.0]))
+
+    return int(state[0]), state[1]
+
+
+@jit(nopython=True)
+def pause_util(carry, steps, event_, stop):
+    """ utility to keep the steps taken, event(t, n) and whether
+        the loop stopped in the carry of a stream, if given
+    """
+
+    keep_util(carry, 0, np.array([1.0 * steps, event_, 1.0 if stop else 0.0]))
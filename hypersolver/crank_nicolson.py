@@ -0,0 +1,302 @@
+""" implicit Crank-Nicolson (θ-method) finite-difference scheme
+
+    ∂n/∂t + ∂(fn)/∂x = g
+
+    inputs
+    ------
+    init_:  n
+    vars_:  x
+    flux_:  f
+    sink_:  g
+    time_:  Δt
+
+    outputs
+    -------
+    next_:  n
+
+    numerics
+    --------
+    (I + θΔt L) n(j+1) = (I - (1 - θ)Δt L) n(j) + Δt g(j)
+
+    L n = Δ(fn)/Δx is the first-order derivative with accuracy
+    of 2 (ord1_acc2) within x and upwind at both ends, where n
+    flowing in from beyond x is 0; L is tridiagonal in n, so
+    that each step is one O(N) banded solve (LU with partial
+    pivoting, as LAPACK's gttrf); θ = 0.5 is Crank-Nicolson
+    (second-order, non-dissipative) and θ = 1 is backward Euler
+    (first-order, damps oscillations)
+
+    Δt = λΔx/f, fixed from the initial f as with the explicit
+    schemes, but λ may be far above 1 since θ ≥ 0.5 is
+    unconditionally stable with the upwind ends (the one-sided
+    differences downwind of the boundaries of ord1_acc2 are
+    not); g is explicit
+
+    the factorization of I + θΔt L is kept across steps with the
+    same Δt when f is declared `steady` (independent of n and t)
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import grid_util, snaps_util, steps_util
+from hypersolver.util import term_util, time_step_util
+from hypersolver.util import points_util, spans_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util, halt_util
+from hypersolver.util import diags_util, record_util, result_util
+
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
+
+
+@jit(nopython=True)
+def band_util(flux_, vars_):
+    """ utility to assemble the (rows, N) bands of L n = Δ(fn)/Δx
+
+        returns the (lower, diag, upper) coefficients of n(i-1),
+        n(i) and n(i+1), as ord1_acc2 differences f n within x,
+        and as upwind differences at both ends, with no n flowing
+        in from beyond x
+    """
+
+    inv, edges = spans_util(vars_)
+
+    size = points_util(vars_).size
+    flux = np.ascontiguousarray(np.ones(size) * flux_).reshape(-1, size)
+    inv = np.ones(size - 2) * inv
+
+    lower = np.zeros(flux.shape)
+    diag = np.zeros(flux.shape)
+    upper = np.zeros(flux.shape)
+
+    lower[:, 1:-1] = -flux[:, :-2] * inv
+    upper[:, 1:-1] = flux[:, 2:] * inv
+
+    diag[:, 0] = np.abs(flux[:, 0]) * edges[0]
+    upper[:, 0] = np.where(flux[:, 0] < 0.0, flux[:, 1] * edges[0], 0.0)
+    lower[:, -1] = np.where(flux[:, -1] > 0.0, -flux[:, -2] * edges[1], 0.0)
+    diag[:, -1] = np.abs(flux[:, -1]) * edges[1]
+
+    return lower, diag, upper
+
+
+@jit(nopython=True)
+def product_util(bands, init_):
+    """ utility to apply the bands of band_util to n, L n """
+
+    lower, diag, upper = bands
+
+    rows = np.ascontiguousarray(init_).reshape(-1, init_.shape[-1])
+    out = diag * rows
+
+    out[:, 1:] += lower[:, 1:] * rows[:, :-1]
+    out[:, :-1] += upper[:, :-1] * rows[:, 1:]
+
+    return out.reshape(init_.shape)
+
+
+@jit(nopython=True)
+def factor_util(bands, scale):
+    """ utility to factor I + scale L with partial pivoting
+
+        returns the bands of L and, for each of their rows, the
+        LU factors as LAPACK's gttrf: the multipliers, the
+        diagonal and the two upper bands of U, and whether each
+        elimination swapped rows, such that the solve is stable
+        where I + scale L is not diagonally dominant
+    """
+    # pylint: disable=too-many-locals
+
+    lower = scale * bands[0][:, 1:]
+    diag = 1.0 + scale * bands[1]
+    upper = scale * bands[2][:, :-1]
+
+    rows, size = diag.shape
+    second = np.zeros((rows, max(size - 2, 0)))
+    swap = np.zeros((rows, max(size - 1, 0)), dtype=np.bool_)
+
+    for row in range(rows):
+        for idx in range(size - 1):
+            if abs(diag[row, idx]) >= abs(lower[row, idx]):
+                fact = lower[row, idx] / diag[row, idx] if diag[row, idx] != 0.0 else 0.0
+                lower[row, idx] = fact
+                diag[row, idx + 1] -= fact * upper[row, idx]
+                continue
+
+            fact = diag[row, idx] / lower[row, idx]
+            diag[row, idx], lower[row, idx] = lower[row, idx], fact
+            upper[row, idx], diag[row, idx + 1] = (
+                diag[row, idx + 1], upper[row, idx] - fact * diag[row, idx + 1])
+            if idx < size - 2:
+                second[row, idx] = upper[row, idx + 1]
+                upper[row, idx + 1] = -fact * upper[row, idx + 1]
+            swap[row, idx] = True
+
+    return bands, (lower, diag, upper, second, swap)
+
+
+@jit(nopython=True)
+def solve_util(factor, rhs):
+    """ utility to solve (I + scale L) n = rhs in place, in O(N)
+
+        rhs is (rows, N), and a factor with one row is shared
+    """
+
+    lower, diag, upper, second, swap = factor[1]
+    size = rhs.shape[1]
+
+    for row in range(rhs.shape[0]):
+        fac = min(row, diag.shape[0] - 1)
+
+        for idx in range(size - 1):
+            if swap[fac, idx]:
+                rhs[row, idx], rhs[row, idx + 1] = rhs[row, idx + 1], (
+                    rhs[row, idx] - lower[fac, idx] * rhs[row, idx + 1])
+            else:
+                rhs[row, idx + 1] -= lower[fac, idx] * rhs[row, idx]
+
+        rhs[row, size - 1] /= diag[fac, size - 1]
+        if size > 1:
+            rhs[row, size - 2] = (
+                rhs[row, size - 2] - upper[fac, size - 2] * rhs[row, size - 1]
+            ) / diag[fac, size - 2]
+
+        for idx in range(size - 3, -1, -1):
+            rhs[row, idx] = (
+                rhs[row, idx] - upper[fac, idx] * rhs[row, idx + 1]
+                - second[fac, idx] * rhs[row, idx + 2]) / diag[fac, idx]
+
+    return rhs
+
+
+@jit(nopython=True)
+def pack_util(factor):
+    """ utility to flatten a factor_util into one array to carry
+
+        the bands and LU factors are joined along their last axis
+        in the order factor_util returns them, swap as 0 or 1
+    """
+
+    lower, diag, upper, second, swap = factor[1]
+
+    return np.concatenate((
+        factor[0][0], factor[0][1], factor[0][2],
+        lower, diag, upper, second, 1.0 * swap), axis=1).ravel()
+
+
+@jit(nopython=True)
+def unpack_util(flat, size):
+    """ utility to rebuild the factor_util of N = size from pack_util """
+
+    widths = np.array([size, size, size, size - 1, size, size - 1, size - 2, size - 1])
+    packed = flat.reshape(-1, np.sum(widths))
+
+    parts = []
+    start = 0
+    for width in widths:
+        parts.append(np.ascontiguousarray(packed[:, start:start + width]))
+        start += width
+
+    return (parts[0], parts[1], parts[2]), (
+        parts[3], parts[4], parts[5], parts[6], parts[7] > 0.5)
+
+
+@jit(nopython=True)
+def cn_next(init_, vars_, flux_, sink_, time_, theta=0.5, factor=None):
+    """ next step according to the θ-method scheme
+
+        factor is an optional factor_util of I + θΔt L to reuse
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if factor is None:
+        factor = factor_util(band_util(flux_, vars_), theta * time_)
+
+    out = product_util(factor[0], init_)
+    np.multiply(out, (theta - 1.0) * time_, out)
+    np.add(out, init_, out)
+    np.add(out, time_ * term_util(sink_, init_), out)
+
+    return solve_util(factor, out.reshape(-1, init_.shape[-1])).reshape(init_.shape)
+
+
+@jit(nopython=True)
+def cn_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        theta=0.5, steady=False,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ loop for cn scheme
+
+        takes the arguments of lx_loop without adaptive stepping,
+        θ, and whether f is `steady`, in which case f is called
+        once and I + θΔt L is only factored anew when Δt changes
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    flux_ = eval_util(_flux_, init_, grid.vars_)
+    count_util(stats, fluxes=1)
+
+    time_ = time_step_util(grid, flux_, stability)
+    state = fetch_util(carry, 1, np.array([time_, time_]))
+    time_, last = state[0], state[1]
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    packed = fetch_util(carry, 2, np.empty(0))
+    if packed.size:
+        factor = unpack_util(packed, points_util(grid).size)
+    else:
+        factor = factor_util(band_util(flux_, grid), theta * time_)
+
+    _yvar = sols[0].copy()
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tidx.size, tims[0], _yvar, grid)
+    save = 0
+
+    for itrs in range(tidx[:-1].size):
+
+        step_ = tidx[itrs + 1] - tidx[itrs]
+
+        clock = clock_util(stats)
+        if not steady:
+            flux_ = eval_util(_flux_, _yvar, grid.vars_)
+        sink_ = eval_util(_sink_, _yvar, grid.vars_)
+        clock = clock_util(stats, clock)
+
+        # the dense steps of an interval differ by rounding only
+        if not steady or abs(step_ - last) > 1e-9 * last:
+            factor = factor_util(band_util(flux_, grid), theta * step_)
+            last = step_
+
+        next_ = cn_next(_yvar, grid, flux_, sink_, step_, theta, factor)
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 0 if steady else 1, 1)
+
+        stop, event_ = halt_util(
+            next_, _yvar, base + itrs, tidx[itrs + 1], tidx[itrs + 1] - tidx[itrs],
+            halt, check, event, event_)
+        diag = record_util(diags, diag, itrs + 1, tidx[itrs + 1], next_, grid)
+        _yvar = next_
+
+        if marks[itrs + 1] or stop:
+            save += 1
+            tims[save], sols[save] = tidx[itrs + 1], _yvar
+            count_util(stats, saves=1)
+
+        if stop:
+            pause_util(carry, base + itrs + 1, event_, True)
+            return result_util(
+                tims[:save + 1], sols[:save + 1], diags, diag, itrs + 2)
+
+    pause_util(carry, base + tidx.size - 1, event_, False)
+    keep_util(carry, 1, np.array([time_, last]))
+    keep_util(carry, 2, pack_util(factor))
+    return result_util(tims, sols, diags, diag, tidx.size)
@@ -5,115 +5,219 @@
         - ord1_acc4: order=1, accuracy=4
         - ord2_acc2: order=2, accuracy=2
         - ord2_acc4: order=2, accuracy=4
+
+    _func may be (N,) or a batch (..., N) differenced along
+    its last axis against the (N,) grid _xvar, given either
+    raw (only the spacings a kernel needs are then computed)
+    or as a Grid from set_grid with its spacings cached
+
+    all functions optionally take caller-supplied buffers,
+    out of shape (..., N) and work of shape (1, ..., N), and
+    then run without allocating on the interior of the grid
+
+    ord1_acc2_par and ord2_acc2_par are loop-based versions of
+    ord1_acc2 and ord2_acc2 into C-contiguous out, split across
+    threads with prange in solvers compiled for numba with
+    parallel=True; ord1_acc2_at and ord2_acc2_at give their
+    stencil weights at a single point so that schemes can fuse
+    the differences into one pass
 """
 
 from hypersolver.util import xnp as np
 from hypersolver.util import jxt as jit
+from hypersolver.util import pxt, prange
+from hypersolver.util import spans_util, spacing_util
 
 
 @jit(nopython=True)
-def ord1_acc2(_func, _xvar):
+def ord1_acc2(_func, _xvar, out=None, work=None):
     """ central differencing: order=1, accuracy=2 """
 
-    _func, _xvar = np.asarray(_func), np.asarray(_xvar)
+    _ = work
+    _func = np.asarray(_func)
+    inv, edges = spans_util(_xvar)
+
+    if out is None:
+        out = np.empty(_func.shape)
 
-    _derivative = (
-        - (1/2)*_func[:-2] + (1/2)*_func[2:]
-    )/((_xvar[2:] - _xvar[:-2])/2)
+    np.subtract(_func[..., 2:], _func[..., :-2], out[..., 1:-1])
+    np.multiply(out[..., 1:-1], inv, out[..., 1:-1])
 
-    _derivative0 = np.asarray(
-        [(_func[1] - _func[0])/(_xvar[1] - _xvar[0])]
-    )
-    _derivative1 = np.asarray(
-        [(_func[-1] - _func[-2])/(_xvar[-1] - _xvar[-2])]
-    )
+    out[..., 0] = (_func[..., 1] - _func[..., 0])*edges[0]
+    out[..., -1] = (_func[..., -1] - _func[..., -2])*edges[1]
 
-    return np.concatenate((_derivative0, _derivative, _derivative1))
+    return out
 
 
 @jit(nopython=True)
-def ord1_acc4(_func, _xvar):
+def ord1_acc4(_func, _xvar, out=None, work=None):
     """ central differencing: order1, accuracy=4 """
 
-    _func, _xvar = np.asarray(_func), np.asarray(_xvar)
+    _func = np.asarray(_func)
+    inv, edges = spans_util(_xvar)
 
-    _result1 = (
-        - (2/3)*_func[:-2] + (2/3)*_func[2:]
-    )/((_xvar[2:] - _xvar[:-2])/2)
+    if out is None:
+        out = np.empty(_func.shape)
+    if work is None:
+        work = np.empty((1,) + _func.shape)
 
-    _result2 = np.concatenate((
-        -np.asarray([_result1[0] - _result1[0]*3/4]),
-        (
-            (1/12)*_func[:-4] - (1/12)*_func[4:]
-        )/((_xvar[4:] - _xvar[:-4])/4),
-        -np.asarray([_result1[-1] - _result1[-1]*3/4]),
-    ))
+    np.subtract(_func[..., 2:], _func[..., :-2], out[..., 1:-1])
+    np.multiply(out[..., 1:-1], inv, out[..., 1:-1])
+    np.multiply(out[..., 1:-1], 4/3, out[..., 1:-1])
 
-    _derivative = _result1 + _result2
+    np.subtract(_func[..., :-4], _func[..., 4:], work[0, ..., 2:-2])
+    np.multiply(work[0, ..., 2:-2], spans_util(_xvar, 2)[0], work[0, ..., 2:-2])
+    np.multiply(work[0, ..., 2:-2], 1/3, work[0, ..., 2:-2])
+    np.add(out[..., 2:-2], work[0, ..., 2:-2], out[..., 2:-2])
 
-    _derivative0 = np.asarray(
-        [(_func[1] - _func[0])/(_xvar[1] - _xvar[0])]
-    )
-    _derivative1 = np.asarray(
-        [(_func[-1] - _func[-2])/(_xvar[-1] - _xvar[-2])]
-    )
+    out[..., 1] *= 3/4
+    out[..., -2] *= 3/4
 
-    return np.concatenate(
-        (_derivative0, _derivative, _derivative1)
-    )
+    out[..., 0] = (_func[..., 1] - _func[..., 0])*edges[0]
+    out[..., -1] = (_func[..., -1] - _func[..., -2])*edges[1]
+
+    return out
 
 
 @jit(nopython=True)
-def ord2_acc2(_func, _xvar):
+def ord2_acc2(_func, _xvar, out=None, work=None):
     """ central differencing: order=2, accuracy=2 """
 
-    _func, _xvar = np.asarray(_func), np.asarray(_xvar)
+    _ = work
+    _func = np.asarray(_func)
+    inv, edges = spans_util(_xvar, 1, 2)
+
+    if out is None:
+        out = np.empty(_func.shape)
 
-    _derivative = (
-        _func[2:] - 2.0*_func[1:-1] + _func[:-2]
-    )/((_xvar[2:] - _xvar[:-2])/2.0)**2
+    np.add(_func[..., 2:], _func[..., :-2], out[..., 1:-1])
+    np.subtract(out[..., 1:-1], _func[..., 1:-1], out[..., 1:-1])
+    np.subtract(out[..., 1:-1], _func[..., 1:-1], out[..., 1:-1])
+    np.multiply(out[..., 1:-1], inv, out[..., 1:-1])
 
-    _derivative0 = np.asarray(
-        [(_func[2] - 2.0*_func[1] + _func[0])/(_xvar[1] - _xvar[0])**2]
-    )
-    _derivative1 = np.asarray(
-        [(_func[-1] - 2.0*_func[-2] + _func[-3])/(_xvar[-1] - _xvar[-2])**2]
-    )
+    out[..., 0] = (
+        _func[..., 2] - 2.0*_func[..., 1] + _func[..., 0]
+    )*edges[0]**2
+    out[..., -1] = (
+        _func[..., -1] - 2.0*_func[..., -2] + _func[..., -3]
+    )*edges[1]**2
 
-    return np.concatenate((_derivative0, _derivative, _derivative1))
+    return out
 
 
 @jit(nopython=True)
-def ord2_acc4(_func, _xvar):
+def ord2_acc4(_func, _xvar, out=None, work=None):
     """ central differencing: order=2, accuracy=4 """
 
-    _func, _xvar = np.asarray(_func), np.asarray(_xvar)
+    _func = np.asarray(_func)
+
+    if out is None:
+        out = np.empty(_func.shape)
+    if work is None:
+        work = np.empty((1,) + _func.shape)
+
+    ord2_acc2(_func, _xvar, out)
+
+    # inv_span2 at i in 2..N-3 (one value on uniform grids)
+    mid = spacing_util(spans_util(_xvar, 1, 2)[0])
+    mid = mid[1:-1] if mid.size > 1 else mid
+
+    np.add(_func[..., 1:-3], _func[..., 3:-1], work[0, ..., 2:-2])
+    np.multiply(work[0, ..., 2:-2], 8/15, work[0, ..., 2:-2])
+    np.subtract(work[0, ..., 2:-2], _func[..., 2:-2], work[0, ..., 2:-2])
+    np.multiply(work[0, ..., 2:-2], mid, work[0, ..., 2:-2])
+    np.multiply(work[0, ..., 2:-2], 5/2, out[..., 2:-2])
+
+    np.add(_func[..., :-4], _func[..., 4:], work[0, ..., 2:-2])
+    np.multiply(work[0, ..., 2:-2], spans_util(_xvar, 2, 2)[0], work[0, ..., 2:-2])
+    np.multiply(work[0, ..., 2:-2], -1/12, work[0, ..., 2:-2])
+    np.add(out[..., 2:-2], work[0, ..., 2:-2], out[..., 2:-2])
+
+    return out
+
+
+@jit(nopython=True)
+def ord1_acc2_at(idx, size, inv, edges):
+    """ weight of ord1_acc2 at x[idx]
+
+        the difference is taken between x[max(idx-1, 0)] and
+        x[min(idx+1, N-1)], with inv from spacing_util(inv_span)
+    """
+
+    if idx == 0:
+        return edges[0]
+    if idx == size - 1:
+        return edges[1]
+
+    return inv[idx - 1 if inv.size > 1 else 0]
+
+
+@jit(nopython=True)
+def ord2_acc2_at(idx, size, inv, edges):
+    """ weight of ord2_acc2 at x[idx]
+
+        the difference is centred on x[min(max(idx, 1), N-2)],
+        with inv from spacing_util(inv_span2)
+    """
+
+    if idx == 0:
+        return edges[0]**2
+    if idx == size - 1:
+        return edges[1]**2
+
+    return inv[idx - 1 if inv.size > 1 else 0]
+
+
+@pxt(ord1_acc2)
+@jit(nopython=True, parallel=True)
+def ord1_acc2_par(_func, _xvar, out=None, work=None):
+    """ central differencing: order=1, accuracy=2, across threads """
+
+    _ = work
+    _func = np.asarray(_func)
+    inv, edges = spans_util(_xvar)
+
+    if out is None:
+        out = np.empty(_func.shape)
+
+    size = _func.shape[-1]
+    rows = np.ascontiguousarray(_func).reshape(-1, size)
+    outs = out.reshape(-1, size)
+    inv = spacing_util(inv)
+
+    for row in range(rows.shape[0]):
+        for col in prange(size):
+            idx = np.int64(col)  # numba may index prange unsigned
+            outs[row, idx] = (
+                rows[row, min(idx + 1, size - 1)] - rows[row, max(idx - 1, 0)]
+            )*ord1_acc2_at(idx, size, inv, edges)
+
+    return out
+
 
-    _result10 = (
-        _func[:-2] - 2.0*_func[1:-1] + _func[2:]
-    )/((_xvar[2:] - _xvar[:-2])/2.0)**2
+@pxt(ord2_acc2)
+@jit(nopython=True, parallel=True)
+def ord2_acc2_par(_func, _xvar, out=None, work=None):
+    """ central differencing: order=2, accuracy=2, across threads """
 
-    _result20 = (
-        (4/3)*_func[:-2] - (5/2)*_func[1:-1] + (4/3)*_func[2:]
-    )/((_xvar[2:] - _xvar[:-2])/2.0)**2
+    _ = work
+    _func = np.asarray(_func)
+    inv, edges = spans_util(_xvar, 1, 2)
 
-    _result2 = np.concatenate((
-        np.array([_result10[0]]),
-        (
-            -(1/12)*_func[:-4] - (1/12)*_func[4:]
-        )/((_xvar[4:] - _xvar[:-4])/4.0)**2 + _result20[1:-1],
-        np.array([_result10[-1]]),
-    ))
+    if out is None:
+        out = np.empty(_func.shape)
 
-    _derivative = _result2
+    size = _func.shape[-1]
+    rows = np.ascontiguousarray(_func).reshape(-1, size)
+    outs = out.reshape(-1, size)
+    inv = spacing_util(inv)
 
-    _derivative0 = np.asarray(
-        [(_func[2] - 2.0*_func[1] + _func[0])/(_xvar[1] - _xvar[0])**2]
-    )
-    _derivative1 = np.asarray(
-        [(_func[-1] - 2.0*_func[-2] + _func[-3])/(_xvar[-1] - _xvar[-2])**2]
-    )
+    for row in range(rows.shape[0]):
+        for col in prange(size):
+            idx = np.int64(col)  # numba may index prange unsigned
+            mid = min(max(idx, 1), size - 2)
+            outs[row, idx] = (
+                rows[row, mid + 1] - 2.0*rows[row, mid] + rows[row, mid - 1]
+            )*ord2_acc2_at(idx, size, inv, edges)
 
-    return np.concatenate(
-        (_derivative0, _derivative, _derivative1)
-    )
+    return out
@@ -0,0 +1,231 @@
+""" conservative finite-volume upwind scheme
+
+    ∂n/∂t + ∂(fn)/∂x = g
+
+    inputs
+    ------
+    init_:  n
+    vars_:  x
+    flux_:  f
+    sink_:  g
+    time_:  Δt
+
+    outputs
+    -------
+    next_:  n
+
+    numerics
+    --------
+    n(j+1, i) = n(j, i) - Δt (F(i+1/2) - F(i-1/2))/Δx(i) + Δt g(j, i)
+
+    F(i+1/2) = max(a, 0) n(i) + min(a, 0) n(i+1)
+
+    n is the average over the cell of x(i) between the faces of
+    the Grid (halfway between neighbours), Δx(i) is its width,
+    and a = (f(i) + f(i+1))/2 is the speed at the face between
+    cells i and i+1 (Godunov upwind flux); nothing flows in
+    through the outer faces, and n leaves through them upwind
+
+    every F(i+1/2) leaves one cell and enters the next, so that
+    sum(n Δx) changes, to machine precision, only by the outflow
+    through the outer faces and by Δt sum(g Δx)
+
+    Δt ≤ λΔx/f ∀ x, fixed from the initial f or adapted to the current f
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import grid_util, snaps_util, steps_util
+from hypersolver.util import term_util, time_step_util
+from hypersolver.util import widths_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util, halt_util
+from hypersolver.util import diags_util, record_util, result_util
+
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
+from hypersolver.adaptive import start_util, clip_util, mark_util
+
+
+@jit(nopython=True)
+def fv_next(init_, vars_, flux_, sink_, time_, out=None, work=None):
+    """ next step according to the finite-volume upwind scheme
+
+        out and work are optional (..., N) and (2, ..., N) buffers
+        to reuse instead of allocating; out must not alias init_
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if out is None:
+        out = np.empty(init_.shape)
+    if work is None:
+        work = np.empty((2,) + init_.shape)
+
+    flux_ = term_util(flux_, init_)
+
+    # F(i+1/2) = (a (n(i) + n(i+1)) + |a| (n(i) - n(i+1)))/2 for
+    # i in 0..N-2 in work[0], with 2a in work[1] and out as scratch
+    np.add(flux_[..., 1:], flux_[..., :-1], work[1, ..., :-1])
+
+    np.add(init_[..., :-1], init_[..., 1:], work[0, ..., :-1])
+    np.multiply(work[0, ..., :-1], work[1, ..., :-1], work[0, ..., :-1])
+
+    np.subtract(init_[..., :-1], init_[..., 1:], out[..., :-1])
+    np.abs(work[1, ..., :-1], work[1, ..., :-1])
+    np.multiply(out[..., :-1], work[1, ..., :-1], out[..., :-1])
+
+    np.add(work[0, ..., :-1], out[..., :-1], work[0, ..., :-1])
+    np.multiply(work[0, ..., :-1], 0.25, work[0, ..., :-1])
+
+    np.subtract(work[0, ..., 1:-1], work[0, ..., :-2], out[..., 1:-1])
+
+    out[..., 0] = work[0, ..., 0] - np.minimum(flux_[..., 0], 0.0) * init_[..., 0]
+    out[..., -1] = np.maximum(flux_[..., -1], 0.0) * init_[..., -1] - work[0, ..., -2]
+
+    np.divide(out, widths_util(vars_), out)
+    np.multiply(sink_, time_, work[1])
+    np.multiply(out, time_, out)
+    np.subtract(work[1], out, out)
+
+    return np.add(out, init_, out)
+
+
+@jit(nopython=True)
+def fv_adapt(
+        time, init_, vars_, _flux_, _sink_, stability,
+        every=1, grow=np.inf, shrink=0.0,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ adaptive loop for fv scheme
+
+        the CFL-limited Δt is recomputed from the current flux
+        every `every` steps (within the `grow` and `shrink` bounds
+        of adapt_util) and clipped to land exactly on each of the
+        requested times, which are all saved until the loop stops
+        early (see lx_loop)
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    tims, sols, _yvar, next_, time_, event_, diag = start_util(
+        time, init_, grid, _flux_, stability, check, event, diags, stats)
+    base, event_ = resume_util(carry, event_)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    work = np.empty((2,) + _yvar.shape)
+    tval = tims[0]
+    itrs = 0
+
+    for save in range(1, tims.size):
+
+        while tval < tims[save]:
+
+            clock = clock_util(stats)
+            flux_ = eval_util(_flux_, _yvar, grid.vars_)
+            sink_ = eval_util(_sink_, _yvar, grid.vars_)
+            clock = clock_util(stats, clock)
+
+            time_, step_ = clip_util(
+                grid, flux_, stability, time_, base + itrs, every, grow, shrink,
+                tims[save] - tval)
+
+            clock = clock_util(stats)
+            fv_next(_yvar, grid, flux_, sink_, step_, next_, work)
+            clock_util(stats, clock, True)
+            count_util(stats, 1, 0, 1, 1)
+
+            tval, stop, event_, diag = mark_util(
+                next_, _yvar, base + itrs, tval, step_, tims[save],
+                halt, check, event, event_, diags, diag, grid)
+            itrs += 1
+
+            _yvar, next_ = next_, _yvar
+
+            if stop:
+                pause_util(carry, base + itrs, event_, True)
+                tims[save], sols[save] = tval, _yvar
+                count_util(stats, saves=1)
+                return result_util(
+                    tims[:save + 1], sols[:save + 1], diags, diag, itrs + 1)
+
+        sols[save] = _yvar
+        count_util(stats, saves=1)
+
+    pause_util(carry, base + itrs, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, itrs + 1)
+
+
+@jit(nopython=True)
+def fv_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        adaptive=0, grow=np.inf, shrink=0.0,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ loop for fv scheme
+
+        takes the arguments of lx_loop; pass vars_ as a Grid to
+        reuse its faces and widths across runs
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    if adaptive > 0:
+        return fv_adapt(
+            time, init_, grid, _flux_, _sink_, stability,
+            adaptive, grow, shrink, halt, check, event, diags, stats, carry)
+
+    time_ = time_step_util(grid, eval_util(_flux_, init_, grid.vars_), stability)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    count_util(stats, fluxes=1)
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    _yvar = sols[0].copy()
+    next_ = np.empty(_yvar.shape)
+    work = np.empty((2,) + _yvar.shape)
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tidx.size, tims[0], _yvar, grid)
+    save = 0
+
+    for itrs in range(tidx[:-1].size):
+
+        clock = clock_util(stats)
+        flux_ = eval_util(_flux_, _yvar, grid.vars_)
+        sink_ = eval_util(_sink_, _yvar, grid.vars_)
+        clock = clock_util(stats, clock)
+
+        fv_next(
+            _yvar, grid, flux_, sink_,
+            tidx[itrs + 1] - tidx[itrs], next_, work)
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 1, 1)
+
+        stop, event_ = halt_util(
+            next_, _yvar, base + itrs, tidx[itrs + 1], tidx[itrs + 1] - tidx[itrs],
+            halt, check, event, event_)
+        diag = record_util(diags, diag, itrs + 1, tidx[itrs + 1], next_, grid)
+
+        if marks[itrs + 1] or stop:
+            save += 1
+            tims[save], sols[save] = tidx[itrs + 1], next_
+            count_util(stats, saves=1)
+
+        if stop:
+            pause_util(carry, base + itrs + 1, event_, True)
+            return result_util(
+                tims[:save + 1], sols[:save + 1], diags, diag, itrs + 2)
+
+        _yvar, next_ = next_, _yvar
+
+    pause_util(carry, base + tidx.size - 1, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, tidx.size)
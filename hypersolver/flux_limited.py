@@ -0,0 +1,254 @@
+""" flux-limited (TVD) finite-volume scheme
+
+    ∂n/∂t + ∂(fn)/∂x = g
+
+    inputs
+    ------
+    init_:  n
+    vars_:  x
+    flux_:  f
+    sink_:  g
+    time_:  Δt
+
+    outputs
+    -------
+    next_:  n
+
+    numerics
+    --------
+    n(j+1, i) = n(j, i) - Δt (F(i+1/2) - F(i-1/2))/Δx(i) + Δt g(j, i)
+
+    F(i+1/2) = q(up) + 0.5 sign(a) (1 - |ν|) φ(r) (q(i+1) - q(i))
+
+    q = fn at the cell centres x, a = (f(i) + f(i+1))/2 at the
+    faces, ν = a Δt/(x(i+1) - x(i)), q(up) the upwind q, and r
+    the ratio of the upwind to the local jump of q; φ = 0 is
+    first-order upwind and φ = 1 is Lax-Wendroff, and the limiters
+    in between keep the scheme total variation diminishing (TVD)
+    for |ν| ≤ 1, so that fronts stay sharp without oscillating
+
+    limiters:
+        - "minmod":     φ = max(0, min(1, r))
+        - "van_leer":   φ = (r + |r|)/(1 + |r|) (default)
+        - "superbee":   φ = max(0, min(2r, 1), min(r, 2))
+
+    Δt ≤ λΔx/f ∀ x, fixed from the initial f or adapted to the current f
+    Δx(i) = (x(i+1) - x(i-1))/2 and the boundary faces carry q(0)
+    and q(N-1) (zero gradient); g is first-order in time
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import grid_util, snaps_util, steps_util
+from hypersolver.util import term_util, time_step_util
+from hypersolver.util import points_util, spans_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util, halt_util
+from hypersolver.util import diags_util, record_util, result_util
+
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
+from hypersolver.adaptive import start_util, clip_util, mark_util
+
+
+@jit(nopython=True)
+def limiter_util(ratio, limiter="van_leer"):
+    """ utility to limit the ratio of successive jumps """
+
+    if limiter == "minmod":
+        return np.maximum(0.0, np.minimum(1.0, ratio))
+
+    if limiter == "van_leer":
+        return (ratio + np.abs(ratio)) / (1.0 + np.abs(ratio))
+
+    if limiter == "superbee":
+        return np.maximum(0.0, np.maximum(
+            np.minimum(2.0 * ratio, 1.0), np.minimum(ratio, 2.0)))
+
+    raise ValueError("limiter not supported")
+
+
+@jit(nopython=True)
+def fl_next(
+        init_, vars_, flux_, sink_, time_, out=None, limiter="van_leer"):
+    """ next step according to the flux-limited finite-volume scheme
+
+        out is an optional (..., N) buffer to write into instead
+        of allocating; out must not alias init_
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    if out is None:
+        out = np.empty(init_.shape)
+
+    xvar = points_util(vars_)
+    inv, edges = spans_util(vars_)
+
+    flux_ = term_util(flux_, init_)
+    sink_ = term_util(sink_, init_)
+
+    fval = init_ * flux_
+    jump = fval[..., 1:] - fval[..., :-1]
+    face = 0.5 * (flux_[..., 1:] + flux_[..., :-1])
+
+    # jump upwind of each face, zero beyond the boundaries
+    wind = np.zeros(jump.shape)
+    wind[..., 1:] = jump[..., :-1]
+    back = np.zeros(jump.shape)
+    back[..., :-1] = jump[..., 1:]
+    wind = np.where(face >= 0.0, wind, back)
+
+    phi = limiter_util(wind * jump / (jump * jump + 1e-300), limiter)
+    courant = np.abs(face) * time_ / (xvar[1:] - xvar[:-1])
+
+    faces = np.where(face >= 0.0, fval[..., :-1], fval[..., 1:]) + (
+        0.5 * np.sign(face) * (1.0 - courant) * phi * jump)
+
+    out[..., 1:-1] = init_[..., 1:-1] - time_ * 2.0 * inv * (
+        faces[..., 1:] - faces[..., :-1])
+    out[..., 0] = init_[..., 0] - time_ * edges[0] * (
+        faces[..., 0] - fval[..., 0])
+    out[..., -1] = init_[..., -1] - time_ * edges[1] * (
+        fval[..., -1] - faces[..., -1])
+
+    return np.add(out, time_ * sink_, out)
+
+
+@jit(nopython=True)
+def fl_adapt(
+        time, init_, vars_, _flux_, _sink_, stability,
+        every=1, grow=np.inf, shrink=0.0,
+        limiter="van_leer",
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ adaptive loop for fl scheme
+
+        the CFL-limited Δt is recomputed from the current flux
+        every `every` steps (within the `grow` and `shrink` bounds
+        of adapt_util) and clipped to land exactly on each of the
+        requested times, which are all saved until the loop stops
+        early (see lx_loop)
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    tims, sols, _yvar, next_, time_, event_, diag = start_util(
+        time, init_, grid, _flux_, stability, check, event, diags, stats)
+    base, event_ = resume_util(carry, event_)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    tval = tims[0]
+    itrs = 0
+
+    for save in range(1, tims.size):
+
+        while tval < tims[save]:
+
+            clock = clock_util(stats)
+            flux_ = eval_util(_flux_, _yvar, grid.vars_)
+            sink_ = eval_util(_sink_, _yvar, grid.vars_)
+            clock = clock_util(stats, clock)
+
+            time_, step_ = clip_util(
+                grid, flux_, stability, time_, base + itrs, every, grow, shrink,
+                tims[save] - tval)
+
+            clock = clock_util(stats)
+            fl_next(_yvar, grid, flux_, sink_, step_, next_, limiter)
+            clock_util(stats, clock, True)
+            count_util(stats, 1, 0, 1, 1)
+
+            tval, stop, event_, diag = mark_util(
+                next_, _yvar, base + itrs, tval, step_, tims[save],
+                halt, check, event, event_, diags, diag, grid)
+            itrs += 1
+
+            _yvar, next_ = next_, _yvar
+
+            if stop:
+                pause_util(carry, base + itrs, event_, True)
+                tims[save], sols[save] = tval, _yvar
+                count_util(stats, saves=1)
+                return result_util(
+                    tims[:save + 1], sols[:save + 1], diags, diag, itrs + 1)
+
+        sols[save] = _yvar
+        count_util(stats, saves=1)
+
+    pause_util(carry, base + itrs, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, itrs + 1)
+
+
+@jit(nopython=True)
+def fl_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        adaptive=0, grow=np.inf, shrink=0.0,
+        limiter="van_leer", halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ loop for fl scheme
+
+        takes the arguments of lx_loop and the `limiter`;
+        stability must not exceed 1 for the scheme to be TVD
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    if adaptive > 0:
+        return fl_adapt(
+            time, init_, grid, _flux_, _sink_, stability,
+            adaptive, grow, shrink, limiter, halt, check, event, diags, stats, carry)
+
+    time_ = time_step_util(grid, eval_util(_flux_, init_, grid.vars_), stability)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    count_util(stats, fluxes=1)
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    _yvar = sols[0].copy()
+    next_ = np.empty(_yvar.shape)
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tidx.size, tims[0], _yvar, grid)
+    save = 0
+
+    for itrs in range(tidx[:-1].size):
+
+        clock = clock_util(stats)
+        flux_ = eval_util(_flux_, _yvar, grid.vars_)
+        sink_ = eval_util(_sink_, _yvar, grid.vars_)
+        clock = clock_util(stats, clock)
+
+        fl_next(
+            _yvar, grid, flux_, sink_,
+            tidx[itrs + 1] - tidx[itrs], next_, limiter)
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 1, 1)
+
+        stop, event_ = halt_util(
+            next_, _yvar, base + itrs, tidx[itrs + 1], tidx[itrs + 1] - tidx[itrs],
+            halt, check, event, event_)
+        diag = record_util(diags, diag, itrs + 1, tidx[itrs + 1], next_, grid)
+
+        if marks[itrs + 1] or stop:
+            save += 1
+            tims[save], sols[save] = tidx[itrs + 1], next_
+            count_util(stats, saves=1)
+
+        if stop:
+            pause_util(carry, base + itrs + 1, event_, True)
+            return result_util(
+                tims[:save + 1], sols[:save + 1], diags, diag, itrs + 2)
+
+        _yvar, next_ = next_, _yvar
+
+    pause_util(carry, base + tidx.size - 1, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, tidx.size)
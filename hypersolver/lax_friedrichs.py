@@ -18,59 +18,242 @@
     --------
     n(j+1, i) = n(j, i) + Δt (g - Δ(fn)/Δx)(j, i)
 
-    Δt ≤ λΔx/f ∀ x
+    Δt ≤ λΔx/f ∀ x, fixed from the initial f or adapted to the current f
     Δ(fn)/Δx is first-order derivative with accuracy of 2
     n(j, i) = (n(j, i-1) + n(j, i+1))/2
 
+    lx_next_par is lx_next fused into one pass over the grid and
+    split across threads, swapped in with parallel=True on numba
+
 """
 
 from hypersolver.util import xnp as np
 from hypersolver.util import jxt as jit
+from hypersolver.util import pxt, prange
+from hypersolver.util import grid_util, snaps_util, steps_util
 from hypersolver.util import time_step_util
+from hypersolver.util import rows_util, spacing_util, spans_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util, halt_util
+from hypersolver.util import diags_util, record_util, result_util
 
-from hypersolver.derivative import ord1_acc2
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
+from hypersolver.adaptive import start_util, clip_util, mark_util
+from hypersolver.derivative import ord1_acc2, ord1_acc2_at
 
 
 @jit(nopython=True)
-def lx_next(init_, vars_, flux_, sink_, time_):
-    """ next step according to Lax-Friedrics finite-difference scheme """
+def lx_next(init_, vars_, flux_, sink_, time_, out=None, work=None):
+    """ next step according to Lax-Friedrics finite-difference scheme
+
+        out and work are optional (..., N) and (2, ..., N) buffers
+        to reuse instead of allocating; out must not alias init_
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if out is None:
+        out = np.empty(init_.shape)
+    if work is None:
+        work = np.empty((2,) + init_.shape)
+
+    np.add(init_[..., 2:], init_[..., :-2], out[..., 1:-1])
+    np.multiply(out[..., 1:-1], 0.5, out[..., 1:-1])
+
+    out[..., 0] = 0.5 * (init_[..., 1] + init_[..., 0])
+    out[..., -1] = 0.5 * (init_[..., -1] + init_[..., -2])
+
+    np.multiply(init_, flux_, work[0])
+    ord1_acc2(work[0], vars_, work[1])
+
+    np.subtract(work[1], sink_, work[1])
+    np.multiply(work[1], time_, work[1])
+
+    return np.subtract(out, work[1], out)
+
+
+@pxt(lx_next)
+@jit(nopython=True, parallel=True)
+def lx_next_par(init_, vars_, flux_, sink_, time_, out=None, work=None):
+    """ next step according to Lax-Friedrics, in one threaded pass
 
-    _init_ = np.concatenate((
-        np.asarray([0.5 * (init_[1] + init_[0])]),
-        np.asarray((0.5 * (init_[2:] + init_[:-2]))),
-        np.asarray([0.5 * (init_[-1] + init_[-2])])
-    ))
+        same as lx_next into C-contiguous out; work holds f and g
+        when they need broadcasting to the shape of init_
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
 
-    return _init_ - time_ * (ord1_acc2(init_*flux_, vars_) - sink_)
+    if out is None:
+        out = np.empty(init_.shape)
+    if work is None:
+        work = np.empty((2,) + init_.shape)
+
+    inv, edges = spans_util(vars_)
+
+    size = init_.shape[-1]
+    rows = np.ascontiguousarray(init_).reshape(-1, size)
+    outs = out.reshape(-1, size)
+    flux = rows_util(flux_, init_, work[0])
+    sink = rows_util(sink_, init_, work[1])
+    inv = spacing_util(inv)
+
+    for row in range(rows.shape[0]):
+        for col in prange(size):
+            idx = np.int64(col)  # numba may index prange unsigned
+            left, right = max(idx - 1, 0), min(idx + 1, size - 1)
+
+            outs[row, idx] = 0.5 * (rows[row, left] + rows[row, right]) - time_ * ((
+                rows[row, right] * flux[row, right] - rows[row, left] * flux[row, left]
+            ) * ord1_acc2_at(idx, size, inv, edges) - sink[row, idx])
+
+    return out
 
 
 @jit(nopython=True)
-def lx_loop(time, init_, vars_, _flux_, _sink_, stability):
-    """ loop for lx scheme """
+def lx_adapt(
+        time, init_, vars_, _flux_, _sink_, stability,
+        every=1, grow=np.inf, shrink=0.0,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ adaptive loop for lx scheme
+
+        the CFL-limited Δt is recomputed from the current flux
+        every `every` steps (within the `grow` and `shrink` bounds
+        of adapt_util) and clipped to land exactly on each of the
+        requested times, which are all saved until the loop stops
+        early (see lx_loop)
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    tims, sols, _yvar, next_, time_, event_, diag = start_util(
+        time, init_, grid, _flux_, stability, check, event, diags, stats)
+    base, event_ = resume_util(carry, event_)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    work = np.empty((2,) + _yvar.shape)
+    tval = tims[0]
+    itrs = 0
+
+    for save in range(1, tims.size):
+
+        while tval < tims[save]:
 
-    time_ = time_step_util(vars_, _flux_(init_, vars_), stability)
+            clock = clock_util(stats)
+            flux_ = eval_util(_flux_, _yvar, grid.vars_)
+            sink_ = eval_util(_sink_, _yvar, grid.vars_)
+            clock = clock_util(stats, clock)
 
-    tidx = np.arange(time[0], time[-1] + time_, time_)
+            time_, step_ = clip_util(
+                grid, flux_, stability, time_, base + itrs, every, grow, shrink,
+                tims[save] - tval)
 
-    pts = np.asarray((tidx.size+1., np.asarray(time).size+100., 100.)).min()//1
-    sols = np.asarray(init_).reshape(1, -1)
-    tims = np.asarray(tidx[0]).reshape(1, -1)
+            clock = clock_util(stats)
+            lx_next(_yvar, grid, flux_, sink_, step_, next_, work)
+            clock_util(stats, clock, True)
+            count_util(stats, 1, 0, 1, 1)
 
-    _yvar = sols[0]
+            tval, stop, event_, diag = mark_util(
+                next_, _yvar, base + itrs, tval, step_, tims[save],
+                halt, check, event, event_, diags, diag, grid)
+            itrs += 1
+
+            _yvar, next_ = next_, _yvar
+
+            if stop:
+                pause_util(carry, base + itrs, event_, True)
+                tims[save], sols[save] = tval, _yvar
+                count_util(stats, saves=1)
+                return result_util(
+                    tims[:save + 1], sols[:save + 1], diags, diag, itrs + 1)
+
+        sols[save] = _yvar
+        count_util(stats, saves=1)
+
+    pause_util(carry, base + itrs, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, itrs + 1)
+
+
+@jit(nopython=True)
+def lx_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        adaptive=0, grow=np.inf, shrink=0.0,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ loop for lx scheme
+
+        the loop stops early, with the state and time it stopped
+        at as the last snapshot, once the relative rate of change
+        of n falls to `halt` (checked every `check` steps) or
+        event(t, n) changes sign (see halt_util)
+
+        with diags=True, the times of the initial state and of
+        every step and the (k, ..., 5) moments_util of n at each
+        follow the snapshots, for monitoring the mass, the first
+        moment, the range and the sign of n without saving it
+
+        stats, if given as counters_util(), keeps the counters
+        and timers of the loop (see Stats), and carry, if given
+        as carry_util(), what the loop goes on from at the next
+        interval of a stream (see stream.py)
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    if adaptive > 0:
+        return lx_adapt(
+            time, init_, grid, _flux_, _sink_, stability,
+            adaptive, grow, shrink, halt, check, event, diags, stats, carry)
+
+    time_ = time_step_util(grid, eval_util(_flux_, init_, grid.vars_), stability)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    count_util(stats, fluxes=1)
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    _yvar = sols[0].copy()
+    next_ = np.empty(_yvar.shape)
+    work = np.empty((2,) + _yvar.shape)
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tidx.size, tims[0], _yvar, grid)
+    save = 0
 
     for itrs in range(tidx[:-1].size):
 
-        next_ = lx_next(
-            _yvar, vars_,
-            _flux_(_yvar, vars_), _sink_(_yvar, vars_),
-            tidx[itrs + 1] - tidx[itrs])
+        clock = clock_util(stats)
+        flux_ = eval_util(_flux_, _yvar, grid.vars_)
+        sink_ = eval_util(_sink_, _yvar, grid.vars_)
+        clock = clock_util(stats, clock)
+
+        lx_next(
+            _yvar, grid, flux_, sink_,
+            tidx[itrs + 1] - tidx[itrs], next_, work)
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 1, 1)
+
+        stop, event_ = halt_util(
+            next_, _yvar, base + itrs, tidx[itrs + 1], tidx[itrs + 1] - tidx[itrs],
+            halt, check, event, event_)
+        diag = record_util(diags, diag, itrs + 1, tidx[itrs + 1], next_, grid)
+
+        if marks[itrs + 1] or stop:
+            save += 1
+            tims[save], sols[save] = tidx[itrs + 1], next_
+            count_util(stats, saves=1)
 
-        if ((itrs + 1) % (tidx.size//pts)) == 0:
-            sols = np.concatenate(
-                (sols, np.asarray(next_).reshape(1, -1)), axis=0)
-            tims = np.concatenate(
-                (tims, np.asarray(tidx[itrs]).reshape(1, -1)), axis=0)
+        if stop:
+            pause_util(carry, base + itrs + 1, event_, True)
+            return result_util(
+                tims[:save + 1], sols[:save + 1], diags, diag, itrs + 2)
 
-        _yvar = next_
+        _yvar, next_ = next_, _yvar
 
-    return tims, sols
+    pause_util(carry, base + tidx.size - 1, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, tidx.size)
@@ -25,74 +25,304 @@
             + Δg/Δt
         )(j)
 
-    Δt ≤ λΔx/f ∀ x
+    Δt ≤ λΔx/f ∀ x, fixed from the initial f or adapted to the current f
     Δ(s)/Δx is first-order derivative with accuracy of 2
     Δ(s)^/Δx^2 is second-order derivative with accuracy of 2
     n(j, i) =? (n(j, i-1) + n(j, i+1))/2
 
+    lw_next_par is lw_next fused into one pass over the grid and
+    split across threads, swapped in with parallel=True on numba
+
 """
 
 from hypersolver.util import jxt as jit
 from hypersolver.util import xnp as np
+from hypersolver.util import pxt, prange
+from hypersolver.util import grid_util, snaps_util, steps_util
 from hypersolver.util import term_util, time_step_util
+from hypersolver.util import rows_util, spacing_util, spans_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util, halt_util
+from hypersolver.util import diags_util, record_util, result_util
 
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
+from hypersolver.adaptive import start_util, clip_util, mark_util
 from hypersolver.derivative import ord1_acc2, ord2_acc2
+from hypersolver.derivative import ord1_acc2_at, ord2_acc2_at
 
 
 @jit(nopython=True)
-def lw_next(init_, vars_, flux_, sink_, time_):
-    """ next step according to Lax-Friedrics finite-difference scheme """
+def lw_next(init_, vars_, flux_, sink_, time_, out=None, work=None):
+    """ next step according to Lax-Friedrics finite-difference scheme
+
+        out and work are optional (..., N) and (3, ..., N) buffers
+        to reuse instead of allocating; out must not alias init_
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if out is None:
+        out = np.empty(init_.shape)
+    if work is None:
+        work = np.empty((3,) + init_.shape)
 
     flux_ = term_util(flux_, init_)
 
-    sink_ = (term_util(sink_[0], vars_), term_util(sink_[1], vars_))
+    sink_ = (term_util(sink_[0], init_), term_util(sink_[1], init_))
+
+    # (g - Δ(fn)/Δx) (1 - 0.5 Δt Δf/Δx) Δt
+    np.multiply(init_, flux_, work[0])
+    ord1_acc2(work[0], vars_, work[1])
+    np.subtract(sink_[1], work[1], work[1])
+
+    ord1_acc2(flux_, vars_, work[0])
+    np.multiply(work[0], -0.5 * time_**2, work[0])
+    np.add(work[0], time_, work[0])
+    np.multiply(work[1], work[0], work[1])
+
+    # - 0.5 (Δt)^2 f (Δg/Δx - Δf^2/Δx^2)
+    ord1_acc2(sink_[1], vars_, work[0])
+    ord2_acc2(flux_, vars_, work[2])
+    np.subtract(work[0], work[2], work[0])
+    np.multiply(work[0], flux_, work[0])
+    np.multiply(work[0], -0.5 * time_**2, work[0])
+    np.add(work[1], work[0], work[1])
+
+    # n + 0.5 Δt Δg + ...
+    np.subtract(sink_[1], sink_[0], out)
+    np.multiply(out, 0.5 * time_, out)
+    np.add(out, init_, out)
+
+    return np.add(out, work[1], out)
+
+
+@pxt(lw_next)
+@jit(nopython=True, parallel=True)
+def lw_next_par(init_, vars_, flux_, sink_, time_, out=None, work=None):
+    """ next step according to Lax-Wendroff, in one threaded pass
+
+        same as lw_next into C-contiguous out; work holds f and
+        both g when they need broadcasting to the shape of init_
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    if out is None:
+        out = np.empty(init_.shape)
+    if work is None:
+        work = np.empty((3,) + init_.shape)
 
-    return init_ + time_ * (
-        sink_[1] - ord1_acc2(init_*flux_, vars_)
-    ) + 0.5 * time_**2 * (
-        -1.0 * ord1_acc2(flux_, vars_)*(
-            -1.0 * ord1_acc2(init_*flux_, vars_) +
-            sink_[1]
-        ) - flux_ * (
-            -1.0*ord2_acc2(flux_, vars_) +
-            ord1_acc2(sink_[1], vars_)
-        ) + (sink_[1] - sink_[0])/time_
-    )
+    inv1, edges = spans_util(vars_)
+    inv2 = spans_util(vars_, 1, 2)[0]
+
+    size = init_.shape[-1]
+    rows = np.ascontiguousarray(init_).reshape(-1, size)
+    outs = out.reshape(-1, size)
+    flux = rows_util(flux_, init_, work[0])
+    sink0 = rows_util(sink_[0], init_, work[1])
+    sink1 = rows_util(sink_[1], init_, work[2])
+    inv1, inv2 = spacing_util(inv1), spacing_util(inv2)
+
+    for row in range(rows.shape[0]):
+        for col in prange(size):
+            idx = np.int64(col)  # numba may index prange unsigned
+            left, right = max(idx - 1, 0), min(idx + 1, size - 1)
+            mid = min(max(idx, 1), size - 2)
+            wgt1 = ord1_acc2_at(idx, size, inv1, edges)
+            wgt2 = ord2_acc2_at(idx, size, inv2, edges)
+
+            dnf = (rows[row, right] * flux[row, right] - rows[row, left] * flux[row, left]) * wgt1
+            dff = (flux[row, right] - flux[row, left]) * wgt1
+            dgg = (sink1[row, right] - sink1[row, left]) * wgt1
+            d2f = (flux[row, mid + 1] - 2.0 * flux[row, mid] + flux[row, mid - 1]) * wgt2
+
+            outs[row, idx] = (
+                rows[row, idx]
+                + 0.5 * time_ * (sink1[row, idx] - sink0[row, idx])
+                + (sink1[row, idx] - dnf) * (time_ - 0.5 * time_**2 * dff)
+                - 0.5 * time_**2 * flux[row, idx] * (dgg - d2f)
+            )
+
+    return out
 
 
 @jit(nopython=True)
-def lw_loop(time, init_, vars_, _flux_, _sink_, stability):
-    """ loop for lw scheme """
+def lw_adapt_next(init_, vars_, flux_, sink_, time_, out, keep):
+    """ next step according to lw scheme for lw_adapt
+
+        keep holds the (3, ..., N) work buffer of lw_next, g of
+        the previous step and its Δt; Δg/Δt is rescaled to the
+        current Δt when Δt changes, and is 0 at the first step
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    work, _sink1, last = keep
+    _sink2 = term_util(sink_, init_)
+
+    if last[0] == 0.0:
+        _sink1[...] = _sink2
+    elif time_ != last[0]:
+        _sink1[...] = _sink2 - (_sink2 - _sink1) * (time_ / last[0])
+
+    lw_next(init_, vars_, flux_, (_sink1, _sink2), time_, out, work)
+
+    _sink1[...] = _sink2
+    last[0] = time_
+
+    return out
+
+
+@jit(nopython=True)
+def lw_adapt(
+        time, init_, vars_, _flux_, _sink_, stability,
+        every=1, grow=np.inf, shrink=0.0,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ adaptive loop for lw scheme
+
+        the CFL-limited Δt is recomputed from the current flux
+        every `every` steps (within the `grow` and `shrink` bounds
+        of adapt_util) and clipped to land exactly on each of the
+        requested times, which are all saved until the loop stops
+        early (see lx_loop), with Δg/Δt
+        rescaled to each Δt as in lw_adapt_next
+    """
     # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    tims, sols, _yvar, next_, time_, event_, diag = start_util(
+        time, init_, grid, _flux_, stability, check, event, diags, stats)
+    base, event_ = resume_util(carry, event_)
+    state = fetch_util(carry, 1, np.array([time_, 0.0]))
+    time_ = state[0]
+    keep = (
+        np.empty((3,) + _yvar.shape),
+        fetch_util(carry, 2, np.empty(_yvar.size)).reshape(_yvar.shape), state[1:].copy())
+    tval = tims[0]
+    itrs = 0
+
+    for save in range(1, tims.size):
+
+        while tval < tims[save]:
+
+            clock = clock_util(stats)
+            flux_ = eval_util(_flux_, _yvar, grid.vars_)
+            sink_ = eval_util(_sink_, _yvar, grid.vars_)
+            clock = clock_util(stats, clock)
 
-    time_ = time_step_util(vars_, _flux_(init_, vars_), stability)
+            time_, step_ = clip_util(
+                grid, flux_, stability, time_, base + itrs, every, grow, shrink,
+                tims[save] - tval)
 
-    tidx = np.arange(time[0], time[-1] + time_, time_)
+            clock = clock_util(stats)
+            lw_adapt_next(_yvar, grid, flux_, sink_, step_, next_, keep)
+            clock_util(stats, clock, True)
+            count_util(stats, 1, 0, 1, 1)
 
-    pts = np.asarray((tidx.size+1., np.asarray(time).size+100., 100.)).min()//1
-    sols = np.asarray(init_).reshape(1, -1)
-    tims = np.asarray(tidx[0]).reshape(1, -1)
+            tval, stop, event_, diag = mark_util(
+                next_, _yvar, base + itrs, tval, step_, tims[save],
+                halt, check, event, event_, diags, diag, grid)
+            itrs += 1
 
-    _sink1 = _sink_(init_, vars_).reshape(vars_.shape)
-    _sink2 = _sink_(init_, vars_).reshape(vars_.shape)
+            _yvar, next_ = next_, _yvar
+
+            if stop:
+                pause_util(carry, base + itrs, event_, True)
+                tims[save], sols[save] = tval, _yvar
+                count_util(stats, saves=1)
+                return result_util(
+                    tims[:save + 1], sols[:save + 1], diags, diag, itrs + 1)
+
+        sols[save] = _yvar
+        count_util(stats, saves=1)
+
+    pause_util(carry, base + itrs, event_, False)
+    keep_util(carry, 1, np.array([time_, keep[2][0]]))
+    keep_util(carry, 2, keep[1])
+    return result_util(tims, sols, diags, diag, itrs + 1)
+
+
+@jit(nopython=True)
+def lw_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        adaptive=0, grow=np.inf, shrink=0.0,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ loop for lw scheme
 
-    _yvar = sols[0]
+        takes the arguments of lx_loop, and stops early as it does
+
+        stats, if given as counters_util(), keeps the counters
+        and timers of the loop (see Stats)
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    if adaptive > 0:
+        return lw_adapt(
+            time, init_, grid, _flux_, _sink_, stability,
+            adaptive, grow, shrink, halt, check, event, diags, stats, carry)
+
+    time_ = time_step_util(grid, eval_util(_flux_, init_, grid.vars_), stability)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    count_util(stats, fluxes=1, sinks=1)
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    _sink1 = term_util(eval_util(_sink_, init_, grid.vars_), sols[0])
+    _sink2 = _sink1
+    _sink1 = term_util(fetch_util(carry, 2, _sink1.flatten()).reshape(_sink1.shape), sols[0])
+
+    _yvar = sols[0].copy()
+    next_ = np.empty(_yvar.shape)
+    work = np.empty((3,) + _yvar.shape)
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tidx.size, tims[0], _yvar, grid)
+    save = 0
 
     for itrs in range(tidx[:-1].size):
 
-        next_ = lw_next(
-            _yvar, vars_,
-            _flux_(_yvar, vars_), (_sink1, _sink2),
-            tidx[itrs + 1] - tidx[itrs])
+        clock = clock_util(stats)
+        flux_ = eval_util(_flux_, _yvar, grid.vars_)
+        clock = clock_util(stats, clock)
+
+        lw_next(
+            _yvar, grid, flux_, (_sink1, _sink2),
+            tidx[itrs + 1] - tidx[itrs], next_, work)
+        clock = clock_util(stats, clock, True)
+
+        stop, event_ = halt_util(
+            next_, _yvar, base + itrs, tidx[itrs + 1], tidx[itrs + 1] - tidx[itrs],
+            halt, check, event, event_)
+        diag = record_util(diags, diag, itrs + 1, tidx[itrs + 1], next_, grid)
+
+        if marks[itrs + 1] or stop:
+            save += 1
+            tims[save], sols[save] = tidx[itrs + 1], next_
+            count_util(stats, saves=1)
 
-        if ((itrs + 1) % (tidx.size//pts)) == 0:
-            sols = np.concatenate(
-                (sols, np.asarray(next_).reshape(1, -1)), axis=0)
-            tims = np.concatenate(
-                (tims, np.asarray(tidx[itrs]).reshape(1, -1)), axis=0)
+        if stop:
+            pause_util(carry, base + itrs + 1, event_, True)
+            count_util(stats, 1, 0, 1)
+            return result_util(
+                tims[:save + 1], sols[:save + 1], diags, diag, itrs + 2)
 
-        _yvar = next_
+        clock = clock_util(stats)
         _sink1 = _sink2
-        _sink2 = _sink_(next_, _yvar).reshape(vars_.shape)
+        _sink2 = term_util(eval_util(_sink_, next_, grid.vars_), next_)
+        clock_util(stats, clock)
+        count_util(stats, 1, 0, 1, 1)
+        _yvar, next_ = next_, _yvar
 
-    return tims, sols
+    pause_util(carry, base + tidx.size - 1, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    keep_util(carry, 2, _sink1)
+    return result_util(tims, sols, diags, diag, tidx.size)
@@ -0,0 +1,365 @@
+""" precomputed linear-operator mode for steady f and affine g
+
+    ∂n/∂t + ∂(fn)/∂x = g
+
+    inputs
+    ------
+    init_:  n
+    vars_:  x
+    flux_:  f
+    sink_:  g
+    time_:  Δt
+
+    outputs
+    -------
+    next_:  n
+
+    numerics
+    --------
+    n(j+1) = A n(j) + c
+
+    when f depends on x only and g = k n + s is affine in n (and
+    local, k and s depending on x only), a step of lax_friedrichs
+    or lax_wendroff is a fixed banded map A plus a fixed c; both
+    are found once by stepping a few comb-shaped probes of n
+    through the 1-D scheme itself (lx_next or lw_next), so that
+    every later step is a banded mat-vec, O(5N), without calls to
+    f or g nor the stencil overhead
+
+    f is checked to not depend on n, by comparing f(n0, x) with
+    f(n0 + 1, x), unless declared with set_term(f, "space"), and
+    g to be affine in n, by comparing g(n0 + 1, x) - g(n0, x)
+    with k = g(1, x) - g(0, x) (affine_util)
+
+    the Δg/Δt term of lax_wendroff is left out (as in
+    strang_splitting), since it ties each step to the one before;
+    lax_wendroff here is only second-order in time where g does
+    not change with t (g of x only, or k = 0 and n steady)
+
+    with `jump`, the m steps between two saved times are taken at
+    once (leap_util): the bands of A^m and its c are formed by
+    repeated squaring (power_util) and kept for the next jump of
+    m steps, where that takes fewer multiply-adds than m banded
+    mat-vecs (jump_util), and the m mat-vecs are taken otherwise;
+    the bands of A^m widen by 4 with each step until they span
+    x, so squaring only pays once m is large against N^2 (small
+    x, long times between saves), and jump stays O(5N) per step
+    and memory for N up to 1e6 otherwise
+
+    Δt ≤ λΔx/f ∀ x, fixed from f as with lx_loop
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import grid_util, snaps_util, steps_util
+from hypersolver.util import time_step_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util
+
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
+from hypersolver.strang_splitting import sweep_util
+
+
+@jit(nopython=True)
+def operator_util(vars_, flux_, _sink_, time_, scheme="lax_friedrichs"):
+    """ utility to assemble the (5, N) bands of A and c of one step
+
+        bands[k, i] is A(i, i+k-2); probe p of n is 1 at every
+        fifth point from p, such that the rows of A it touches
+        do not overlap and A is found with six steps in all;
+        a batch shares the A and c of f of its first row
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    _grid = grid_util(vars_)
+
+    size = _grid.vars_.size
+    rows = np.arange(size)
+    flux_ = np.ascontiguousarray(np.ones(size) * flux_).reshape(-1, size)[0]
+
+    probe = np.zeros(size)
+    offset = sweep_util(
+        probe, _grid, flux_, eval_util(_sink_, probe, _grid.vars_), time_, scheme)
+
+    bands = np.zeros((5, size))
+
+    for color in range(5):
+        probe = 1.0 * (rows % 5 == color)
+        step = sweep_util(
+            probe, _grid, flux_, eval_util(_sink_, probe, _grid.vars_), time_, scheme) - offset
+
+        for band in range(5):
+            cols = rows + band - 2
+            mask = (cols >= 0) & (cols < size) & (cols % 5 == color)
+            bands[band] = np.where(mask, step, bands[band])
+
+    return bands, offset
+
+
+@jit(nopython=True)
+def affine_util(_sink_, init_, vars_):
+    """ utility to check that g is affine in n
+
+        raises a ValueError unless g(n0 + 1) - g(n0) is k =
+        g(1) - g(0) at every x, up to rounding
+    """
+
+    size = vars_.vars_.size
+    zeros, ones = np.zeros(size), np.ones(size)
+
+    rate = eval_util(_sink_, ones, vars_.vars_) - eval_util(_sink_, zeros, vars_.vars_)
+    sink0 = eval_util(_sink_, np.asarray(init_), vars_.vars_)
+    sink1 = eval_util(_sink_, np.asarray(init_) + 1.0, vars_.vars_)
+
+    if (np.abs(sink1 - sink0 - rate) > 1e-9 * (
+            np.abs(sink0) + np.abs(sink1) + np.abs(rate) + 1.0)).any():
+        raise ValueError("g must be affine in n (see set_term)")
+
+
+@jit(nopython=True)
+def apply_util(bands, offset, init_, out=None, work=None):
+    """ utility to step n as A n + c with the bands of A
+
+        bands has 2w + 1 rows for A of half-width w, bands[k, i]
+        being A(i, i+k-w); out and work are optional buffers
+        shaped like init_ to reuse instead of allocating; out
+        must not alias init_
+    """
+
+    if out is None:
+        out = np.empty(init_.shape)
+    if work is None:
+        work = np.empty(init_.shape)
+
+    size = init_.shape[-1]
+    width = bands.shape[0] // 2
+
+    np.multiply(init_, bands[width], out)
+    np.add(out, offset, out)
+
+    for band in range(bands.shape[0]):
+        shift = band - width
+        if shift == 0:
+            continue
+        low, high = max(0, -shift), size - max(0, shift)
+        np.multiply(
+            init_[..., low + shift:high + shift], bands[band, low:high], work[..., low:high])
+        np.add(out[..., low:high], work[..., low:high], out[..., low:high])
+
+    return out
+
+
+@jit(nopython=True)
+def jump_util(bands, offset, init_, steps):
+    """ utility to take `steps` steps of A n + c at once
+
+        as repeated banded mat-vecs (apply_util) between two
+        buffers, without forming A^m
+    """
+
+    _yvar = np.asarray(init_).copy()
+    next_ = np.empty(_yvar.shape)
+    work = np.empty(_yvar.shape)
+
+    for _ in range(steps):
+        apply_util(bands, offset, _yvar, next_, work)
+        _yvar, next_ = next_, _yvar
+
+    return _yvar
+
+
+@jit(nopython=True)
+def compose_util(bands, offset, _bands, _offset):
+    """ utility to compose A n + c after B n + d
+
+        returns the bands of A B, of half-width up to N - 1, and
+        A d + c
+    """
+
+    size = bands.shape[1]
+    width, _width = bands.shape[0] // 2, _bands.shape[0] // 2
+    joint = min(width + _width, size - 1)
+
+    out = np.zeros((2 * joint + 1, size))
+
+    for shift in range(-width, width + 1):
+        low, high = max(0, -shift), size - max(0, shift)
+        for _shift in range(-_width, _width + 1):
+            if abs(shift + _shift) <= joint:
+                out[shift + _shift + joint, low:high] += bands[
+                    shift + width, low:high] * _bands[_shift + _width, low + shift:high + shift]
+
+    return out, apply_util(bands, offset, _offset)
+
+
+@jit(nopython=True)
+def power_util(bands, offset, steps):
+    """ utility to form `steps` steps of A n + c as one, A^m n + c_m
+
+        by repeated squaring, in about 2 log2(m) compose_util
+    """
+
+    size = bands.shape[1]
+    power, rest = (np.ones((1, size)), np.zeros(size)), steps
+
+    while rest > 0:
+        if rest % 2 == 1:
+            power = compose_util(bands, offset, power[0], power[1])
+        rest //= 2
+        if rest > 0:
+            bands, offset = compose_util(bands, offset, bands, offset)
+
+    return power
+
+
+@jit(nopython=True)
+def squares_util(width, size, steps):
+    """ utility to count the multiply-adds of power_util
+
+        for A of half-width w, as the products of the band counts
+        it composes times N, mirroring its widths of up to N - 1
+    """
+
+    joint, rest, count = 0, steps, 0
+
+    while rest > 0:
+        if rest % 2 == 1:
+            count += (2 * width + 1) * (2 * joint + 1)
+            joint = min(width + joint, size - 1)
+        rest //= 2
+        if rest > 0:
+            count += (2 * width + 1)**2
+            width = min(2 * width, size - 1)
+
+    return count * size
+
+
+@jit(nopython=True)
+def leap_util(bands, offset, init_, steps, power):
+    """ utility to take the `steps` steps of a jump at once
+
+        with the kept power, the (bands, c, m) of A^m n + c_m,
+        when m matches, with a power formed anew (power_util)
+        when that takes fewer multiply-adds than the m banded
+        mat-vecs of jump_util, or with jump_util otherwise;
+        returns n and the power to keep
+    """
+
+    width, size = bands.shape[0] // 2, bands.shape[1]
+
+    if steps != power[2] and squares_util(width, size, steps) < (
+            2 * width + 1) * steps * size:
+        power = power_util(bands, offset, steps) + (steps,)
+
+    if steps > 0 and steps == power[2]:
+        return apply_util(power[0], power[1], init_), power
+
+    return jump_util(bands, offset, init_, steps), power
+
+
+@jit(nopython=True)
+def held_util(carry, size, time_):
+    """ utility to take back what lo_loop kept in a carry
+
+        returns Δt, the Δt of A and c, A, c and the kept power
+        (see leap_util), or Δt, 0 and none of A yet at the first
+        interval of a stream or without one
+    """
+
+    state = fetch_util(carry, 1, np.array([time_, 0.0, 0.0]))
+    bands = fetch_util(carry, 2, np.zeros(5 * size)).reshape(-1, size)
+    offset = fetch_util(carry, 3, np.zeros(size))
+    power = (
+        fetch_util(carry, 4, bands.ravel()).reshape(-1, size),
+        fetch_util(carry, 5, offset), int(state[2]))
+
+    return state[0], state[1], bands, offset, power
+
+
+@jit(nopython=True)
+def lo_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        scheme="lax_friedrichs", jump=False, stats=None, carry=None):
+    """ loop for lo mode
+
+        takes the arguments of lx_loop without adaptive stepping,
+        the 1-D `scheme`, and whether to `jump` between the saved
+        times; f and g are only called to assemble A and c, which
+        are assembled anew only when Δt changes; raises a
+        ValueError if f depends on n or g is not affine in n, and
+        drops the Δg/Δt term of lax_wendroff (see above)
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    flux_ = eval_util(_flux_, init_, grid.vars_)
+    time_, last, bands, offset, power = held_util(
+        carry, grid.vars_.size, time_step_util(grid, flux_, stability))
+
+    # a stream checks f and g at its first interval only
+    if last == 0.0:
+        if (np.ones(grid.vars_.size) * flux_ != eval_util(
+                _flux_, np.asarray(init_) + 1.0, grid.vars_)).any():
+            raise ValueError("f must not depend on n (see set_term)")
+        affine_util(_sink_, init_, grid)
+        count_util(stats, fluxes=2, sinks=4)
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    steps = 0
+
+    _yvar = sols[0].copy()
+    next_ = np.empty(_yvar.shape)
+    work = np.empty(_yvar.shape)
+    base = resume_util(carry, np.nan)[0]
+    save = 0
+
+    for itrs in range(tidx[:-1].size):
+
+        step_ = tidx[itrs + 1] - tidx[itrs]
+
+        # the dense steps of an interval differ by rounding only
+        if abs(step_ - last) > 1e-9 * last:
+            clock = clock_util(stats)
+            _yvar, power = leap_util(bands, offset, _yvar, steps, power)
+            steps = 0
+            bands, offset = operator_util(grid, flux_, _sink_, step_, scheme)
+            power = (bands, offset, 0)
+            clock_util(stats, clock, True)
+            count_util(stats, sinks=6)
+            last = step_
+
+        if jump:
+            steps += 1
+        else:
+            clock = clock_util(stats)
+            apply_util(bands, offset, _yvar, next_, work)
+            clock_util(stats, clock, True)
+            _yvar, next_ = next_, _yvar
+        count_util(stats, steps=1)
+
+        if marks[itrs + 1]:
+            if steps > 0:
+                clock = clock_util(stats)
+                _yvar, power = leap_util(bands, offset, _yvar, steps, power)
+                clock_util(stats, clock, True)
+                steps = 0
+
+            save += 1
+            sols[save] = _yvar
+            count_util(stats, saves=1)
+
+    pause_util(carry, base + tidx.size - 1, np.nan, False)
+    keep_util(carry, 1, np.array([time_, last, 1.0 * power[2]]))
+    keep_util(carry, 2, bands)
+    keep_util(carry, 3, offset)
+    keep_util(carry, 4, power[0])
+    keep_util(carry, 5, power[1])
+    return tims, sols
@@ -1,92 +1,250 @@
-""" method of charactersistics
+""" method of characteristics (semi-Lagrangian)
+
+    ∂n/∂t + ∂(fn)/∂x = g
+
+    above equation can be written as
+    ∂xx/∂s = f;           xx(s=0) = x
+    ∂nn/∂s = g - n∂f/∂x;  nn(s=0, xx=x) = n
+
+    with solution
+    nn(s, xx=x) = n(t, x)
+
+    inputs
+    ------
+    init_:  n
+    vars_:  x
+    flux_:  f
+    sink_:  g
+    time_:  Δt
+
+    outputs
+    -------
+    next_:  n
+
+    numerics
+    --------
+    n(j+1, i) = J(i) n(j, xd(i)) + Δt g(j, xd(i))
+
+    the characteristic through x(i) at t + Δt departs from
+
+        xd = x - Δt f(x - Δt f(x)/2)
+
+    (explicit midpoint rule, f interpolated linearly between the
+    grid points and held at the ends) for all x at once, and
+
+        J = ∂xd/∂x = exp(-∫∂f/∂x ds)
+
+    is from the first-order derivative with accuracy of 2, such
+    that n Δx is carried along the characteristics; n and g are
+    interpolated at xd with `kind`:
+        - "linear" (default)
+        - "pchip" (monotone cubic, Fritsch-Carlson slopes)
+    and n is 0 where xd leaves the grid (inflow)
+
+    Δt = λΔx/f, fixed from the initial f; the scheme is stable for
+    any λ, but xd is only second-order in Δt; g is first-order
+
+    the departure points, J and the interpolation weights are kept
+    across steps with the same Δt when f is declared `steady`
+
 """
 
-import numpy as np
-from scipy.integrate import odeint
-from scipy.interpolate import interp1d
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import grid_util, snaps_util, steps_util
+from hypersolver.util import term_util, time_step_util, points_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util, halt_util
+from hypersolver.util import diags_util, record_util, result_util
 
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
 from hypersolver.derivative import ord1_acc2
-from hypersolver.util import term_util, func_util
 
 
+@jit(nopython=True)
+def depart_util(flux_, vars_, time_):
+    """ utility to trace the characteristics back over Δt
+
+        returns the (rows, N) departure points xd, their cells
+        (xd lies between x(idx-1) and x(idx)), their offsets
+        within these cells, whether they are on the grid, and J
+    """
+
+    xvar = points_util(vars_)
+    size = xvar.size
+    flux = np.ascontiguousarray(np.ones(size) * flux_).reshape(-1, size)
+
+    depart = np.empty(flux.shape)
+    for row in range(flux.shape[0]):
+        depart[row] = xvar - time_ * np.interp(
+            xvar - 0.5 * time_ * flux[row], xvar, flux[row])
+
+    flat = depart.ravel()
+    cells = np.minimum(np.maximum(np.searchsorted(xvar, flat), 1), size - 1)
+    offset = (flat - xvar[cells - 1]) / (xvar[cells] - xvar[cells - 1])
+    inside = (flat >= xvar[0]) & (flat <= xvar[-1])
+
+    return (
+        depart,
+        cells.reshape(flux.shape),
+        offset.reshape(flux.shape),
+        inside.reshape(flux.shape),
+        ord1_acc2(depart, vars_),
+    )
+
+
+@jit(nopython=True)
+def pchip_util(values, vars_):
+    """ utility to get the monotone (Fritsch-Carlson) slopes of values
+
+        slopes are 0 at local extrema and one-sided at the ends
+    """
+
+    span = vars_[1:] - vars_[:-1]
+    delta = (values[1:] - values[:-1]) / span
+
+    slopes = np.zeros(values.shape)
+    slopes[0], slopes[-1] = delta[0], delta[-1]
+
+    left = 2.0 * span[1:] + span[:-1]
+    right = span[1:] + 2.0 * span[:-1]
+    same = delta[:-1] * delta[1:] > 0.0
+
+    slopes[1:-1] = np.where(same, (left + right) / (
+        left / np.where(same, delta[:-1], 1.0) +
+        right / np.where(same, delta[1:], 1.0)), 0.0)
+
+    return slopes
+
+
+@jit(nopython=True)
+def interp_util(values, vars_, cells, offset, inside, kind="linear"):
+    """ utility to interpolate a row of values at the departure points """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    lower, upper = values[cells - 1], values[cells]
+
+    if kind == "linear":
+        out = lower + offset * (upper - lower)
+    elif kind == "pchip":
+        span = vars_[cells] - vars_[cells - 1]
+        slopes = pchip_util(values, vars_)
+        rest = 1.0 - offset
+        out = rest * rest * ((1.0 + 2.0 * offset) * lower + offset * span * slopes[cells - 1]) + (
+            offset * offset * ((3.0 - 2.0 * offset) * upper - rest * span * slopes[cells]))
+    else:
+        raise ValueError("kind not supported")
+
+    return np.where(inside, out, 0.0)
+
+
+@jit(nopython=True)
 def moc_next(
-    init_vals,
-    vars_vals,
-    flux_term,
-    sink_term,
-    time_step,
-):
-    """ method of characteristics
-
-        ∂n/∂t + ∂(fn)/∂x = g
-
-        above equation can be written as
-        ∂xx/∂s = f;           xx(s=0) = x
-        ∂nn/∂s = g - n∂f/∂x;  nn(s=0, xx=x) = n
-
-        with solution
-        nn(s, xx=x) = n(t, x)
-
-        inputs
-        ------
-        init_step:  n
-        vars_vals:  x
-        flux_term:  f
-        sink_term:  g
-        time_step:
-
-        outputs
-        -------
-        next_vals:  n
-
-        numerics
-        --------
-        use scipy.integrate.odeint
+        init_, vars_, flux_, sink_, time_, kind="linear", depart=None):
+    """ next step according to the method of characteristics
+
+        f and g may be functions of (n, x) or their values, and
+        depart is an optional depart_util of f and Δt to reuse
     """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
 
-    # pylint: disable=unused-argument
-    # pylint: disable=unused-variable
-    def _func(yval, tval):
-        """ ode function to integrate
-        """
-        uval = yval[::2]
-        vval = yval[1::2]
+    xvar = points_util(vars_)
+    size = xvar.size
 
-        dydt = np.empty_like(yval)
+    if depart is None:
+        depart = depart_util(eval_util(flux_, init_, xvar), vars_, time_)
 
-        dudt = dydt[::2]
-        dvdt = dydt[1::2]
+    rows = np.ascontiguousarray(init_).reshape(-1, size)
+    sink = np.ascontiguousarray(term_util(
+        eval_util(sink_, init_, xvar), init_)).reshape(-1, size)
 
-        dudt[:] = flux_term  # noqa: F841
-        dvdt[:] = sink_term - vval*ord1_acc2(flux_term, uval)
+    _, cells, offset, inside, jacobian = depart
+    out = np.empty(rows.shape)
 
-        return dydt
+    for row in range(rows.shape[0]):
+        idx = min(row, cells.shape[0] - 1)
+        out[row] = jacobian[idx] * interp_util(
+            rows[row], xvar, cells[idx], offset[idx], inside[idx], kind) + (
+            time_ * interp_util(
+                sink[row], xvar, cells[idx], offset[idx], inside[idx], kind))
 
-    yval0 = np.empty((vars_vals.size + init_vals.size))
+    return out.reshape(init_.shape)
 
-    yval0[::2] = vars_vals
 
-    yval0[1::2] = init_vals
+@jit(nopython=True)
+def moc_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        kind="linear", steady=False,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ loop for moc scheme
 
-    tspan = np.linspace(0, time_step, 10)
+        takes the arguments of lx_loop without adaptive stepping,
+        the interpolation `kind`, and whether f is `steady`, in
+        which case f is called once and the characteristics are
+        only traced anew when Δt changes
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
 
-    flux_term = term_util(
-        func_util(flux_term, init_vals, vars_vals),
-        init_vals,
-    )
+    grid = grid_util(vars_)
 
-    sink_term = term_util(
-        func_util(sink_term, init_vals, vars_vals),
-        init_vals,
-    )
+    flux_ = eval_util(_flux_, init_, grid.vars_)
+    count_util(stats, fluxes=1)
+
+    time_ = time_step_util(grid, flux_, stability)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    depart = depart_util(flux_, grid, time_)
+    last = time_
+
+    _yvar = sols[0].copy()
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tidx.size, tims[0], _yvar, grid)
+    save = 0
+
+    for itrs in range(tidx[:-1].size):
+
+        step_ = tidx[itrs + 1] - tidx[itrs]
+
+        clock = clock_util(stats)
+        if not steady:
+            flux_ = eval_util(_flux_, _yvar, grid.vars_)
+        sink_ = eval_util(_sink_, _yvar, grid.vars_)
+        clock = clock_util(stats, clock)
+
+        # the dense steps of an interval differ by rounding only
+        if not steady or abs(step_ - last) > 1e-9 * last:
+            depart = depart_util(flux_, grid, step_)
+            last = step_
+
+        next_ = moc_next(_yvar, grid, flux_, sink_, step_, kind, depart)
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 0 if steady else 1, 1)
+
+        stop, event_ = halt_util(
+            next_, _yvar, base + itrs, tidx[itrs + 1], tidx[itrs + 1] - tidx[itrs],
+            halt, check, event, event_)
+        diag = record_util(diags, diag, itrs + 1, tidx[itrs + 1], next_, grid)
+        _yvar = next_
 
-    results = odeint(_func, yval0, tspan, ml=2, mu=2)
+        if marks[itrs + 1] or stop:
+            save += 1
+            tims[save], sols[save] = tidx[itrs + 1], _yvar
+            count_util(stats, saves=1)
 
-    fill = interp1d(
-        results[-1, ::2],
-        results[-1, 1::2],
-        fill_value=(0.0, 0.0),
-        bounds_error=False,
-        kind='cubic')
+        if stop:
+            pause_util(carry, base + itrs + 1, event_, True)
+            return result_util(
+                tims[:save + 1], sols[:save + 1], diags, diag, itrs + 2)
 
-    return fill(vars_vals)
+    pause_util(carry, base + tidx.size - 1, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, tidx.size)
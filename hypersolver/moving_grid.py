@@ -0,0 +1,235 @@
+""" moving-grid (Lagrangian) finite-volume scheme
+
+    ∂n/∂t + ∂(fn)/∂x = g
+
+    inputs
+    ------
+    init_:  n
+    vars_:  x, the faces of the cells around x
+    flux_:  f
+    sink_:  g
+    time_:  Δt
+
+    outputs
+    -------
+    next_:  n
+    vars_:  the moved faces
+
+    numerics
+    --------
+    x(j+1, i+1/2) = x(j, i+1/2) + Δt f(j, i+1/2)
+    n(j+1, i) = n(j, i) Δx(j, i)/Δx(j+1, i) + Δt g(j, i)
+
+    the faces of the cells move with f (averaged from the two
+    cells around each face, and taken from the cell at each end),
+    so that nothing crosses them and sum(n Δx) only changes by
+    Δt sum(g Δx); x in f(n, x) and g(n, x) are the cell centres
+
+    Δt ≤ λΔx/Δf ∀ x keeps the faces from crossing, where Δf is
+    the difference of f across a cell, and Δt ≤ λ/|∂g/∂n| ∀ x
+    keeps the explicit step of g stable, both fixed from the
+    initial f and g; Δt is also at most the shortest span
+    between two requested times, so that a uniform f (Δf = 0)
+    still takes steps
+
+    a batch of n shares one grid, so f must be the same in every
+    row (f of x only); a ValueError is raised otherwise
+
+    every `remesh` steps, the faces are redistributed over the
+    same span so that each cell holds an equal share of
+
+        floor + |n|/max|n| + |Δn|/max|Δn|
+
+    (summed over a batch) and n is remapped conservatively, such
+    that cells gather where n and its jumps are
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import grid_util, snaps_util, steps_util, term_util
+from hypersolver.util import clock_util, count_util
+
+
+@jit(nopython=True)
+def speed_util(flux_, size):
+    """ utility to interpolate f at the N cells to their N+1 faces
+
+        a batch shares one grid, so f must be the same in every row
+    """
+
+    rows = np.ascontiguousarray(flux_).reshape(-1, size)
+    flux_ = rows[0]
+
+    if (rows != flux_).any():
+        raise ValueError("f must be the same in every row of a batch")
+
+    speed = np.empty(size + 1)
+    speed[1:-1] = 0.5 * (flux_[1:] + flux_[:-1])
+    speed[0], speed[-1] = flux_[0], flux_[-1]
+
+    return speed
+
+
+@jit(nopython=True)
+def lagrange_step_util(init_, faces, _flux_, _sink_, stability):
+    """ utility to calculate the time_step of the moving grid
+
+        the faces must not cross, Δt ≤ λΔx/Δf, and the explicit
+        step of g must be stable, Δt ≤ λ/|∂g/∂n| with ∂g/∂n from
+        a forward difference of g in n
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    centres = 0.5 * (faces[1:] + faces[:-1])
+
+    speed = speed_util(term_util(
+        _flux_(init_, centres), init_), centres.size)
+
+    rate = term_util(_sink_(init_, centres), init_)
+    delta = 1.5e-8 * (1.0 + np.abs(init_))
+    slope = (term_util(_sink_(init_ + delta, centres), init_) - rate) / delta
+
+    return stability * min(
+        ((faces[1:] - faces[:-1]) / np.maximum(
+            np.abs(speed[1:] - speed[:-1]), 1e-300)).min(),
+        1.0 / max(np.abs(slope).max(), 1e-300))
+
+
+@jit(nopython=True)
+def remap_util(init_, faces, new_faces):
+    """ utility to remap n conservatively between cell faces
+
+        sum(n Δx) over the overlap of the two grids is kept
+        exactly, with n taken constant within each old cell
+    """
+
+    size = faces.size - 1
+    rows = np.ascontiguousarray(init_).reshape(-1, size)
+
+    out = np.empty(rows.shape)
+    mass = np.zeros(size + 1)
+
+    for row in range(rows.shape[0]):
+        mass[1:] = np.cumsum(rows[row] * (faces[1:] - faces[:-1]))
+        moved = np.interp(new_faces, faces, mass)
+        out[row] = (moved[1:] - moved[:-1]) / (new_faces[1:] - new_faces[:-1])
+
+    return out.reshape(init_.shape)
+
+
+@jit(nopython=True)
+def mesh_util(init_, faces, floor=0.1):
+    """ utility to redistribute the faces where n and its jumps are
+
+        each new cell holds an equal share of the monitor
+        floor + |n|/max|n| + |Δn|/max|Δn| over the same span
+    """
+
+    size = faces.size - 1
+    rows = np.abs(np.ascontiguousarray(init_).reshape(-1, size))
+
+    jump = np.zeros(rows.shape)
+    jump[:, 1:-1] = np.abs(rows[:, 2:] - rows[:, :-2])
+
+    monitor = floor + (
+        rows / max(rows.max(), 1e-300)).sum(axis=0) + (
+        jump / max(jump.max(), 1e-300)).sum(axis=0)
+
+    share = np.zeros(size + 1)
+    share[1:] = np.cumsum(monitor * (faces[1:] - faces[:-1]))
+
+    new_faces = np.interp(
+        np.linspace(0.0, share[-1], size + 1), share, faces)
+    new_faces[0], new_faces[-1] = faces[0], faces[-1]
+
+    return new_faces
+
+
+@jit(nopython=True)
+def mg_next(init_, vars_, flux_, sink_, time_, out=None):
+    """ next step according to the moving-grid scheme
+
+        vars_ are the N+1 faces; returns n and the moved faces;
+        out is an optional (..., N) buffer to reuse for n
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if out is None:
+        out = np.empty(init_.shape)
+
+    faces = vars_ + time_ * speed_util(
+        term_util(flux_, init_), vars_.size - 1)
+
+    np.multiply(init_, vars_[1:] - vars_[:-1], out)
+    np.divide(out, faces[1:] - faces[:-1], out)
+    np.add(out, time_ * term_util(sink_, init_), out)
+
+    return out, faces
+
+
+@jit(nopython=True)
+def mg_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        remesh=0, floor=0.1, stats=None):
+    """ loop for mg scheme
+
+        vars_ are the initial cell centres (or a Grid) whose
+        faces then move; returns the saved times, the saved n,
+        and the (k, N+1) faces each n is saved on
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    faces = grid_util(vars_).faces.copy()
+
+    time_ = lagrange_step_util(
+        np.asarray(init_), faces, _flux_, _sink_, stability)
+    count_util(stats, fluxes=1, sinks=2)
+
+    spans = time[1:] - time[:-1]
+    if (spans > 0.0).any():
+        time_ = min(time_, spans[spans > 0.0].min())
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    grids = np.empty((tims.size, faces.size))
+    grids[0] = faces
+
+    _yvar = sols[0].copy()
+    next_ = np.empty(_yvar.shape)
+    save = 0
+
+    for itrs in range(tidx[:-1].size):
+
+        clock = clock_util(stats)
+        centres = 0.5 * (faces[1:] + faces[:-1])
+        flux_ = _flux_(_yvar, centres)
+        sink_ = _sink_(_yvar, centres)
+        clock = clock_util(stats, clock)
+
+        next_, faces = mg_next(
+            _yvar, faces, flux_, sink_,
+            tidx[itrs + 1] - tidx[itrs], next_)
+
+        if remesh > 0 and (itrs + 1) % remesh == 0:
+            new_faces = mesh_util(next_, faces, floor)
+            next_[...] = remap_util(next_, faces, new_faces)
+            faces = new_faces
+
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 1, 1)
+
+        if marks[itrs + 1]:
+            save += 1
+            sols[save] = next_
+            grids[save] = faces
+            count_util(stats, saves=1)
+
+        _yvar, next_ = next_, _yvar
+
+    return tims, sols, grids
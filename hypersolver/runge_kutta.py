@@ -17,13 +17,24 @@
     numerics:
     ---------
     - rk2 next_: n + Δt*f(n + Δt/2*f(n, x))
+    - rk45 next_: Dormand-Prince 5(4) with the embedded 4th-order
+      solution as error estimate and the last stage reused as the
+      first stage of the next step (first same as last, FSAL);
+      Δt is controlled so that the RMS over x of the error scaled
+      by atol + rtol |n| stays below 1
 
 """
 
 from hypersolver.util import jxt as jit
 from hypersolver.util import xnp as np
 from hypersolver.util import term_util
+from hypersolver.util import grid_util, snaps_util, steps_util
 from hypersolver.util import time_step_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util, halt_util
+from hypersolver.util import diags_util, record_util, result_util
+
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
 
 
 @jit(nopython=True)
@@ -31,38 +42,235 @@ def rk2_next(init_, vars_, func_, sink_, time_):
     """ 2nd order Runge-Kutta method """
     _ = sink_
     step1 = init_ + 0.5 * time_ * term_util(
-        func_(init_, vars_), init_)
+        eval_util(func_, init_, vars_), init_)
 
     return init_ + time_ * term_util(
-        func_(step1, vars_), step1)
+        eval_util(func_, step1, vars_), step1)
 
 
 @jit(nopython=True)
-def rk_loop(time, init_, vars_, func_, stability):
-    """ loop for rk """
+def rk_loop(
+        time, init_, vars_, func_, stability,
+        snaps=100, stride=0, dense=False,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ loop for rk
+
+        stops early as lx_loop does, once the relative rate of
+        change of n falls to `halt` or event(t, n) changes sign
+
+        stats, if given as counters_util(), keeps the counters
+        and timers of the loop (see Stats)
+    """
     # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
 
-    time_ = time_step_util(vars_, func_(init_, vars_), stability)
+    time_ = time_step_util(grid, eval_util(func_, init_, grid.vars_), stability)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    count_util(stats, fluxes=1)
 
-    tidx = np.arange(time[0], time[-1] + time_, time_)
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
 
-    pts = np.asarray((tidx.size+1., np.asarray(time).size+100., 100.)).min()//1
-    sols = np.asarray(init_).reshape(1, -1)
-    tims = np.asarray(tidx[0]).reshape(1, -1)
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
 
     _yvar = sols[0]
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tidx.size, tims[0], _yvar, grid)
+    save = 0
 
     for itrs in range(tidx[:-1].size):
+        clock = clock_util(stats)
         next_ = rk2_next(
-            _yvar, vars_, func_, 0.0,
+            _yvar, grid.vars_, func_, 0.0,
             tidx[itrs+1] - tidx[itrs])
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 2)
 
-        if ((itrs + 1) % (tidx.size//pts)) == 0:
-            sols = np.concatenate(
-                (sols, np.asarray(next_).reshape(1, -1)), axis=0)
-            tims = np.concatenate(
-                (tims, np.asarray(tidx[itrs]).reshape(1, -1)), axis=0)
+        stop, event_ = halt_util(
+            next_, _yvar, base + itrs, tidx[itrs + 1], tidx[itrs + 1] - tidx[itrs],
+            halt, check, event, event_)
+        diag = record_util(diags, diag, itrs + 1, tidx[itrs + 1], next_, grid)
+
+        if marks[itrs + 1] or stop:
+            save += 1
+            tims[save], sols[save] = tidx[itrs + 1], next_
+            count_util(stats, saves=1)
+
+        if stop:
+            pause_util(carry, base + itrs + 1, event_, True)
+            return result_util(
+                tims[:save + 1], sols[:save + 1], diags, diag, itrs + 2)
 
         _yvar = next_
 
-    return tims, sols
+    pause_util(carry, base + tidx.size - 1, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, tidx.size)
+
+
+@jit(nopython=True)
+def rk45_next(init_, vars_, func_, deriv_, time_):
+    """ Dormand-Prince 5(4) Runge-Kutta method
+
+        deriv_ is f(n, x) at init_, and the returned tuple holds
+        the 5th-order next step, its error estimate, and f(n, x)
+        at the next step to reuse as deriv_ (FSAL)
+    """
+
+    step2 = term_util(eval_util(
+        func_, init_ + time_ * (1/5 * deriv_), vars_), init_)
+    step3 = term_util(eval_util(
+        func_, init_ + time_ * (3/40 * deriv_ + 9/40 * step2), vars_), init_)
+    step4 = term_util(eval_util(
+        func_, init_ + time_ * (
+            44/45 * deriv_ - 56/15 * step2 + 32/9 * step3
+        ), vars_), init_)
+    step5 = term_util(eval_util(
+        func_, init_ + time_ * (
+            19372/6561 * deriv_ - 25360/2187 * step2 +
+            64448/6561 * step3 - 212/729 * step4
+        ), vars_), init_)
+    step6 = term_util(eval_util(
+        func_, init_ + time_ * (
+            9017/3168 * deriv_ - 355/33 * step2 + 46732/5247 * step3 +
+            49/176 * step4 - 5103/18656 * step5
+        ), vars_), init_)
+
+    next_ = init_ + time_ * (
+        35/384 * deriv_ + 500/1113 * step3 + 125/192 * step4 -
+        2187/6784 * step5 + 11/84 * step6
+    )
+
+    step7 = term_util(eval_util(func_, next_, vars_), init_)
+
+    error_ = time_ * (
+        71/57600 * deriv_ - 71/16695 * step3 + 71/1920 * step4 -
+        17253/339200 * step5 + 22/525 * step6 - 1/40 * step7
+    )
+
+    return next_, error_, step7
+
+
+@jit(nopython=True)
+def rk45_norm(error_, init_, next_, rtol, atol):
+    """ largest RMS over x of the scaled error of each batch member """
+
+    ratio = error_ / (atol + rtol * np.maximum(np.abs(init_), np.abs(next_)))
+
+    ratio = (ratio * ratio).reshape(-1, ratio.shape[-1])
+
+    return np.sqrt(ratio.sum(axis=1).max() / ratio.shape[-1])
+
+
+@jit(nopython=True)
+def rk45_step(norm, time_, step_, tval, tries, max_steps):
+    """ next Δt after a step of step_ with error norm
+
+        the factor 0.9 norm^(-1/5), within 0.2 and 10, scales the
+        step taken; an accepted step that was clipped to land on a
+        requested time keeps the unclipped time_ unless its error
+        allows more; raises once the error is not finite, Δt no
+        longer moves t, or `max_steps` steps were tried
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if not np.isfinite(norm):
+        raise ValueError("rk45: error norm is not finite")
+
+    if tries >= max_steps:
+        raise RuntimeError("rk45: max_steps reached")
+
+    time_ = max(step_ * min(10.0, max(
+        0.2, 0.9 * norm**-0.2 if norm > 0.0 else 10.0
+    )), time_ if norm <= 1.0 and step_ < time_ else 0.0)
+
+    if tval + time_ <= tval:
+        raise RuntimeError("rk45: step size too small")
+
+    return time_
+
+
+@jit(nopython=True)
+def rk45_loop(
+        time, init_, vars_, func_, rtol=1e-6, atol=1e-9, max_steps=100000,
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ adaptive loop for rk45
+
+        steps are clipped to land exactly on each of the
+        requested times, which are all saved until the loop
+        stops early as lx_loop does, with diags at every
+        accepted step; at most `max_steps` steps are tried (see
+        rk45_step); rejected steps count their calls to func_
+        but not as steps in stats
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    tims = np.empty(np.asarray(time).size)
+    tims[:] = time
+
+    sols = np.empty((tims.size,) + np.asarray(init_).shape)
+    sols[0] = init_
+
+    _yvar = sols[0].copy()
+    deriv_ = term_util(eval_util(func_, _yvar, grid.vars_), _yvar)
+    count_util(stats, fluxes=1)
+
+    scale = atol + rtol * np.abs(_yvar)
+    norm0 = np.sqrt(np.mean((_yvar / scale)**2))
+    norm1 = np.sqrt(np.mean((deriv_ / scale)**2))
+    time_ = 0.01 * norm0 / norm1 if min(norm0, norm1) > 1e-5 else 1e-6
+
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tims.size, tims[0], _yvar, grid)
+    tval = tims[0]
+    state = fetch_util(carry, 1, np.array([time_, 0.0]))
+    time_, itrs, tries = state[0], 0, int(state[1])
+
+    for save in range(1, tims.size):
+
+        while tval < tims[save]:
+
+            step_ = min(time_, tims[save] - tval)
+
+            clock = clock_util(stats)
+            next_, error_, dnext_ = rk45_next(
+                _yvar, grid.vars_, func_, deriv_, step_)
+            clock_util(stats, clock, True)
+            count_util(stats, fluxes=6)
+
+            norm = rk45_norm(error_, _yvar, next_, rtol, atol)
+            time_ = rk45_step(norm, time_, step_, tval, tries, max_steps)
+            tries += 1
+
+            if norm > 1.0:
+                continue
+
+            tval = tims[save] if step_ == tims[save] - tval else tval + step_
+            stop, event_ = halt_util(
+                next_, _yvar, base + itrs, tval, step_, halt, check, event, event_)
+            diag = record_util(diags, diag, itrs + 1, tval, next_, grid)
+            _yvar, deriv_ = next_, dnext_
+            count_util(stats, steps=1)
+            itrs += 1
+
+            if stop:
+                pause_util(carry, base + itrs, event_, True)
+                tims[save], sols[save] = tval, _yvar
+                count_util(stats, saves=1)
+                return result_util(
+                    tims[:save + 1], sols[:save + 1], diags, diag, itrs + 1)
+
+        sols[save] = _yvar
+        count_util(stats, saves=1)
+
+    pause_util(carry, base + itrs, event_, False)
+    keep_util(carry, 1, np.array([time_, 1.0 * tries]))
+    return result_util(tims, sols, diags, diag, itrs + 1)
@@ -0,0 +1,154 @@
+""" split-step scheme for stiff sinks
+
+    ∂n/∂t + ∂(fn)/∂x = g
+
+    inputs
+    ------
+    init_:  n
+    vars_:  x
+    flux_:  f
+    sink_:  g
+    time_:  Δt
+
+    outputs
+    -------
+    next_:  n
+
+    numerics
+    --------
+    n(j+1) = G(Δt/2) A(Δt) G(Δt/2) n(j)
+
+    A is a step of the explicit 1-D scheme (lax_friedrichs or
+    lax_wendroff) without g, and G integrates dn/dt = g alone:
+
+        - "implicit" (default):
+            n + Δt g(n)/(1 - Δt ∂g/∂n), linearly implicit Euler
+            with ∂g/∂n from one more call to g; ∂g/∂n > 0 is
+            taken as zero (explicit) where g grows n
+        - "exponential":
+            n exp(Δt k) + s (exp(Δt k) - 1)/k, exact for
+            g = k n + s declared with set_term(g, "linear"),
+            whose k and s are evaluated once per grid x
+
+    Δt ≤ λΔx/f ∀ x, fixed from the initial f only, such that
+    fast loss rates of g do not shrink Δt; g must be local in n
+    (not depend on its neighbours) for ∂g/∂n to be diagonal
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import grid_util, snaps_util, steps_util
+from hypersolver.util import term_util, time_step_util, points_util
+from hypersolver.util import clock_util, count_util
+from hypersolver.util import eval_util, halt_util, linear_util
+from hypersolver.util import diags_util, record_util, result_util
+
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
+from hypersolver.strang_splitting import sweep_util
+
+
+@jit(nopython=True)
+def sink_step_util(init_, vars_, _sink_, time_, sink="implicit"):
+    """ utility to integrate dn/dt = g over Δt alone """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if sink == "exponential":
+        rate, rest = linear_util(_sink_, init_)
+        scale = term_util(time_ * rate, init_)
+        return init_ * np.exp(scale) + time_ * term_util(rest, init_) * np.where(
+            scale == 0.0, 1.0, np.expm1(scale) / np.where(scale == 0.0, 1.0, scale))
+
+    rate = term_util(eval_util(_sink_, init_, vars_), init_)
+
+    if sink == "implicit":
+        delta = 1.5e-8 * (1.0 + np.abs(init_))
+        slope = (term_util(eval_util(_sink_, init_ + delta, vars_), init_) - rate) / delta
+        return init_ + time_ * rate / (1.0 - time_ * np.minimum(slope, 0.0))
+
+    raise ValueError("sink not supported")
+
+
+@jit(nopython=True)
+def sp_next(
+        init_, vars_, flux_, _sink_, time_,
+        scheme="lax_friedrichs", sink="implicit"):
+    """ next step according to the split-step scheme
+
+        takes g as the function _sink_(n, x), since G calls it
+        on the intermediate n
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    xvar = points_util(vars_)
+
+    next_ = sink_step_util(init_, xvar, _sink_, 0.5 * time_, sink)
+    next_ = sweep_util(next_, vars_, flux_, 0.0, time_, scheme)
+
+    return sink_step_util(next_, xvar, _sink_, 0.5 * time_, sink)
+
+
+@jit(nopython=True)
+def sp_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        scheme="lax_friedrichs", sink="implicit",
+        halt=0.0, check=10, event=None, diags=None, stats=None, carry=None):
+    """ loop for sp scheme
+
+        takes the arguments of lx_loop without adaptive stepping,
+        the explicit 1-D `scheme` and the `sink` integrator;
+        the calls to g within G count as scheme time in stats
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grid = grid_util(vars_)
+
+    time_ = time_step_util(grid, eval_util(_flux_, init_, grid.vars_), stability)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    count_util(stats, fluxes=1)
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    _yvar = sols[0].copy()
+    sinks = 2 if sink == "exponential" else 4
+    event_ = halt_util(_yvar, _yvar, -1, tims[0], 1.0, 0.0, check, event, np.nan)[1]
+    base, event_ = resume_util(carry, event_)
+    diag = diags_util(diags, tidx.size, tims[0], _yvar, grid)
+    save = 0
+
+    for itrs in range(tidx[:-1].size):
+
+        clock = clock_util(stats)
+        flux_ = eval_util(_flux_, _yvar, grid.vars_)
+        clock = clock_util(stats, clock)
+
+        next_ = sp_next(
+            _yvar, grid, flux_, _sink_,
+            tidx[itrs + 1] - tidx[itrs], scheme, sink)
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 1, sinks)
+
+        stop, event_ = halt_util(
+            next_, _yvar, base + itrs, tidx[itrs + 1], tidx[itrs + 1] - tidx[itrs],
+            halt, check, event, event_)
+        diag = record_util(diags, diag, itrs + 1, tidx[itrs + 1], next_, grid)
+        _yvar = next_
+
+        if marks[itrs + 1] or stop:
+            save += 1
+            tims[save], sols[save] = tidx[itrs + 1], _yvar
+            count_util(stats, saves=1)
+
+        if stop:
+            pause_util(carry, base + itrs + 1, event_, True)
+            return result_util(
+                tims[:save + 1], sols[:save + 1], diags, diag, itrs + 2)
+
+    pause_util(carry, base + tidx.size - 1, event_, False)
+    keep_util(carry, 1, np.array([time_]))
+    return result_util(tims, sols, diags, diag, tidx.size)
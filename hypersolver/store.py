@@ -0,0 +1,115 @@
+""" storing solutions on disk with checkpoint/restart
+
+    a store streams the selected loop (see stream.py) into a
+    preallocated .npy file opened as a numpy.memmap, one row per
+    requested time, and keeps a small .json sidecar with the
+    method, the requested times, a summary and hash of the grid
+    (of each of x and y for the (x, y) of strang_splitting), the
+    shape of n0, the interval between the last two rows written,
+    and the index of the last of them
+
+    Usage:
+    >>> solver = set_store(method="lax_friedrichs", path="run.npy")
+    >>> tims, sols = solver(t, n0, x, f, g, stability)
+    after a crash, the same call with resume=True restarts from
+    the last row written instead of from n0, provided the method,
+    times, grid x and shape of n0 match the store; a run that stops
+    early (halt= or event=) returns the rows up to the stop, the
+    last one at the time it stopped
+"""
+
+import os
+import json
+
+from hypersolver.util import xnp as np
+from hypersolver.util import grid_util, hash_util
+from hypersolver.stream import set_stream
+
+
+def meta_util(path):
+    """ utility to name the sidecar of a store """
+    return os.fspath(path) + ".json"
+
+
+def summary_util(vars_):
+    """ utility to summarize grid x, or each axis of (x, y) """
+
+    if isinstance(vars_, tuple):
+        return [summary_util(axis) for axis in vars_]
+
+    grid = grid_util(vars_)
+
+    return {
+        "size": int(grid.vars_.size),
+        "start": float(grid.vars_[0]),
+        "stop": float(grid.vars_[-1]),
+        "uniform": bool(grid.uniform),
+        "hash": hash_util(grid)[1],
+    }
+
+
+def save_util(sols, meta, path, step):
+    """ utility to flush a store and record its last row """
+
+    sols.flush()
+
+    meta["step"] = step
+    meta["interval"] = (
+        meta["time"][step] - meta["time"][step - 1] if step > 0 else 0.0)
+
+    with open(meta_util(path) + ".tmp", "w", encoding="utf-8") as temp:
+        json.dump(meta, temp)
+
+    os.replace(meta_util(path) + ".tmp", meta_util(path))
+
+
+def set_store(
+        method="lax_friedrichs", path="hypersolver.npy", backend=None,
+        parallel=False):
+    """ wrapper function to select solvers storing to path """
+
+    stream = set_stream(method, backend, parallel)
+
+    def _solver(time, init_, vars_, *args, resume=False, **kwargs):
+        """ run (or resume) the stream into the store """
+
+        time = np.asarray(time, dtype=np.float64)
+
+        if resume:
+            with open(meta_util(path), encoding="utf-8") as sidecar:
+                meta = json.load(sidecar)
+
+            if (meta["method"], meta["time"], meta["grid"], meta["shape"]) != (
+                    method, time.tolist(), summary_util(vars_), list(np.shape(init_))):
+                raise ValueError("store does not match method, time, x and n0")
+
+            sols = np.lib.format.open_memmap(path, mode="r+")
+            last = meta["step"]
+        else:
+            meta = {
+                "method": method,
+                "time": time.tolist(),
+                "grid": summary_util(vars_),
+                "shape": list(np.shape(init_)),
+            }
+
+            sols = np.lib.format.open_memmap(
+                path, mode="w+", dtype=np.float64,
+                shape=(time.size,) + np.asarray(init_).shape)
+            last = 0
+
+            sols[0] = init_
+            save_util(sols, meta, path, 0)
+
+        tims, save = time.copy(), last
+
+        for save, (tval, nval) in enumerate(
+                stream(time[last:], sols[last], vars_, *args, **kwargs),
+                start=last):
+            if save > last:
+                tims[save], sols[save] = tval, nval
+                save_util(sols, meta, path, save)
+
+        return tims[:save + 1], sols[:save + 1]
+
+    return _solver
@@ -0,0 +1,147 @@
+""" dimension-split (Strang) scheme in 2-D
+
+    ∂n/∂t + ∂(f n)/∂x + ∂(h n)/∂y = g
+
+    inputs
+    ------
+    init_:  n, on the (Nx, Ny) tensor-product grid of x and y
+    vars_:  (x, y)
+    flux_:  (f, h)
+    sink_:  g
+    time_:  Δt
+
+    outputs
+    -------
+    next_:  n
+
+    numerics
+    --------
+    n(j+1) = X(Δt/2) Y(Δt) X(Δt/2) n(j)
+
+    X and Y are steps of the 1-D scheme (lax_friedrichs or
+    lax_wendroff) along x and y, applied to all of the lines of
+    the grid at once; g is taken in the Y step, and the split is
+    second-order in time for smooth f, h and g (Strang)
+
+    Δt ≤ λ/max(max|f|/Δx, max|h|/Δy), the joint CFL step fixed
+    from the initial f and h
+
+    note, n may be an (Nx, Ny) array or a (..., Nx, Ny) batch;
+    f(n, x, y), h and g(n, x, y) are called with x and y as
+    (Nx, Ny) arrays, and f and h are returned together as (f, h)
+
+"""
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import grid_util, snaps_util, steps_util, term_util
+from hypersolver.util import clock_util, count_util
+
+from hypersolver.carry import fetch_util, keep_util, resume_util, pause_util
+from hypersolver.lax_friedrichs import lx_next
+from hypersolver.lax_wendroff import lw_next
+
+
+@jit(nopython=True)
+def sweep_util(init_, vars_, flux_, sink_, time_, scheme="lax_friedrichs"):
+    """ utility to step the 1-D scheme along the last axis """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if scheme == "lax_friedrichs":
+        return lx_next(init_, vars_, flux_, sink_, time_)
+
+    if scheme == "lax_wendroff":
+        return lw_next(init_, vars_, flux_, (sink_, sink_), time_)
+
+    raise ValueError("scheme not supported")
+
+
+@jit(nopython=True)
+def joint_step_util(vars_, flux_, stability=0.98):
+    """ utility to calculate the joint CFL time_step over x and y """
+
+    return stability / max(
+        np.abs(np.asarray(flux_[0])).max() / grid_util(vars_[0]).step,
+        np.abs(np.asarray(flux_[1])).max() / grid_util(vars_[1]).step)
+
+
+@jit(nopython=True)
+def ss_next(init_, vars_, flux_, sink_, time_, scheme="lax_friedrichs"):
+    """ next step according to the Strang-split scheme
+
+        the x steps run on the transposed (..., Ny, Nx) lines
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    shape = (-1,) + init_.shape[-2:]
+    turn = (0, 2, 1)
+
+    rows = np.ascontiguousarray(init_).reshape(shape)
+    flux_x = np.ascontiguousarray(term_util(flux_[0], init_)).reshape(shape)
+    flux_y = np.ascontiguousarray(term_util(flux_[1], init_)).reshape(shape)
+    sink_ = np.ascontiguousarray(term_util(sink_, init_)).reshape(shape)
+
+    flux_x = flux_x.transpose(turn)
+
+    half = sweep_util(
+        rows.transpose(turn), vars_[0], flux_x, 0.0, 0.5 * time_, scheme)
+    full = sweep_util(
+        half.transpose(turn), vars_[1], flux_y, sink_, time_, scheme)
+    half = sweep_util(
+        full.transpose(turn), vars_[0], flux_x, 0.0, 0.5 * time_, scheme)
+
+    return np.ascontiguousarray(half.transpose(turn)).reshape(init_.shape)
+
+
+@jit(nopython=True)
+def ss_loop(
+        time, init_, vars_, _flux_, _sink_, stability,
+        snaps=100, stride=0, dense=False,
+        scheme="lax_friedrichs", stats=None, carry=None):
+    """ loop for ss scheme
+
+        vars_ is (x, y), raw or as Grids; takes the arguments
+        of lx_loop without adaptive stepping, and the 1-D `scheme`
+    """
+    # pylint: disable=duplicate-code
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+
+    grids = (grid_util(vars_[0]), grid_util(vars_[1]))
+
+    xvar = np.outer(grids[0].vars_, np.ones(grids[1].vars_.size))
+    yvar = np.outer(np.ones(grids[0].vars_.size), grids[1].vars_)
+
+    time_ = joint_step_util(grids, _flux_(init_, xvar, yvar), stability)
+    time_ = fetch_util(carry, 1, np.array([time_]))[0]
+    count_util(stats, fluxes=1)
+
+    tidx, marks = steps_util(time, time_, snaps, stride, dense)
+
+    tims, sols = snaps_util(tidx, marks, np.asarray(init_))
+
+    _yvar = sols[0].copy()
+    base = resume_util(carry, np.nan)[0]
+    save = 0
+
+    for itrs in range(tidx[:-1].size):
+
+        clock = clock_util(stats)
+        flux_ = _flux_(_yvar, xvar, yvar)
+        sink_ = _sink_(_yvar, xvar, yvar)
+        clock = clock_util(stats, clock)
+
+        _yvar = ss_next(
+            _yvar, grids, flux_, sink_,
+            tidx[itrs + 1] - tidx[itrs], scheme)
+        clock_util(stats, clock, True)
+        count_util(stats, 1, 0, 1, 1)
+
+        if marks[itrs + 1]:
+            save += 1
+            sols[save] = _yvar
+            count_util(stats, saves=1)
+
+    pause_util(carry, base + tidx.size - 1, np.nan, False)
+    keep_util(carry, 1, np.array([time_]))
+    return tims, sols
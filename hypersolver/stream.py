@@ -0,0 +1,86 @@
+""" streaming solutions one requested time at a time
+
+    the loops return every saved snapshot at once; a stream
+    instead advances the same loop from one requested time to
+    the next and yields (t, n) as soon as it is reached, so that
+    only the current state is held in memory
+
+    Usage:
+    >>> stream = set_stream(method="lax_friedrichs")
+    >>> for tval, nval in stream(t, n0, x, f, g, stability):
+    ...     reduce(tval, nval)
+
+    callback(t, n), if given, is called at every yielded step,
+    and the stream ends at the time a loop stops early (halt= or
+    event=, see lx_loop); the loop keeps its state from one
+    interval to the next in a carry (carry_util): the steps taken,
+    the last value of event(t, n), Δt, the Lax-Wendroff Δg/Δt
+    history, the Crank-Nicolson factors and the linear operator,
+    such that the stream steps as the loop would in one call
+"""
+
+import os
+
+from hypersolver.util import xnp as np
+from hypersolver.util import compile_util, terms_util, load_util
+from hypersolver.carry import carry_util
+
+__stream_loops__ = {
+    "lax_friedrichs": ("hypersolver.lax_friedrichs.lx_loop", {"dense": True}),
+    "lax_wendroff": ("hypersolver.lax_wendroff.lw_loop", {"dense": True}),
+    "flux_limited": ("hypersolver.flux_limited.fl_loop", {"dense": True}),
+    "finite_volume": ("hypersolver.finite_volume.fv_loop", {"dense": True}),
+    "strang_splitting": ("hypersolver.strang_splitting.ss_loop", {"dense": True}),
+    "split_step": ("hypersolver.split_step.sp_loop", {"dense": True}),
+    "crank_nicolson": ("hypersolver.crank_nicolson.cn_loop", {"dense": True}),
+    "method_of_characteristics": (
+        "hypersolver.method_of_characteristics.moc_loop", {"dense": True}),
+    "linear_operator": ("hypersolver.linear_operator.lo_loop", {"dense": True}),
+    "runge_kutta_2": ("hypersolver.runge_kutta.rk_loop", {"dense": True}),
+    "runge_kutta_45": ("hypersolver.runge_kutta.rk45_loop", {}),
+}
+
+
+def set_stream(method="lax_friedrichs", backend=None, parallel=False):
+    """ wrapper function to select streaming solvers """
+
+    if method not in __stream_loops__:
+        raise ValueError("method not supported")
+
+    backend = backend or os.environ.get("HS_BACKEND", "numpy")
+
+    loop, fixed = __stream_loops__[method]
+    loop = compile_util(load_util(loop), backend, parallel=parallel)
+
+    def _stream(time, init_, *args, callback=None, **kwargs):
+        """ yield (t, n) at each of the requested times """
+
+        time = np.asarray(time, dtype=np.float64)
+        args = tuple(compile_util(arg, backend) for arg in terms_util(
+            args, None if method == "strang_splitting" else args[0],
+            int(os.environ.get("HS_CACHE", "32")), backend))
+        kwargs = {key: compile_util(arg, backend) for key, arg in kwargs.items()}
+        kwargs.update(fixed)
+
+        _yvar = np.asarray(init_)
+        carry = carry_util(backend)
+
+        if callback is not None:
+            callback(time[0], _yvar)
+        yield time[0], _yvar
+
+        for jdx in range(1, time.size):
+
+            tims, sols = loop(time[jdx - 1:jdx + 1], _yvar, *args, carry=carry, **kwargs)
+
+            _yvar = sols[-1]
+
+            if callback is not None:
+                callback(tims[-1], _yvar)
+            yield tims[-1], _yvar
+
+            # the loop stopped (halt or event), early or at time[jdx]
+            if carry[0][2] > 0.0:
+                return
+
+    return _stream
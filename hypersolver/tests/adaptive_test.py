@@ -0,0 +1,52 @@
+""" test: adaptive time stepping shared by the schemes """
+
+import pytest
+
+from hypersolver import set_solver
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import set_grid
+from hypersolver.adaptive import adapt_util
+
+
+@jit(nopython=True)
+def slowing(yvar, xvar):
+    """ flux """
+    return (1.0 + 4.0 * yvar.max()) / xvar
+
+
+@jit(nopython=True)
+def decay(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return -2.0 * yvar
+
+
+def test_adapt_util():
+    """ test: utility to update the time_step from the current flux """
+
+    grid = set_grid(np.linspace(0, 10, 101))
+
+    assert adapt_util(grid, np.ones(101), 0.5, 1.0, np.inf, 0.0) == pytest.approx(0.05)
+    assert adapt_util(grid, np.ones(101), 0.5, 0.01, 2.0, 0.0) == pytest.approx(0.02)
+    assert adapt_util(grid, 10.0 * np.ones(101), 0.5, 0.01, 2.0, 0.9) == pytest.approx(0.009)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "method", ["lax_friedrichs", "lax_wendroff", "flux_limited", "finite_volume"])
+def test_adapt_loop(method, xvar, yvar, flux):
+    """ test: Δt follows an f of n as n decays """
+
+    time = np.linspace(0, 1, 3)
+
+    tims, sols, diags = set_solver(method, diagnostics=True)(
+        time, yvar, xvar, slowing, decay, 0.9, adaptive=1)
+    assert tims == pytest.approx(time) and np.isfinite(sols).all()
+
+    steps = np.diff(diags.time)
+    assert steps[-2] > 1.5 * steps[0]
+
+    fixed = np.diff(set_solver(method, diagnostics=True)(
+        time, yvar, xvar, flux, decay, 0.9, adaptive=1)[2].time)
+    assert fixed.max() == pytest.approx(steps[0])
+    assert fixed.size > 1.2 * steps.size
@@ -0,0 +1,42 @@
+""" test: benchmarks of the hot loops and kernels """
+
+import json
+
+from hypersolver.benchmark import run_bench, suite_bench
+from hypersolver.benchmark import compare_bench, main
+
+
+def test_run_bench():
+    """ test: benchmark one case on a grid of `size` points """
+
+    for case in ("lx_loop", "lw_loop", "rk_loop", "ord1_acc2"):
+        result = run_bench(case, 100, "numpy", steps=5, repeat=1)
+        assert result["steps"] >= 5 or case == "ord1_acc2"
+        assert result["steps_per_s"] > 0
+        assert result["peak_bytes"] >= result["step_bytes"] >= 0
+        assert result["allocs_per_step"] is None
+
+
+def test_compare_bench():
+    """ test: regressions of results against a baseline """
+
+    results = suite_bench(["ord1_acc2", "moc_loop"], [100], ["numpy"], 5, 1)
+    assert len(results["results"]) == 2
+
+    slower = json.loads(json.dumps(results))
+    slower["results"][0]["steps_per_s"] *= 0.5
+
+    assert not compare_bench(results, results)
+    assert len(compare_bench(slower, results, 0.25)) == 1
+
+
+def test_main(tmp_path):
+    """ test: run the benchmarks from the command line """
+
+    path = str(tmp_path / "bench.json")
+    argv = ["--cases", "ord2_acc2", "--sizes", "100", "--repeat", "1"]
+
+    assert main(argv + ["--output", path]) == 0
+
+    with open(path, "r", encoding="utf-8") as file:
+        assert json.load(file)["results"][0]["case"] == "ord2_acc2"
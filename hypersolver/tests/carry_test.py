@@ -0,0 +1,25 @@
+""" test: carrying a loop across the intervals of a stream """
+
+import os
+import pytest
+
+from hypersolver.util import xnp as np
+from hypersolver.carry import carry_util, fetch_util, keep_util
+from hypersolver.carry import resume_util, pause_util
+
+
+def test_carry_util():
+    """ test: utilities to carry a loop across the intervals of a stream """
+
+    assert resume_util(None, 0.5) == (0, 0.5)
+    pause_util(None, 3, 0.5, False)
+
+    carry = carry_util(os.environ.get("HS_BACKEND", "numpy"))
+    assert resume_util(carry, 0.5) == (0, 0.5)
+
+    pause_util(carry, 3, -0.25, True)
+    assert resume_util(carry, 0.5) == (3, -0.25) and carry[0][2] == 1.0
+
+    assert fetch_util(carry, 1, np.zeros(2)) == pytest.approx(np.zeros(2))
+    keep_util(carry, 1, np.ones((2, 3)))
+    assert fetch_util(carry, 1, np.zeros(2)) == pytest.approx(np.ones(6))
@@ -0,0 +1,42 @@
+""" test: fixtures shared across the tests """
+
+import pytest
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+
+
+@jit(nopython=True)
+def inverse_flux(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux """
+    return 5 / xvar
+
+
+@jit(nopython=True)
+def decay_sink(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return -0.01 * yvar
+
+
+@pytest.fixture(name="xvar")
+def fixture_xvar():
+    """ fixture: grid x """
+    return np.linspace(1, 10, 100)
+
+
+@pytest.fixture(name="yvar")
+def fixture_yvar(xvar):
+    """ fixture: pulse n on x """
+    return 1.0 * (xvar > 4) - 1.0 * (xvar > 6)
+
+
+@pytest.fixture(name="flux")
+def fixture_flux():
+    """ fixture: flux f = 5/x """
+    return inverse_flux
+
+
+@pytest.fixture(name="sink")
+def fixture_sink():
+    """ fixture: sink g = -0.01 n """
+    return decay_sink
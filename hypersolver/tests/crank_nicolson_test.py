@@ -0,0 +1,120 @@
+""" test: implicit Crank-Nicolson (θ-method) finite-difference scheme """
+
+import pytest
+
+from hypersolver import set_solver
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.derivative import ord1_acc2
+from hypersolver.crank_nicolson import band_util, product_util
+from hypersolver.crank_nicolson import factor_util, solve_util
+from hypersolver.crank_nicolson import pack_util, unpack_util
+from hypersolver.crank_nicolson import cn_next, cn_loop
+
+
+@jit(nopython=True)
+def flux(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux """
+    return np.ones(xvar.shape)
+
+
+@jit(nopython=True)
+def sink(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return 0.0 * yvar
+
+
+@jit(nopython=True)
+def flux_inverse(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux """
+    return 5.0 / xvar
+
+
+def test_band_util():
+    """ test: utility to assemble the bands of Δ(fn)/Δx """
+
+    xvar = np.geomspace(1, 10, 50)
+    yvar = np.sin(xvar)
+
+    bands = band_util(0.3 * xvar, xvar)
+    product = product_util(bands, yvar)
+
+    assert product[1:-1] == pytest.approx(ord1_acc2(0.3 * xvar * yvar, xvar)[1:-1])
+    assert product[0] == pytest.approx(0.3 * xvar[0] * yvar[0] / (xvar[1] - xvar[0]))
+    assert product[-1] == pytest.approx(
+        0.3 * (xvar[-1] * yvar[-1] - xvar[-2] * yvar[-2]) / (xvar[-1] - xvar[-2]))
+
+    product = product_util(band_util(-0.3 * xvar, xvar), yvar)
+    assert product[0] == pytest.approx(
+        -0.3 * (xvar[1] * yvar[1] - xvar[0] * yvar[0]) / (xvar[1] - xvar[0]))
+    assert product[-1] == pytest.approx(0.3 * xvar[-1] * yvar[-1] / (xvar[-1] - xvar[-2]))
+
+
+def test_solve_util():
+    """ test: utility to solve the banded system in O(N) """
+
+    xvar = np.geomspace(1, 10, 50)
+    rhs = np.stack((np.sin(xvar), np.cos(xvar)))
+
+    for scale in (0.2, -5.0):
+        lower, diag, upper = band_util(0.3 * xvar, xvar)
+
+        matrix = np.eye(50) + scale * (
+            np.diag(diag[0]) + np.diag(lower[0, 1:], -1) + np.diag(upper[0, :-1], 1))
+
+        out = solve_util(factor_util((lower, diag, upper), scale), rhs.copy())
+        assert out @ matrix.T == pytest.approx(rhs)
+
+        factor = unpack_util(pack_util(factor_util((lower, diag, upper), scale)), 50)
+        assert solve_util(factor, rhs.copy()) == pytest.approx(out, rel=1e-15)
+
+    _array = np.linspace(1, 10, 100)
+    assert cn_next(
+        _array, _array, _array, _array, 0.01, 1.0
+    ).shape == (_array.size,)
+
+
+def test_cn_loop():
+    """ test: loop for cn scheme stays stable far above the CFL step """
+
+    xvar = np.linspace(0, 10, 200)
+    yvar = np.exp(-(xvar - 3)**2)
+    time = np.linspace(0, 2, 3)
+
+    for theta in (0.5, 1.0):
+        tims, sols = cn_loop(
+            time, yvar, xvar, flux, sink, 1.0, 100, 0, True, theta)
+
+        assert tims == pytest.approx(time)
+        assert xvar[sols[-1].argmax()] == pytest.approx(5.0, abs=0.1)
+
+        _, sols = cn_loop(time, yvar, xvar, flux, sink, 20.0, 100, 0, True, theta)
+        assert np.abs(sols).max() <= 1.0
+        assert sols[-1].sum() == pytest.approx(yvar.sum(), rel=0.02)
+
+    tims, sols = set_solver("crank_nicolson")(
+        time, yvar, xvar, flux, sink, 5.0, 100, 0, True, 0.5, True)
+    assert sols == pytest.approx(cn_loop(
+        time, yvar, xvar, flux, sink, 5.0, 100, 0, True, 0.5, False)[1])
+
+
+def test_cn_loop_boundaries():
+    """ test: loop for cn scheme stays bounded at λ ≥ 2 with mass at both ends """
+
+    xvar = np.arange(101) * 0.125
+    yvar = np.exp(-(xvar - 0.5)**2 / 0.1) + np.exp(-(xvar - 12)**2 / 0.1)
+    time = np.linspace(0, 4, 5)
+
+    for theta in (0.5, 1.0):
+        for stability in (2.0, 10.0):
+            _, sols = cn_loop(
+                time, yvar, xvar, flux, sink, stability, 100, 0, True, theta)
+
+            assert np.isfinite(sols).all()
+            assert np.abs(sols).max() <= 1.5 * yvar.max()
+            assert sols[-1].sum() <= yvar.sum() * (1 + 1e-9)
+
+    _, sols = cn_loop(
+        time, yvar, 1.0 + xvar, flux_inverse, sink, 10.0, 100, 0, True, 1.0)
+    assert np.isfinite(sols).all()
+    assert np.abs(sols).max() <= 1.5 * yvar.max()
@@ -4,8 +4,10 @@ import os
 import pytest
 
 from hypersolver.util import xnp as np
+from hypersolver.util import set_grid
 from hypersolver.derivative import ord1_acc2, ord2_acc2
 from hypersolver.derivative import ord1_acc4, ord2_acc4
+from hypersolver.derivative import ord1_acc2_par, ord2_acc2_par
 
 xvar = np.linspace(0, 10, 1000)
 yvar = np.sin(xvar)
@@ -103,3 +105,48 @@ def test_comp_ord2():
     ).sum() <= (
         (ord2_acc2(yvar, xvar)-d2ydx2)**2
     ).sum()
+
+
+def test_batched():
+    """ test: central differencing along the last axis of a batch """
+
+    batch = np.stack((yvar, 2.0 * yvar, 0.0 * yvar))
+
+    for func in (ord1_acc2, ord1_acc4, ord2_acc2, ord2_acc4):
+        assert func(batch, xvar).shape == batch.shape
+        assert func(batch, xvar)[1] == pytest.approx(2.0 * func(yvar, xvar))
+        assert func(batch, xvar)[2] == pytest.approx(0.0 * yvar)
+
+
+def test_workspace():
+    """ test: central differencing into caller-supplied buffers """
+
+    out, work = np.empty(yvar.shape), np.empty((2,) + yvar.shape)
+
+    for func in (ord1_acc2, ord1_acc4, ord2_acc2, ord2_acc4):
+        func(yvar, xvar, out, work)
+        assert out == pytest.approx(func(yvar, xvar))
+
+
+def test_grid():
+    """ test: central differencing on precomputed grids """
+
+    for _xvar in (xvar, np.geomspace(1, 10, 1000)):
+
+        grid = set_grid(_xvar)
+
+        for func in (ord1_acc2, ord1_acc4, ord2_acc2, ord2_acc4):
+            assert func(yvar, grid) == pytest.approx(func(yvar, _xvar))
+
+
+def test_parallel():
+    """ test: loop-based central differencing across threads """
+
+    batch = np.stack((yvar, 2.0 * yvar))
+
+    for _xvar in (xvar, np.geomspace(1, 10, 1000)):
+
+        grid = set_grid(_xvar)
+
+        assert ord1_acc2_par(batch, grid) == pytest.approx(ord1_acc2(batch, grid))
+        assert ord2_acc2_par(batch, grid) == pytest.approx(ord2_acc2(batch, grid))
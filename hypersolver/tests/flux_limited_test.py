@@ -0,0 +1,93 @@
+""" test: flux-limited (TVD) finite-volume scheme """
+
+import pytest
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.flux_limited import limiter_util, fl_next, fl_loop
+from hypersolver.lax_friedrichs import lx_loop
+
+
+@jit(nopython=True)
+def flux(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux """
+    return np.ones(xvar.shape)
+
+
+@jit(nopython=True)
+def sink(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return 0.0 * yvar
+
+
+def test_limiter_util():
+    """ test: utility to limit the ratio of successive jumps """
+
+    ratio = np.array([-1.0, 0.0, 0.5, 1.0, 3.0])
+
+    assert limiter_util(ratio, "minmod") == pytest.approx([0, 0, 0.5, 1, 1])
+    assert limiter_util(ratio, "van_leer") == pytest.approx([0, 0, 2/3, 1, 1.5])
+    assert limiter_util(ratio, "superbee") == pytest.approx([0, 0, 1, 1, 2])
+
+    with pytest.raises(ValueError):
+        limiter_util(ratio, "upwind")
+
+
+def test_fl_next():
+    """ test: next step according to fl scheme """
+
+    _array = np.linspace(1, 10, 100)
+
+    assert fl_next(
+        _array, _array, _array, _array, 0.01
+    ).shape == (_array.size,)
+
+    assert fl_next(
+        _array, _array, 1.0, 0.0, 0.01
+    ) == pytest.approx(fl_next(_array, _array, 1.0, 0.0, 0.01, None, "minmod"))
+
+    out = np.empty(_array.shape)
+    fl_next(_array, _array, _array, _array, 0.01, out)
+    assert out == pytest.approx(fl_next(_array, _array, _array, _array, 0.01))
+
+
+@pytest.mark.slow
+def test_fl_loop():
+    """ test: loop for fl scheme keeps fronts sharp and bounded """
+
+    xvar = np.linspace(0, 10, 200)
+    yvar = np.stack((
+        1.0 * (xvar > 2) - 1.0 * (xvar > 4),
+        1.0 * (xvar > 1) - 1.0 * (xvar > 2),
+    ))
+    exact = 1.0 * (xvar > 5) - 1.0 * (xvar > 7)
+
+    time = np.array([0.0, 3.0])
+    error = np.abs(lx_loop(
+        time, yvar[0], xvar, flux, sink, 0.9, 100, 0, True)[1][-1] - exact).sum()
+
+    for limiter in ("minmod", "van_leer", "superbee"):
+        tims, sols = fl_loop(
+            time, yvar, xvar, flux, sink, 0.9, dense=True, limiter=limiter)
+
+        assert tims == pytest.approx(time)
+        assert sols.shape == (time.size,) + yvar.shape
+        assert sols[-1].min() >= -1e-12 and sols[-1].max() <= 1.0 + 1e-12
+        assert np.abs(np.diff(sols[-1, 0])).sum() <= 2.0 + 1e-12
+        assert np.abs(sols[-1, 0] - exact).sum() < 0.5 * error
+
+
+def test_fl_loop_adaptive():
+    """ test: adaptive time stepping for fl scheme """
+
+    xvar = np.geomspace(1, 10, 200)
+    yvar = 1.0 * (xvar > 4) - 1.0 * (xvar > 6)
+
+    time = np.linspace(0, 2, 5)
+    tims, sols = fl_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, False, 1)
+
+    assert tims == pytest.approx(time)
+    assert sols[-1] == pytest.approx(fl_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, True)[-1][-1], abs=1e-2)
+    assert sols[-1].min() >= -1e-12 and sols[-1].max() <= 1.0 + 1e-12
@@ -0,0 +1,171 @@
+""" test: wrapper function to select solvers """
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+from hypersolver import set_solver, set_term, __solver_cache__
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+
+
+def test_set_solver(xvar, yvar, flux, sink):
+    """ test: wrapper function to select solvers """
+
+    with pytest.raises(ValueError):
+        set_solver("forward_euler")
+
+    time = np.linspace(0, 2, 1000)
+
+    solver = set_solver("lax_friedrichs")
+    tims, sols = solver.warmup(time, yvar, xvar, flux, sink, 0.9)
+    assert tims.shape == (1,) and sols.shape == (1, xvar.size)
+
+    size = len(__solver_cache__)
+    tims, sols = set_solver("lax_friedrichs")(
+        time, yvar, xvar, flux, sink, 0.9)
+    assert len(__solver_cache__) == size
+    assert sols.shape[0] >= 100
+
+    set_solver("lax_friedrichs")(time, yvar, xvar, flux, flux, 0.9)
+    assert len(__solver_cache__) == size + 1
+
+
+def test_lazy_import():
+    """ test: numba and scipy are only imported when needed """
+
+    code = (
+        "import sys, hypersolver; "
+        "assert 'numba' not in sys.modules and 'scipy' not in sys.modules; "
+        "assert callable(hypersolver.solver)")
+
+    subprocess.run(
+        [sys.executable, "-c", code], check=True,
+        env=dict(os.environ, HS_BACKEND="numpy"))
+
+    code = (
+        "import sys, numpy as np, hypersolver; "
+        "x = np.linspace(1, 10, 50); "
+        "g = hypersolver.set_term(lambda n, x: -0.1 * n, 'linear'); "
+        "hypersolver.set_solver('lax_wendroff', backend='numpy')("
+        "np.linspace(0, 1, 3), np.exp(-x), x, lambda n, x: 1 + 0 * x, g, 0.9); "
+        "assert 'numba' not in sys.modules; "
+        "assert 'hypersolver.flux_limited' not in sys.modules")
+
+    subprocess.run(
+        [sys.executable, "-c", code], check=True,
+        env=dict(os.environ, HS_BACKEND="numba"))
+
+
+def test_set_solver_parallel(xvar, yvar, flux, sink):
+    """ test: solvers with stencils across threads """
+
+    time = np.linspace(0, 1, 11)
+
+    for method in ("lax_friedrichs", "lax_wendroff"):
+        assert set_solver(method, parallel=True)(
+            time, yvar, xvar, flux, sink, 0.9, dense=True
+        )[1] == pytest.approx(set_solver(method)(
+            time, yvar, xvar, flux, sink, 0.9, dense=True)[1])
+
+
+@pytest.mark.slow
+def test_set_solver_stats(xvar, yvar, flux, sink):
+    """ test: solvers returning their counters and timers """
+
+    time = np.linspace(0, 1, 11)
+
+    for method in ("lax_friedrichs", "lax_wendroff"):
+        tims, sols, stats = set_solver(method, stats=True)(
+            time, yvar, xvar, flux, sink, 0.9, dense=True)
+
+        assert stats.saves == tims.size - 1 == sols.shape[0] - 1
+        assert stats.flux_calls == stats.steps + 1
+        assert stats.kernel_time > 0.0 and stats.user_time > 0.0
+        assert stats.total_time >= stats.kernel_time + stats.user_time
+
+    tims, sols, stats = set_solver("runge_kutta_45", stats=True)(
+        time, yvar, xvar, sink, 1e-6, 1e-9)
+    assert stats.saves == tims.size - 1 and stats.steps > 0
+    assert stats.flux_calls >= 6 * stats.steps + 1
+
+    assert len(set_solver("lax_friedrichs")(
+        time, yvar, xvar, flux, sink, 0.9)) == 2
+
+    with pytest.raises(ValueError, match="stats not supported with stream or store"):
+        set_solver("lax_friedrichs", stream=True, stats=True)
+    with pytest.raises(ValueError, match="stats not supported with stream or store"):
+        set_solver("lax_friedrichs", store="run.npy", stats=True)
+
+
+@pytest.mark.slow
+def test_set_solver_terms(xvar, yvar, flux):
+    """ test: solvers with declared terms """
+
+    time = np.linspace(0, 1, 11)
+
+    @jit(nopython=True)
+    def sink(yvar, xvar):
+        """ sink """
+        return -0.01 * yvar + 0.1 / xvar
+
+    for method in ("lax_friedrichs", "lax_wendroff", "crank_nicolson"):
+        assert set_solver(method)(
+            time, yvar, xvar, set_term(flux, "space"), set_term(sink, "linear"),
+            0.9, dense=True
+        )[1] == pytest.approx(set_solver(method)(
+            time, yvar, xvar, flux, sink, 0.9, dense=True)[1])
+
+    assert set_solver("lax_friedrichs", stream=True)(
+        time, yvar, xvar, set_term(flux, "space"), set_term(sink, "linear"), 0.9)
+
+    for kind in ("constant", "space"):
+        with pytest.raises(ValueError):
+            set_solver("moving_grid")(time, yvar, xvar, set_term(flux, kind), sink, 0.9)
+        with pytest.raises(ValueError):
+            set_solver("strang_splitting")(
+                time, yvar, (xvar, xvar), flux, set_term(sink, kind), 0.9)
+
+
+@pytest.mark.slow
+def test_set_solver_diagnostics():
+    """ test: solvers returning their diagnostics at every step """
+
+    xvar = np.linspace(0, 10, 201)
+    yvar = np.exp(-(xvar - 3)**2)
+    time = np.linspace(0, 4, 3)
+
+    @jit(nopython=True)
+    def flux(yvar, xvar):  # pylint: disable=unused-argument
+        """ flux """
+        return 0.5 + 0.0 * xvar
+
+    @jit(nopython=True)
+    def sink(yvar, xvar):  # pylint: disable=unused-argument
+        """ sink """
+        return 0.0 * yvar
+
+    for adaptive in (0, 1):
+        tims, sols, diags, stats = set_solver(
+            "finite_volume", diagnostics=True, stats=True)(
+            time, np.stack((yvar, 2 * yvar)), xvar, flux, sink, 0.9,
+            dense=True, adaptive=adaptive)
+
+        assert sols.shape[0] == tims.size == time.size
+        assert diags.time.size == stats.steps + 1 and diags.time[-1] == time[-1]
+        assert diags.mass.shape == (stats.steps + 1, 2)
+        assert diags.mass == pytest.approx(diags.mass[0] + 0.0 * diags.mass)
+        assert diags.moment[-1] / diags.mass[-1] == pytest.approx([5.0, 5.0], abs=0.1)
+        assert (diags.negative == 0).all() and diags.maximum[0] == pytest.approx([1.0, 2.0])
+
+    for method in ("moving_grid", "strang_splitting", "linear_operator"):
+        with pytest.raises(ValueError, match=f"diagnostics not supported with {method}"):
+            set_solver(method, diagnostics=True)
+
+    with pytest.raises(ValueError, match="diagnostics not supported with stream or store"):
+        set_solver("finite_volume", stream=True, diagnostics=True)
+
+    with pytest.raises(ValueError, match="method not supported"):
+        set_solver("forward_euler", diagnostics=True)
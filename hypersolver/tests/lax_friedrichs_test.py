@@ -1,8 +1,11 @@
 """ test: Lax-Friedrichs finite-difference scheme """
 
+import pytest
+
 from hypersolver.util import xnp as np
 from hypersolver.util import jxt as jit
-from hypersolver.lax_friedrichs import lx_next, lx_loop
+from hypersolver.util import set_grid
+from hypersolver.lax_friedrichs import lx_next, lx_next_par, lx_loop
 
 
 def test_lx_next():
@@ -22,23 +25,123 @@ def test_lx_next():
         _array, _array, 1.0, 0.0, 0.01
     ).shape == (_array.size,)
 
+    out, work = np.empty(_array.shape), np.empty((3,) + _array.shape)
+    lx_next(
+        _array, _array, _array, _array, 0.01, out, work
+    )
+    assert out == pytest.approx(lx_next(
+        _array, _array, _array, _array, 0.01))
+
 
-def test_lx_loop():
+def test_lx_loop(xvar, yvar, flux, sink):
     """ test: loop for lx scheme """
 
-    xvar = np.linspace(1, 10, 100)
-    yvar = 1.0 * (xvar > 4) - 1.0 * (xvar > 6)
+    time = np.linspace(0, 2, 1000)
+    assert (lx_loop(time, yvar.reshape(1, -1), xvar,
+            flux, sink, 0.9))[-1].shape[0] >= 100
+
+
+def test_lx_loop_snaps(xvar, yvar, flux, sink):
+    """ test: preallocated snapshots for lx scheme """
+
+    time = np.linspace(0, 2, 1000)
+    tims, sols = lx_loop(time, yvar, xvar, flux, sink, 0.9, 10)
+    assert tims.shape == (sols.shape[0],)
+    assert 10 <= sols.shape[0] <= 11
+    assert sols.shape[1] == xvar.size
+
+    tims, sols = lx_loop(time, yvar, xvar, flux, sink, 0.9, 10, 1)
+    assert (tims[1:] > tims[:-1]).all()
+    assert sols.shape[0] > 100
+
+
+def test_lx_loop_dense(xvar, yvar, flux, sink):
+    """ test: saving the lx scheme exactly at the requested times """
+
+    time = np.asarray([0.0, 0.1, 0.15, 1.0, 2.0])
+    tims, sols = lx_loop(time, yvar, xvar, flux, sink, 0.9, 100, 0, True)
+    assert tims == pytest.approx(time)
+    assert sols.shape == (time.size, xvar.size)
+
+
+def test_lx_loop_batched(xvar, flux, sink):
+    """ test: loop for lx scheme over a batch of initial conditions """
+
+    yvar = np.stack((
+        1.0 * (xvar > 4) - 1.0 * (xvar > 6),
+        1.0 * (xvar > 2) - 1.0 * (xvar > 3),
+    ))
+
+    time = np.linspace(0, 2, 1000)
+    tims, sols = lx_loop(time, yvar, xvar, flux, sink, 0.9)
+    assert sols.shape == (tims.size,) + yvar.shape
+    assert sols[:, 1] == pytest.approx(
+        lx_loop(time, yvar[1], xvar, flux, sink, 0.9)[-1])
+
+
+def test_lx_loop_adaptive(xvar, yvar, flux, sink):
+    """ test: adaptive time stepping for lx scheme """
+
+    time = np.linspace(0, 2, 11)
+    tims, sols = lx_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, False, 1)
+    assert tims == pytest.approx(time)
+    assert sols.shape == (time.size, xvar.size)
+    assert sols[-1] == pytest.approx(lx_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, True)[-1][-1], abs=1e-2)
+
+    tims, sols = lx_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, False, 5, 1.1, 0.5)
+    assert tims[-1] == time[-1]
+    assert np.isfinite(sols).all()
+
+
+def test_lx_loop_halt():
+    """ test: early termination of lx scheme """
+
+    xvar = np.linspace(0, 1, 101)
+    yvar = np.zeros(101)
+    time = np.linspace(0, 100, 11)
 
     @jit(nopython=True)
     def flux(yvar, xvar):  # pylint: disable=unused-argument
         """ flux """
-        return 5 / xvar
+        return 0.5 + 0.0 * xvar
 
     @jit(nopython=True)
     def sink(yvar, xvar):  # pylint: disable=unused-argument
         """ sink """
-        return -0.01 * yvar
+        return 1.0 - yvar
 
-    time = np.linspace(0, 2, 1000)
-    assert (lx_loop(time, yvar.reshape(1, -1), xvar,
-            flux, sink, 0.9))[-1].shape[0] >= 100
+    @jit(nopython=True)
+    def event(tval, nval):  # pylint: disable=unused-argument
+        """ event """
+        return nval.max() - 0.9
+
+    for adaptive in (0, 1):
+        tims, sols = lx_loop(
+            time, yvar, xvar, flux, sink, 0.9, 100, 0, False, adaptive,
+            halt=1e-4)
+        assert 1.0 < tims[-1] < 20.0 and sols.shape[0] == tims.size
+        assert sols[-1].max() == pytest.approx(1.0, abs=1e-3)
+
+        tims, sols = lx_loop(
+            time, yvar, xvar, flux, sink, 0.9, 100, 0, False, adaptive,
+            event=event)
+        assert tims[-1] == pytest.approx(np.log(10.0), abs=0.1)
+        assert sols[-1].max() == pytest.approx(0.9, abs=1e-2)
+
+
+@pytest.mark.slow
+def test_lx_next_par():
+    """ test: next step according to lx scheme in one threaded pass """
+
+    xvar = np.geomspace(1, 10, 100)
+    yvar = np.stack((np.sin(xvar), np.cos(xvar)))
+
+    for grid in (set_grid(xvar), set_grid(np.linspace(1, 10, 100))):
+        for flux, sink in ((1.0 / xvar, -0.1 * yvar), (2.0, 0.0)):
+
+            assert lx_next_par(
+                yvar, grid, flux, sink, 0.01
+            ) == pytest.approx(lx_next(yvar, grid, flux, sink, 0.01))
@@ -1,8 +1,11 @@
 """ test: Lax-Wendroff finite-difference scheme """
 
+import pytest
+
 from hypersolver.util import xnp as np
 from hypersolver.util import jxt as jit
-from hypersolver.lax_wendroff import lw_next, lw_loop
+from hypersolver.util import set_grid
+from hypersolver.lax_wendroff import lw_next, lw_next_par, lw_loop
 
 
 def test_lx_next():
@@ -22,24 +25,68 @@ def test_lx_next():
         _array, _array, _array, (_array, _array), 0.09
     ).shape == (_array.size,)
 
+    out, work = np.empty(_array.shape), np.empty((4,) + _array.shape)
+    lw_next(
+        _array, _array, _array, (_array, _array), 0.01, out, work
+    )
+    assert out == pytest.approx(lw_next(
+        _array, _array, _array, (_array, _array), 0.01))
+
 
-def test_lw_loop():
+@pytest.mark.slow
+def test_lw_loop(xvar, yvar, flux, sink):
     """ test: loop for lw scheme """
     # pylint: disable=duplicate-code
 
-    xvar = np.linspace(1, 10, 100)
-    yvar = 1.0 * (xvar > 4) - 1.0 * (xvar > 6)
+    time = np.linspace(0, 2, 1000)
+    assert (lw_loop(time, yvar.reshape(1, -1), xvar,
+            flux, sink, 0.9))[-1].shape[0] >= 100
+
+
+def test_lw_loop_batched(xvar, flux, sink):
+    """ test: loop for lw scheme over a batch of initial conditions """
+
+    yvar = np.stack((
+        1.0 * (xvar > 4) - 1.0 * (xvar > 6),
+        1.0 * (xvar > 2) - 1.0 * (xvar > 3),
+    ))
+
+    time = np.linspace(0, 2, 1000)
+    tims, sols = lw_loop(time, yvar, xvar, flux, sink, 0.9)
+    assert sols.shape == (tims.size,) + yvar.shape
+    assert sols[:, 1] == pytest.approx(
+        lw_loop(time, yvar[1], xvar, flux, sink, 0.9)[-1])
+
+
+def test_lw_loop_adaptive(xvar, sink):
+    """ test: adaptive time stepping for lw scheme """
+
+    yvar = np.exp(-(xvar - 5)**2)
 
     @jit(nopython=True)
     def flux(yvar, xvar):  # pylint: disable=unused-argument
         """ flux """
-        return 5 / xvar
+        return 1.0 + 0.0 * xvar
 
-    @jit(nopython=True)
-    def sink(yvar, xvar):  # pylint: disable=unused-argument
-        """ sink """
-        return -0.01 * yvar
+    time = np.linspace(0, 0.5, 3)
+    tims, sols = lw_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, False, 1)
+    assert tims == pytest.approx(time)
+    assert sols.shape == (time.size, xvar.size)
+    assert sols[-1] == pytest.approx(lw_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, True)[-1][-1], abs=1e-2)
 
-    time = np.linspace(0, 2, 1000)
-    assert (lw_loop(time, yvar.reshape(1, -1), xvar,
-            flux, sink, 0.9))[-1].shape[0] >= 100
+
+@pytest.mark.slow
+def test_lw_next_par():
+    """ test: next step according to lw scheme in one threaded pass """
+
+    xvar = np.geomspace(1, 10, 100)
+    yvar = np.stack((np.sin(xvar), np.cos(xvar)))
+
+    for grid in (set_grid(xvar), set_grid(np.linspace(1, 10, 100))):
+        for flux, sink in ((1.0 / xvar, (-0.1 * yvar, -0.2 * yvar)), (2.0, (0.0, 0.0))):
+
+            assert lw_next_par(
+                yvar, grid, flux, sink, 0.01
+            ) == pytest.approx(lw_next(yvar, grid, flux, sink, 0.01))
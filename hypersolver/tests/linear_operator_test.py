@@ -0,0 +1,120 @@
+""" test: precomputed linear-operator mode """
+
+import pytest
+
+from hypersolver import set_solver, set_term
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.lax_friedrichs import lx_next, lx_loop
+from hypersolver.lax_wendroff import lw_loop
+from hypersolver.linear_operator import operator_util, apply_util
+from hypersolver.linear_operator import jump_util, power_util, squares_util
+from hypersolver.linear_operator import leap_util, lo_loop
+
+
+@jit(nopython=True)
+def flux(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux """
+    return 0.5 * xvar
+
+
+@jit(nopython=True)
+def sink(yvar, xvar):
+    """ sink """
+    return -0.3 * yvar + 0.01 * xvar
+
+
+@jit(nopython=True)
+def source(yvar, xvar):  # pylint: disable=unused-argument
+    """ source """
+    return 0.01 * xvar + 0.0 * yvar
+
+
+@jit(nopython=True)
+def square(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return -yvar**2
+
+
+def test_operator_util():
+    """ test: utility to assemble one step as a banded map """
+
+    xvar = np.geomspace(1, 10, 50)
+    yvar = np.stack((np.sin(xvar), np.cos(xvar)))
+
+    bands, offset = operator_util(xvar, flux(yvar, xvar), sink, 0.01)
+    assert bands.shape == (5, 50)
+
+    expected = lx_next(yvar, xvar, flux(yvar, xvar), sink(yvar, xvar), 0.01)
+    assert apply_util(bands, offset, yvar) == pytest.approx(expected)
+
+    twice = apply_util(bands, offset, apply_util(bands, offset, yvar))
+    assert jump_util(bands, offset, yvar, 2) == pytest.approx(twice)
+    assert jump_util(bands, offset, yvar, 0) == pytest.approx(yvar)
+
+
+def test_power_util():
+    """ test: utility to form m steps as one by repeated squaring """
+
+    xvar = np.linspace(1, 3, 21)
+    yvar = np.stack((np.sin(xvar), np.cos(xvar)))
+    bands, offset = operator_util(xvar, flux(yvar, xvar), sink, 0.01)
+
+    for steps in (1, 2, 7, 20000):
+        power = power_util(bands, offset, steps)
+        assert power[0].shape == (min(4 * steps + 1, 41), 21)
+        assert apply_util(power[0], power[1], yvar) == pytest.approx(
+            jump_util(bands, offset, yvar, steps))
+
+    assert squares_util(2, 21, 20000) < 5 * 20000 * 21
+    assert squares_util(2, 1000, 3000) > 5 * 3000 * 1000
+
+    power = (bands, offset, 0)
+    out, power = leap_util(bands, offset, yvar, 20000, power)
+    assert power[2] == 20000 and out == pytest.approx(jump_util(bands, offset, yvar, 20000))
+    assert leap_util(bands, offset, yvar, 3, power)[0] == pytest.approx(
+        jump_util(bands, offset, yvar, 3))
+
+
+@pytest.mark.slow
+def test_lo_loop():
+    """ test: loop for lo mode matches the stencils it is built from """
+
+    xvar = np.geomspace(1, 10, 100)
+    yvar = np.exp(-(xvar - 3)**2)
+    time = np.linspace(0, 2, 5)
+
+    expected = lx_loop(time, yvar, xvar, flux, sink, 0.9, 100, 0, True)[1]
+    for jump in (False, True):
+        tims, sols = lo_loop(
+            time, yvar, xvar, flux, sink, 0.9, 100, 0, True,
+            "lax_friedrichs", jump)
+
+        assert tims == pytest.approx(time)
+        assert sols == pytest.approx(expected)
+
+    tims, sols = lo_loop(time, yvar, xvar, flux, sink, 0.9, 10)
+    assert sols == pytest.approx(lx_loop(time, yvar, xvar, flux, sink, 0.9, 10)[1])
+
+    tims, sols = set_solver("linear_operator")(
+        time, np.stack((yvar, yvar)), xvar, flux, source, 0.9, 100, 0, True,
+        "lax_wendroff", True)
+    assert sols[:, 1] == pytest.approx(lw_loop(
+        time, yvar, xvar, flux, source, 0.9, 100, 0, True)[1])
+
+    with pytest.raises(ValueError):
+        lo_loop(time, yvar, xvar, sink, sink, 0.9)
+
+    with pytest.raises(ValueError, match="affine"):
+        lo_loop(time, yvar, xvar, flux, square, 0.9)
+
+    tims, sols = set_solver("linear_operator")(
+        time, yvar, xvar, set_term(flux, "space"), sink, 0.9, 100, 0, True)
+    assert sols == pytest.approx(expected)
+
+    xvar = np.linspace(1, 3, 21)
+    yvar = np.exp(-(xvar - 2)**2)
+    time = np.linspace(0, 20, 3)
+    assert lo_loop(
+        time, yvar, xvar, flux, sink, 0.01, 100, 0, True, "lax_friedrichs", True
+    )[1] == pytest.approx(lo_loop(time, yvar, xvar, flux, sink, 0.01, 100, 0, True)[1])
@@ -1,12 +1,43 @@
 """ test: method of characteristics """
 
+import pytest
+
+from hypersolver import set_solver
 from hypersolver.util import xnp as np
-from hypersolver.method_of_characteristics import moc_next
+from hypersolver.util import jxt as jit
+from hypersolver.method_of_characteristics import depart_util, pchip_util
+from hypersolver.method_of_characteristics import moc_next, moc_loop
 
 # pylint: disable=unused-argument
 # pylint: disable=unused-variable
 
 
+@jit(nopython=True)
+def flux(yvar, xvar):
+    """ flux """
+    return 0.5 * xvar
+
+
+@jit(nopython=True)
+def sink(yvar, xvar):
+    """ sink """
+    return -0.1 * yvar
+
+
+def test_depart_util():
+    """ test: utility to trace the characteristics back """
+
+    xvar = np.linspace(1, 10, 100)
+
+    depart, cells, offset, inside, jacobian = depart_util(1.0, xvar, 0.5)
+    assert depart[0] == pytest.approx(xvar - 0.5)
+    assert inside[0].sum() == (xvar >= 1.5).sum()
+    assert jacobian[0] == pytest.approx(1.0)
+    assert (offset[0][inside[0]] >= 0).all() and (offset[0][inside[0]] <= 1).all()
+
+    assert pchip_util(np.abs(xvar - 5), xvar)[43:46] == pytest.approx([-1, 0, 1])
+
+
 def test_moc_next():
     """ test: method of characteristics """
 
@@ -28,3 +59,50 @@ def test_moc_next():
 
     assert moc_next(
         nvar, xvar, 1.0, 0.1, 0.1).shape == nvar.shape
+
+
+def test_moc_next_values():
+    """ test: method of characteristics on the values of f and g """
+
+    xvar = np.linspace(1, 10, 1000)
+
+    nvar = 1.0 * (xvar > 4) - 1.0 * (xvar > 6)
+
+    assert moc_next(
+        nvar, xvar, flux, sink, 0.1) == pytest.approx(moc_next(
+            nvar, xvar, 0.5 * xvar, -0.1 * nvar, 0.1))
+
+    assert moc_next(
+        nvar, xvar, 1 / xvar, -nvar**2, 0.1).shape == nvar.shape
+
+    assert moc_next(
+        nvar, xvar, 1 / xvar, 0.1, 0.1).shape == nvar.shape
+
+    assert moc_next(
+        nvar, xvar, 1.0, 0.1, 0.1, "pchip").shape == nvar.shape
+
+    with pytest.raises(ValueError):
+        moc_next(nvar, xvar, 1.0, 0.1, 0.1, "cubic")
+
+
+def test_moc_loop():
+    """ test: loop for moc scheme follows growth at large steps """
+
+    xvar = np.linspace(0.01, 20, 400)
+    yvar = np.exp(-(xvar - 3)**2)
+    time = np.linspace(0, 2, 3)
+
+    exact = np.exp(-(xvar * np.exp(-1.0) - 3)**2) * np.exp(-1.2)
+
+    for kind in ("linear", "pchip"):
+        tims, sols = moc_loop(
+            time, yvar, xvar, flux, sink, 5.0, 100, 0, True, kind)
+
+        assert tims == pytest.approx(time)
+        assert sols[-1] == pytest.approx(exact, abs=5e-3)
+
+    tims, sols = set_solver("method_of_characteristics")(
+        time, np.stack((yvar, yvar)), xvar, flux, sink, 5.0, 100, 0, True,
+        "linear", True)
+    assert sols[:, 1] == pytest.approx(moc_loop(
+        time, yvar, xvar, flux, sink, 5.0, 100, 0, True)[1])
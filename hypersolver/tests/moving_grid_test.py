@@ -0,0 +1,120 @@
+""" test: moving-grid (Lagrangian) finite-volume scheme """
+
+import pytest
+
+from hypersolver import set_solver
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.util import set_grid
+from hypersolver.moving_grid import remap_util, mesh_util, mg_next, mg_loop
+from hypersolver.moving_grid import lagrange_step_util
+
+
+@jit(nopython=True)
+def flux(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux """
+    return 0.5 * xvar
+
+
+@jit(nopython=True)
+def sink(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return 0.0 * yvar
+
+
+@jit(nopython=True)
+def uniform(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux """
+    return 1.0 + 0.0 * xvar
+
+
+@jit(nopython=True)
+def decay(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return -0.5 * yvar
+
+
+def test_remap_util():
+    """ test: utility to remap n conservatively between cell faces """
+
+    grid = set_grid(np.geomspace(1, 10, 50))
+    faces = grid.faces
+    yvar = np.stack((np.exp(-(grid.vars_ - 4)**2), np.ones(50)))
+
+    new_faces = mesh_util(yvar, faces)
+    assert new_faces[0] == faces[0] and new_faces[-1] == faces[-1]
+    assert (np.diff(new_faces) > 0).all()
+    assert np.diff(new_faces)[yvar[0].argmax()] < np.diff(faces)[yvar[0].argmax()]
+
+    out = remap_util(yvar, faces, new_faces)
+    assert (out * np.diff(new_faces)).sum(-1) == pytest.approx(
+        (yvar * np.diff(faces)).sum(-1), rel=1e-14)
+    assert out[1] == pytest.approx(np.ones(50))
+
+
+def test_lagrange_step_util():
+    """ test: utility to calculate the time_step of the moving grid """
+
+    faces = set_grid(np.linspace(0, 10, 101)).faces
+    yvar = np.exp(-(faces[1:] - 3)**2)
+
+    assert lagrange_step_util(yvar, faces, flux, sink, 0.5) == pytest.approx(1.0)
+    assert lagrange_step_util(yvar, faces, flux, decay, 0.2) == pytest.approx(0.4)
+    assert lagrange_step_util(yvar, faces, uniform, decay, 0.2) == pytest.approx(0.4)
+
+
+def test_mg_next():
+    """ test: next step moves the faces and keeps sum(n Δx) """
+
+    faces = set_grid(np.linspace(1, 10, 10)).faces
+    yvar = np.linspace(1, 2, 10)
+
+    out, moved = mg_next(yvar, faces, 2.0, 0.0, 0.1)
+    assert moved == pytest.approx(faces + 0.2)
+    assert out == pytest.approx(yvar)
+
+    out, moved = mg_next(yvar, faces, flux(yvar, yvar), 0.0, 0.1)
+    assert (out * np.diff(moved)).sum() == pytest.approx(
+        (yvar * np.diff(faces)).sum(), rel=1e-14)
+
+    batch = np.stack((yvar, 2.0 * yvar))
+    out, moved = mg_next(batch, faces, flux(batch, yvar), 0.0, 0.1)
+    assert out == pytest.approx(np.stack((out[0], 2.0 * out[0])))
+
+    with pytest.raises(ValueError):
+        mg_next(batch, faces, batch, 0.0, 0.1)
+
+
+def test_mg_loop():
+    """ test: loop for mg scheme follows growth on its own grids """
+
+    xvar = np.geomspace(1, 10, 80)
+    yvar = np.exp(-((np.log(xvar) - 1.0) / 0.2)**2)
+    mass = (yvar * set_grid(xvar).widths).sum()
+
+    time = np.linspace(0, 1, 5)
+    for remesh in (0, 5):
+        tims, sols, grids = mg_loop(
+            time, yvar, xvar, flux, sink, 0.5, 100, 0, True, remesh)
+
+        assert tims == pytest.approx(time)
+        assert grids.shape == (time.size, xvar.size + 1)
+        assert (sols * np.diff(grids)).sum(-1) == pytest.approx(mass, rel=1e-12)
+
+        # the peak grows as x e^(t/2) along with the grid
+        centres = 0.5 * (grids[-1, 1:] + grids[-1, :-1])
+        assert centres[sols[-1].argmax()] == pytest.approx(
+            np.exp(1.0 + 0.5), rel=0.05)
+
+    # a uniform f moves the faces rigidly, and only g limits Δt
+    tims, sols, grids = mg_loop(
+        np.linspace(0, 4, 41), yvar, xvar, uniform, decay, 0.5, 100, 0, True)
+    assert tims[-1] == pytest.approx(4.0) and grids[-1] == pytest.approx(grids[0] + 4.0)
+    assert (sols[-1] * np.diff(grids[-1])).sum() == pytest.approx(mass * np.exp(-2.0), rel=0.1)
+
+    sols = mg_loop(time, np.stack((yvar, 2.0 * yvar)), xvar, flux, sink, 0.5)[1]
+    assert sols[:, 1] == pytest.approx(2.0 * sols[:, 0])
+
+    tims, sols, grids = set_solver("moving_grid").warmup(
+        time, yvar, xvar, flux, sink, 0.5)
+    assert sols.shape == (1, xvar.size) and grids.shape == (1, xvar.size + 1)
@@ -1,8 +1,12 @@
 """ test: Runge-Kutta methods for ode solvers """
 
+import pytest
+
+from hypersolver import set_solver
 from hypersolver.util import xnp as np
 from hypersolver.util import jxt as jit
 from hypersolver.runge_kutta import rk2_next, rk_loop
+from hypersolver.runge_kutta import rk45_next, rk45_step, rk45_loop
 
 
 def test_rk2_next():
@@ -19,17 +23,120 @@ def test_rk2_next():
         inputs, inputs, func, 0.0, 0.1).shape == inputs.shape
 
 
-def test_lx_loop():
+def test_lx_loop(xvar, yvar, flux):
     """ test: loop for lx scheme """
 
-    xvar = np.linspace(1, 10, 100)
-    yvar = 1.0 * (xvar > 4) - 1.0 * (xvar > 6)
-
-    @jit(nopython=True)
-    def flux(yvar, xvar):  # pylint: disable=unused-argument
-        """ flux """
-        return 5 / xvar
-
     time = np.linspace(0, 2, 1000)
     assert (rk_loop(time, yvar.reshape(1, -1), xvar,
             flux, 0.9))[-1].shape[0] >= 100
+
+
+def test_rk2_next_batched():
+    """ test: 2nd order Runge-Kutta method over a batch """
+
+    inputs = np.linspace(1, 100, 1000)
+    batch = np.stack((inputs, 2.0 * inputs))
+
+    @jit(nopython=True)
+    def func(yvar, xvar):
+        """ func """
+        return yvar/xvar
+
+    assert rk2_next(
+        batch, inputs, func, 0.0, 0.1).shape == batch.shape
+    assert rk2_next(
+        batch, inputs, func, 0.0, 0.1)[1] == pytest.approx(
+            rk2_next(2.0 * inputs, inputs, func, 0.0, 0.1))
+
+
+def test_rk45_next():
+    """ test: Dormand-Prince 5(4) Runge-Kutta method """
+
+    inputs = np.linspace(1, 2, 100)
+
+    @jit(nopython=True)
+    def func(yvar, xvar):
+        """ func """
+        return -xvar * yvar
+
+    next_, error_, deriv_ = rk45_next(
+        inputs, inputs, func, func(inputs, inputs), 0.1)
+
+    assert next_ == pytest.approx(inputs * np.exp(-0.1 * inputs))
+    assert np.abs(error_).max() < 1e-6
+    assert deriv_ == pytest.approx(func(next_, inputs))
+
+
+def test_rk45_loop():
+    """ test: adaptive loop for rk45 """
+
+    xvar = np.linspace(1, 2, 100)
+    yvar = np.stack((np.ones(100), 2.0 * np.ones(100)))
+
+    @jit(nopython=True)
+    def func(yvar, xvar):
+        """ func """
+        return -xvar * yvar
+
+    time = np.linspace(0, 2, 5)
+    tims, sols = rk45_loop(time, yvar, xvar, func, 1e-8, 1e-10)
+    assert tims == pytest.approx(time)
+    assert sols.shape == (time.size,) + yvar.shape
+    assert sols[:, 1] == pytest.approx(
+        2.0 * np.exp(-np.outer(time, xvar)), abs=1e-7)
+
+
+def test_rk45_step():
+    """ test: next Δt of rk45 """
+
+    assert rk45_step(1e-12, 1.0, 0.01, 0.0, 0, 10) == pytest.approx(1.0)
+    assert rk45_step(1e-12, 1.0, 1.0, 0.0, 0, 10) == pytest.approx(10.0)
+    assert rk45_step(32.0, 1.0, 0.01, 0.0, 0, 10) == pytest.approx(0.0045)
+
+    with pytest.raises(ValueError):
+        rk45_step(np.nan, 1.0, 1.0, 0.0, 0, 10)
+    with pytest.raises(RuntimeError):
+        rk45_step(0.5, 1.0, 1.0, 0.0, 10, 10)
+    with pytest.raises(RuntimeError):
+        rk45_step(1e10, 1e-20, 1e-20, 1.0, 0, 10)
+
+
+@jit(nopython=True)
+def decay(yvar, xvar):
+    """ func """
+    return -xvar * yvar
+
+
+@jit(nopython=True)
+def blowup(yvar, xvar):  # pylint: disable=unused-argument
+    """ func """
+    return np.nan * yvar
+
+
+@jit(nopython=True)
+def half(tval, yvar):  # pylint: disable=unused-argument
+    """ event """
+    return yvar.max() - 0.5
+
+
+@pytest.mark.slow
+def test_rk45_loop_stops():
+    """ test: adaptive loop for rk45 stops on errors and events """
+
+    xvar = np.linspace(1, 2, 100)
+    yvar = np.ones(100)
+    time = np.linspace(0, 2, 5)
+
+    with pytest.raises(ValueError):
+        rk45_loop(time, yvar, xvar, blowup)
+    with pytest.raises(RuntimeError):
+        rk45_loop(time, yvar, xvar, decay, 1e-12, 1e-12, 3)
+
+    tims, sols = rk45_loop(time, yvar, xvar, decay, event=half)
+    assert tims[-1] == pytest.approx(np.log(2.0), abs=0.2)
+    assert sols[-1].max() <= 0.5 < sols[-2].max()
+
+    tims, sols, diags = set_solver("runge_kutta_45", diagnostics=True)(
+        time, yvar, xvar, decay)
+    assert diags.time[0] == 0.0 and diags.time[-1] == pytest.approx(2.0)
+    assert (np.diff(diags.mass) < 0.0).all()
@@ -0,0 +1,88 @@
+""" test: split-step scheme for stiff sinks """
+
+import pytest
+
+from hypersolver import set_solver, set_term
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.split_step import sink_step_util, sp_next, sp_loop
+from hypersolver.lax_friedrichs import lx_loop
+
+
+@jit(nopython=True)
+def flux(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux """
+    return np.ones(xvar.shape)
+
+
+@jit(nopython=True)
+def sink(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return -1000.0 * yvar
+
+
+@jit(nopython=True)
+def linear(yvar, xvar):  # pylint: disable=unused-argument
+    """ linear sink """
+    return -5.0 * yvar + 1.0
+
+
+@jit(nopython=True)
+def nosink(yvar, xvar):  # pylint: disable=unused-argument
+    """ sink """
+    return 0.0 * yvar
+
+
+def test_sink_step_util():
+    """ test: utility to integrate dn/dt = g alone """
+
+    yvar = np.linspace(1, 2, 10)
+
+    terms = (-5.0 * np.ones(10), np.ones(10))
+    assert sink_step_util(yvar, yvar, terms, 0.1, "exponential") == pytest.approx(
+        yvar * np.exp(-0.5) + (1.0 - np.exp(-0.5)) / 5.0)
+    assert sink_step_util(yvar, yvar, (0.0 * yvar, yvar), 0.1, "exponential") == pytest.approx(
+        1.1 * yvar)
+    assert sink_step_util(yvar, yvar, sink, 0.1) == pytest.approx(
+        yvar / 101.0, rel=1e-6)
+
+    with pytest.raises(ValueError):
+        sink_step_util(yvar, yvar, sink, 0.1, "explicit")
+
+    with pytest.raises(ValueError):
+        sink_step_util(yvar, yvar, linear, 0.1, "exponential")
+
+
+def test_sp_next():
+    """ test: next step according to sp scheme """
+
+    _array = np.linspace(1, 10, 100)
+
+    assert sp_next(
+        _array, _array, _array, sink, 0.01
+    ).shape == (_array.size,)
+
+    assert sp_next(
+        _array, _array, 1.0, nosink, 0.01, "lax_wendroff"
+    ).shape == (_array.size,)
+
+
+def test_sp_loop():
+    """ test: loop for sp scheme keeps stiff sinks stable at the CFL step """
+
+    xvar = np.linspace(0, 10, 100)
+    yvar = np.exp(-(xvar - 3)**2)
+    time = np.linspace(0, 1, 3)
+
+    assert np.abs(lx_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, True)[1][-1]).max() > 1e3
+
+    tims, sols = sp_loop(time, yvar, xvar, flux, sink, 0.9, 100, 0, True)
+    assert tims == pytest.approx(time)
+    assert sols[-1].min() >= 0.0 and sols[-1].max() < 1e-30
+
+    tims, sols = set_solver("split_step")(
+        time, np.ones(xvar.size), xvar, flux, set_term(linear, "linear"), 0.9, 100, 0, True,
+        "lax_friedrichs", "exponential")
+    assert sols == pytest.approx(np.broadcast_to((
+        np.exp(-5.0 * time) + (1.0 - np.exp(-5.0 * time)) / 5.0)[:, None], sols.shape))
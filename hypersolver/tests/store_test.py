@@ -0,0 +1,78 @@
+""" test: storing solutions on disk with checkpoint/restart """
+
+import json
+import pytest
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.store import set_store, meta_util
+
+
+def test_set_store(xvar, yvar, flux, sink, tmp_path):
+    """ test: wrapper function to select solvers storing to path """
+
+    time = np.linspace(0, 2, 11)
+
+    full = set_store("lax_friedrichs", tmp_path / "full.npy")
+    tims, sols = full(time, yvar, xvar, flux, sink, 0.9)
+    assert tims == pytest.approx(time)
+    assert sols.shape == (time.size, xvar.size)
+
+    def crash(tval, nval):  # pylint: disable=unused-argument
+        """ crash midway """
+        if tval > 1.0:
+            raise RuntimeError
+
+    part = set_store("lax_friedrichs", tmp_path / "part.npy")
+    with pytest.raises(RuntimeError):
+        part(time, yvar, xvar, flux, sink, 0.9, callback=crash)
+
+    with open(meta_util(tmp_path / "part.npy"), encoding="utf-8") as sidecar:
+        meta = json.load(sidecar)
+        assert meta["step"] == 5 and meta["interval"] == pytest.approx(0.2)
+        assert meta["shape"] == [xvar.size]
+
+    _, sols = part(time, yvar, xvar, flux, sink, 0.9, resume=True)
+    assert np.asarray(sols) == pytest.approx(np.load(tmp_path / "full.npy"))
+
+    with pytest.raises(ValueError):
+        part(time[:-1], yvar, xvar, flux, sink, 0.9, resume=True)
+    with pytest.raises(ValueError):
+        part(time, yvar, 2.0 * xvar, flux, sink, 0.9, resume=True)
+    with pytest.raises(ValueError):
+        part(time, np.stack((yvar, yvar)), xvar, flux, sink, 0.9, resume=True)
+
+
+@jit(nopython=True)
+def flux2(yvar, xvar, zvar):  # pylint: disable=unused-argument
+    """ flux """
+    return np.ones(xvar.shape), 0.5 * np.ones(zvar.shape)
+
+
+@jit(nopython=True)
+def sink2(yvar, xvar, zvar):  # pylint: disable=unused-argument
+    """ sink """
+    return 0.0 * yvar
+
+
+def test_set_store_2d(tmp_path):
+    """ test: storing the (x, y) grids of strang_splitting """
+
+    xvar, zvar = np.linspace(0, 10, 30), np.linspace(0, 5, 20)
+    yvar = np.exp(-(xvar[:, None] - 3)**2 - (zvar[None, :] - 2)**2)
+    time = np.linspace(0, 1, 3)
+
+    store = set_store("strang_splitting", tmp_path / "ss.npy")
+    tims, sols = store(time, yvar, (xvar, zvar), flux2, sink2, 0.9)
+    assert tims == pytest.approx(time)
+    assert sols.shape == (time.size, xvar.size, zvar.size)
+
+    with open(meta_util(tmp_path / "ss.npy"), encoding="utf-8") as sidecar:
+        meta = json.load(sidecar)
+        assert [axis["size"] for axis in meta["grid"]] == [xvar.size, zvar.size]
+
+    _, again = store(time, yvar, (xvar, zvar), flux2, sink2, 0.9, resume=True)
+    assert np.asarray(again) == pytest.approx(np.asarray(sols))
+
+    with pytest.raises(ValueError):
+        store(time, yvar, (xvar, 2.0 * zvar), flux2, sink2, 0.9, resume=True)
@@ -0,0 +1,74 @@
+""" test: dimension-split (Strang) scheme in 2-D """
+
+import pytest
+
+from hypersolver import set_solver
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.lax_friedrichs import lx_next
+from hypersolver.strang_splitting import joint_step_util, ss_next, ss_loop
+
+
+@jit(nopython=True)
+def flux(yvar, xvar, zvar):  # pylint: disable=unused-argument
+    """ flux """
+    return np.ones(xvar.shape), 0.5 * np.ones(zvar.shape)
+
+
+@jit(nopython=True)
+def sink(yvar, xvar, zvar):  # pylint: disable=unused-argument
+    """ sink """
+    return 0.0 * yvar
+
+
+def test_joint_step_util():
+    """ test: utility to calculate the joint CFL time_step """
+
+    xvar, zvar = np.linspace(0, 10, 11), np.linspace(0, 1, 11)
+
+    assert joint_step_util(
+        (xvar, zvar), (np.ones(3), 0.5 * np.ones(3)), 0.9
+    ) == pytest.approx(0.9 * 0.1 / 0.5)
+
+
+def test_ss_next():
+    """ test: next step matches the 1-D scheme along x alone """
+
+    xvar, zvar = np.linspace(0, 10, 60), np.linspace(0, 5, 40)
+    yvar = np.repeat(np.exp(-(xvar - 3)**2)[:, None], zvar.size, 1)
+
+    expected = lx_next(lx_next(
+        yvar[:, 0], xvar, 1.0, 0.0, 0.025), xvar, 1.0, 0.0, 0.025)
+
+    out = ss_next(yvar, (xvar, zvar), (1.0, 0.0), 0.0, 0.05)
+    assert out.shape == yvar.shape
+    assert out == pytest.approx(np.repeat(expected[:, None], zvar.size, 1))
+
+    with pytest.raises(ValueError):
+        ss_next(yvar, (xvar, zvar), (1.0, 0.0), 0.0, 0.05, "upwind")
+
+
+@pytest.mark.slow
+def test_ss_loop():
+    """ test: loop for ss scheme moves n along both axes at once """
+
+    xvar, zvar = np.linspace(0, 10, 60), np.linspace(0, 5, 40)
+    yvar = np.exp(-(xvar[:, None] - 3)**2 - (zvar[None, :] - 2)**2)
+
+    time = np.linspace(0, 2, 3)
+    for scheme in ("lax_friedrichs", "lax_wendroff"):
+        tims, sols = ss_loop(
+            time, np.stack((yvar, 2 * yvar)), (xvar, zvar), flux, sink,
+            0.9, 100, 0, True, scheme)
+
+        assert tims == pytest.approx(time)
+        assert sols.shape == (time.size, 2) + yvar.shape
+        assert sols[-1, 1] == pytest.approx(2 * sols[-1, 0])
+
+        peak = np.unravel_index(sols[-1, 0].argmax(), yvar.shape)
+        assert xvar[peak[0]] == pytest.approx(5.0, abs=0.2)
+        assert zvar[peak[1]] == pytest.approx(3.0, abs=0.2)
+
+    tims, sols = set_solver("strang_splitting")(
+        time, yvar, (xvar, zvar), flux, sink, 0.9, 100, 0, True)
+    assert sols.shape == (time.size,) + yvar.shape
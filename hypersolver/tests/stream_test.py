@@ -0,0 +1,152 @@
+""" test: streaming solutions one requested time at a time """
+
+import pytest
+
+from hypersolver.util import xnp as np
+from hypersolver.util import jxt as jit
+from hypersolver.lax_friedrichs import lx_loop
+from hypersolver.lax_wendroff import lw_loop
+from hypersolver.crank_nicolson import cn_loop
+from hypersolver.method_of_characteristics import moc_loop
+from hypersolver.linear_operator import lo_loop
+from hypersolver.runge_kutta import rk45_loop
+from hypersolver.stream import set_stream
+
+
+def test_set_stream(xvar, yvar, flux, sink):
+    """ test: wrapper function to select streaming solvers """
+
+    with pytest.raises(ValueError):
+        set_stream("forward_euler")
+
+    time = np.linspace(0, 2, 11)
+    seen = []
+
+    stream = set_stream("lax_friedrichs")(
+        time, yvar, xvar, flux, sink, 0.9,
+        callback=lambda tval, nval: seen.append(tval))
+
+    tims, sols = zip(*stream)
+
+    assert np.asarray(tims) == pytest.approx(time)
+    assert np.asarray(seen) == pytest.approx(time)
+
+    @jit(nopython=True)
+    def event(tval, nval):  # pylint: disable=unused-argument
+        """ event """
+        return tval - 0.5
+
+    halted = [tval for tval, _ in set_stream("lax_friedrichs")(
+        time, yvar, xvar, flux, sink, 0.9, event=event)]
+    assert halted[:-1] == pytest.approx(time[:3])
+    assert 0.5 <= halted[-1] < 0.6
+    assert sols[-1] == pytest.approx(lx_loop(
+        time, yvar, xvar, flux, sink, 0.9, 100, 0, True)[-1][-1], abs=1e-2)
+
+
+def test_set_stream_ode():
+    """ test: streaming the adaptive rk45 loop """
+
+    xvar = np.linspace(1, 2, 10)
+
+    @jit(nopython=True)
+    def func(yvar, xvar):
+        """ func """
+        return -xvar * yvar
+
+    time = np.linspace(0, 1, 4)
+
+    for tval, nval in set_stream("runge_kutta_45")(
+            time, np.ones(10), xvar, func, 1e-8, 1e-10):
+        assert nval == pytest.approx(np.exp(-tval * xvar), abs=1e-7)
+
+
+def test_set_stream_halt():
+    """ test: halt= counts the steps of the whole stream """
+
+    xvar = np.linspace(0, 1, 101)
+    yvar = np.zeros(101)
+    time = np.linspace(0, 20, 2001)
+
+    @jit(nopython=True)
+    def flux(yvar, xvar):  # pylint: disable=unused-argument
+        """ flux """
+        return 0.5 + 0.0 * xvar
+
+    @jit(nopython=True)
+    def sink(yvar, xvar):  # pylint: disable=unused-argument
+        """ sink """
+        return 1.0 - yvar
+
+    for adaptive in (0, 1):
+        tims, sols = lx_loop(
+            time, yvar, xvar, flux, sink, 0.9, 100, 0, True, adaptive, halt=1e-4)
+        assert 1.0 < tims[-1] < 20.0
+
+        streamed = list(set_stream("lax_friedrichs")(
+            time, yvar, xvar, flux, sink, 0.9, adaptive=adaptive, halt=1e-4))
+        assert streamed[-1][0] == pytest.approx(tims[-1])
+        assert streamed[-1][1] == pytest.approx(sols[-1])
+
+
+@jit(nopython=True)
+def steady_flux(yvar, xvar):  # pylint: disable=unused-argument
+    """ steady flux """
+    return 0.5 + 0.5 * xvar
+
+
+@jit(nopython=True)
+def state_flux(yvar, xvar):  # pylint: disable=unused-argument
+    """ flux depending on n """
+    return 0.5 + 0.1 * yvar
+
+
+@jit(nopython=True)
+def decay_sink(yvar, xvar):
+    """ sink affine in n """
+    return xvar - yvar
+
+
+@pytest.mark.parametrize("method, loop, flux, kwargs", [
+    ("lax_wendroff", lw_loop, state_flux, {}),
+    ("lax_wendroff", lw_loop, state_flux, {"adaptive": 1}),
+    ("lax_friedrichs", lx_loop, state_flux, {"adaptive": 3}),
+    ("crank_nicolson", cn_loop, steady_flux, {"steady": True}),
+    ("method_of_characteristics", moc_loop, steady_flux, {"steady": True}),
+    ("linear_operator", lo_loop, steady_flux, {"jump": True}),
+])
+def test_set_stream_state(method, loop, flux, kwargs):
+    """ test: the stream resumes the state of the loop at each interval """
+
+    xvar = np.linspace(0, 1, 41)
+    yvar = np.exp(-50 * (xvar - 0.3)**2)
+    time = np.linspace(0, 0.5, 6)
+
+    tims, sols = loop(
+        time, yvar, xvar, flux, decay_sink, 0.9, 100, 0, True, **kwargs)[:2]
+    streamed = list(set_stream(method)(
+        time, yvar, xvar, flux, decay_sink, 0.9, **kwargs))
+
+    assert np.asarray([tval for tval, _ in streamed]) == pytest.approx(tims)
+    assert np.asarray([nval for _, nval in streamed]) == pytest.approx(
+        sols, rel=1e-12, abs=1e-12)
+
+
+def test_set_stream_rk45_state():
+    """ test: the stream resumes Δt of rk45 at each interval """
+
+    xvar = np.linspace(1, 2, 10)
+
+    @jit(nopython=True)
+    def func(yvar, xvar):
+        """ func """
+        return -xvar * yvar
+
+    time = np.linspace(0, 1, 4)
+
+    sols = rk45_loop(time, np.ones(10), xvar, func, 1e-6, 1e-9)[1]
+    streamed = list(set_stream("runge_kutta_45")(
+        time, np.ones(10), xvar, func, 1e-6, 1e-9))
+
+    assert np.asarray([nval for _, nval in streamed]) == pytest.approx(
+        sols, rel=1e-12, abs=1e-12)
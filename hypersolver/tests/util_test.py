@@ -4,9 +4,14 @@ import os
 import pytest
 
 from hypersolver.util import xnp as np
-from hypersolver.util import set_xnp
-from hypersolver.util import term_util
+from hypersolver.util import set_xnp, compile_util
+from hypersolver.util import set_grid, grid_util
+from hypersolver.util import spans_util, points_util, widths_util
+from hypersolver.util import snaps_util, steps_util, term_util
 from hypersolver.util import time_step_util
+from hypersolver.util import set_term, eval_util, terms_util
+from hypersolver.util import halt_util
+from hypersolver.util import moments_util, diags_util, record_util, result_util
 
 
 def test_set_xnp():
@@ -18,6 +23,22 @@ def test_set_xnp():
         assert set_xnp().__package__ == "numpy"
 
 
+def test_compile_util():
+    """ test: utility to get func for a backend """
+
+    func = compile_util(term_util, "numpy")
+    assert func is compile_util(term_util, "numpy")
+    assert func is not term_util
+    assert func(3, np.ones(4)).sum() == 12
+
+    assert compile_util(np.ones, "numpy") is np.ones
+    assert compile_util(3.0, "numba") == 3.0
+
+    if os.environ.get("HS_BACKEND", "numpy") == "numba":
+        assert compile_util(term_util, "numba", parallel=True).py_func.__qualname__ != (
+            compile_util(term_util, "numba").py_func.__qualname__)
+
+
 def test_term_util():
     """ test: regularize term"""
 
@@ -54,3 +75,161 @@ def test_time_step_util():
         np.array([1, 2, 3]),
         np.array([0.88])
     ) == pytest.approx(np.asarray([0.88 * (2 - 1) / 3]), abs=1e-6)
+
+
+def test_set_grid():
+    """ test: precompute the spacings of grid x """
+
+    grid = set_grid(np.linspace(1, 10, 10))
+    assert grid.uniform
+    assert grid.step == pytest.approx(1.0)
+    assert grid.inv_span == pytest.approx(0.5)
+    assert grid.edges == pytest.approx((1.0, 1.0))
+
+    grid = set_grid(np.geomspace(1, 10, 10))
+    assert not grid.uniform
+    assert grid.inv_span.shape == (8,)
+    assert grid.inv_wide.shape == (6,)
+    assert grid.step == pytest.approx(grid.vars_[1] - grid.vars_[0])
+    assert grid.faces.shape == (11,) and grid.widths.shape == (10,)
+    assert grid.widths.sum() == pytest.approx(grid.faces[-1] - grid.faces[0])
+    assert (grid.faces[:-1] < grid.vars_).all() and (grid.vars_ < grid.faces[1:]).all()
+
+    assert grid_util(grid) is grid
+    assert grid_util(grid.vars_).inv_span == pytest.approx(grid.inv_span)
+
+    for half, power, inv in (
+            (1, 1, grid.inv_span), (1, 2, grid.inv_span2),
+            (2, 1, grid.inv_wide), (2, 2, grid.inv_wide2)):
+        assert spans_util(grid.vars_, half, power)[0] == pytest.approx(inv)
+        assert spans_util(grid.vars_, half, power)[1] == pytest.approx(grid.edges)
+    assert points_util(grid.vars_) == pytest.approx(grid.vars_)
+    assert widths_util(grid.vars_) == pytest.approx(grid.widths)
+
+    assert time_step_util(
+        grid, np.ones(10)) == pytest.approx(time_step_util(
+            grid.vars_, np.ones(10)))
+
+
+def test_steps_util():
+    """ test: utility to lay out the time steps and mark the saved ones """
+
+    time = np.linspace(0, 1, 11)
+
+    tidx, marks = steps_util(time, 0.001)
+    assert tidx.size == marks.size
+    assert marks.sum() == 1 + (tidx.size - 1) // 10
+
+    tidx, marks = steps_util(time, 0.001, 100, 500)
+    assert marks.sum() == 3
+
+    tidx, marks = steps_util(time, 0.03, 100, 0, True)
+    assert tidx[marks] == pytest.approx(time)
+    assert (tidx[1:] - tidx[:-1]).max() <= 0.03
+    assert (tidx[1:] > tidx[:-1]).all()
+
+
+def test_snaps_util():
+    """ test: utility to preallocate the saved snapshots """
+
+    tidx, marks = steps_util(np.linspace(0, 1, 11), 0.001)
+
+    tims, sols = snaps_util(tidx, marks, np.ones(5))
+    assert tims.shape == (marks.sum(),)
+    assert sols.shape == (marks.sum(), 5)
+    assert tims[0] == 0.0 and sols[0].sum() == 5.0
+
+
+def test_set_term():
+    """ test: declare what term f or g depends on """
+
+    with pytest.raises(ValueError):
+        set_term(np.sin, "stiff")
+
+    xvar = np.linspace(1, 10, 10)
+    yvar = np.ones((2, 10))
+
+    assert eval_util(np.add, yvar, xvar) == pytest.approx(yvar + xvar)
+    assert eval_util(0.5 * xvar, yvar, xvar) == pytest.approx(0.5 * xvar)
+    assert eval_util((xvar, 1.0), yvar, xvar) == pytest.approx(yvar * xvar + 1)
+
+
+def test_terms_util():
+    """ test: utility to evaluate the declared terms among args """
+
+    calls = []
+
+    def sink(yvar, xvar):
+        """ sink """
+        calls.append(1)
+        return -2.0 * xvar * yvar + 1.0
+
+    xvar = np.linspace(1, 10, 10)
+    terms = (set_term(np.add), set_term(sink, "linear"), set_term(sink, "space"), 0.9)
+
+    first = terms_util(terms, xvar)
+    assert first[0] is np.add and first[3] == 0.9
+    assert first[1][0] == pytest.approx(-2.0 * xvar) and first[1][1] == pytest.approx(1.0)
+    assert first[2] == pytest.approx(np.ones(10))
+    assert len(calls) == 3
+
+    second = terms_util(terms, set_grid(xvar.copy()))
+    assert second[2] is first[2] and len(calls) == 3
+
+    terms_util(terms, xvar + 1.0)
+    assert len(calls) == 6
+
+    assert terms_util((set_term(sink, "constant"),), xvar)[0] == pytest.approx([1.0])
+    assert terms_util((set_term(sink),), None)[0] is sink
+    for kind in ("constant", "space", "linear"):
+        with pytest.raises(ValueError):
+            terms_util((set_term(sink, kind),), None)
+
+
+def test_halt_util():
+    """ test: utility to decide whether a loop stops early """
+
+    nvar = np.ones(10)
+
+    assert not halt_util(1.001 * nvar, nvar, 0, 1.0, 0.1, 1e-3, 10, None, 0.0)[0]
+    assert not halt_util(1.0001 * nvar, nvar, 0, 1.0, 0.1, 1e-2, 10, None, 0.0)[0]
+    assert halt_util(1.0001 * nvar, nvar, 9, 1.0, 0.1, 1e-2, 10, None, 0.0)[0]
+
+    def event(tval, nval):
+        """ event """
+        return tval - nval.max()
+
+    assert halt_util(nvar, nvar, 0, 2.0, 0.1, 0.0, 10, event, -0.5) == (True, 1.0)
+    assert not halt_util(nvar, nvar, 0, 0.5, 0.1, 0.0, 10, event, np.nan)[0]
+
+
+def test_moments_util():
+    """ test: utility to reduce n to its health diagnostics """
+
+    xvar = np.linspace(0, 10, 1001)
+    yvar = np.stack((np.exp(-(xvar - 5)**2), -np.exp(-(xvar - 4)**2)))
+
+    moms = moments_util(np.empty((2, 5)), yvar, xvar)
+    assert moms[:, 0] == pytest.approx([np.sqrt(np.pi), -np.sqrt(np.pi)])
+    assert moms[:, 1] / moms[:, 0] == pytest.approx([5.0, 4.0])
+    assert moms[:, 2] == pytest.approx([yvar[0].min(), -1.0])
+    assert moms[:, 3] == pytest.approx([1.0, yvar[1].max()])
+    assert moms[:, 4] == pytest.approx([0, 1001])
+
+
+def test_record_util():
+    """ test: utility to add the diagnostics of a step """
+
+    xvar = np.linspace(0, 1, 11)
+
+    diag = diags_util(None, 4, 0.0, xvar, xvar)
+    assert record_util(None, diag, 1, 0.1, xvar, xvar)[1].shape == (0, 5)
+    assert len(result_util(0.0, xvar, None, diag, 1)) == 2
+
+    diag = diags_util(True, 2, 0.0, xvar, xvar)
+    for itrs in range(1, 5):
+        diag = record_util(True, diag, itrs, 0.1 * itrs, xvar + itrs, xvar)
+
+    tims, moms = result_util(0.0, xvar, True, diag, 5)[2:]
+    assert tims == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+    assert moms[:, 3] == pytest.approx([1.0, 2.0, 3.0, 4.0, 5.0])
@@ -1,8 +1,12 @@
 """ utilities for hypersolver """
 
 import os
+import types
 import warnings
 import functools
+import importlib
+from time import perf_counter
+from collections import OrderedDict, namedtuple
 
 import numpy as np
 # pytype: disable=import-error
@@ -23,25 +27,29 @@ def set_xnp(backend=os.environ.get("HS_BACKEND", "numpy")):
 xnp = set_xnp()
 
 
-def set_jxt(backend=os.environ.get("HS_BACKEND", "numpy")):
-    """ fake numba as a global namespace """
+def set_jxt(backend=None):
+    """ lazy numba as a global namespace
 
-    if backend == "numba":
-        warnings.warn(
-            "experimental numba support")
-        from numba import jit  # pylint: disable=import-outside-toplevel
-        return jit
+        functions decorated with jxt(...) stay plain python at
+        import and are only compiled when called on a backend,
+        `backend` or else HS_BACKEND at call time (compile_util)
+    """
 
-    def wrap(nopython=True, parallel=True, **kwargs):
-        """ fake jit """
-        _, _, _ = nopython, parallel, kwargs
+    def wrap(nopython=True, parallel=False, **kwargs):
+        """ lazy jit """
 
         def wrapper(func):
 
             @functools.wraps(func)
             def inner(*args, **kwargs):
-                returning = func(*args, **kwargs)
-                return returning
+                _backend = backend or os.environ.get("HS_BACKEND", "numpy")
+                return compile_util(inner, _backend)(*(
+                    compile_util(arg, _backend) for arg in args), **{
+                    key: compile_util(arg, _backend) for key, arg in kwargs.items()})
+
+            inner.py_func = func
+            inner.jit_options = {
+                "nopython": nopython, "parallel": parallel, **kwargs}
 
             return inner
 
@@ -53,6 +61,150 @@ def set_jxt(backend=os.environ.get("HS_BACKEND", "numpy")):
 jxt = set_jxt()
 
 
+def set_oxt():
+    """ lazy numba overload as a global namespace
+
+        the overload is registered with numba when a function
+        calling `func` is first compiled for numba
+    """
+
+    def wrap(func):
+        """ lazy overload """
+
+        def wrapper(impl):
+            func.overload_impl = impl
+            return impl
+
+        return wrapper
+
+    return wrap
+
+
+oxt = set_oxt()
+
+
+def set_pxt():
+    """ parallel counterparts as a global namespace
+
+        `impl` replaces `func` in solvers compiled for numba
+        with parallel=True (compile_util)
+    """
+
+    def wrap(func):
+        """ parallel counterpart """
+
+        def wrapper(impl):
+            func.parallel_impl = impl
+            return impl
+
+        return wrapper
+
+    return wrap
+
+
+pxt = set_pxt()
+
+
+def prange(*args):
+    """ range, split across threads once compiled for numba """
+
+    return range(*args)
+
+
+__compiled__ = {}
+
+
+def names_util(code):
+    """ utility to list the global names a code object uses """
+
+    names = set(code.co_names)
+
+    for const in code.co_consts:
+        if hasattr(const, "co_names"):
+            names |= names_util(const)
+
+    return names
+
+
+def globals_util(base, backend="numpy", parallel=False):
+    """ utility to swap the jxt globals of base for their backend versions
+
+        overloads of the globals are registered once for numba,
+        and prange becomes numba.prange
+    """
+
+    glbs = dict(base.__globals__)
+
+    for name in names_util(base.__code__) & set(glbs):
+        if hasattr(glbs[name], "jit_options"):
+            glbs[name] = compile_util(glbs[name], backend, parallel=parallel)
+        elif backend == "numba" and glbs[name] is prange:
+            from numba import prange as nbprange  # pylint: disable=import-outside-toplevel
+            glbs[name] = nbprange
+        elif backend == "numba" and hasattr(glbs[name], "overload_impl") \
+                and glbs[name] not in __compiled__:
+            from numba.extending import overload  # pylint: disable=import-outside-toplevel
+            __compiled__[glbs[name]] = overload(glbs[name])(
+                glbs[name].overload_impl)
+
+    return glbs
+
+
+def compile_util(func, backend="numpy", fresh=False, parallel=False):
+    """ utility to get func for a backend
+
+        jxt functions are rebuilt with the jxt functions they
+        call swapped for their `backend` versions, and compiled
+        if `backend` is "numba"; other python functions are only
+        compiled for numba; anything else is returned as is;
+        results are cached unless `fresh`
+
+        with `parallel` and numba, pxt counterparts are swapped in,
+        and the rebuilt functions are named apart from the serial
+        ones so that they do not share a disk-cache entry
+    """
+
+    parallel = parallel and backend == "numba"
+
+    if parallel and hasattr(func, "parallel_impl"):
+        return compile_util(func.parallel_impl, backend, fresh, parallel)
+
+    options = getattr(func, "jit_options", None)
+
+    if options is None and (
+            backend != "numba" or not isinstance(func, types.FunctionType)):
+        return func
+
+    if not fresh and (func, backend, parallel) in __compiled__:
+        return __compiled__[(func, backend, parallel)]
+
+    compiled = func
+
+    if options is not None:
+        base = func.py_func
+        compiled = types.FunctionType(
+            base.__code__, globals_util(base, backend, parallel), base.__name__,
+            base.__defaults__, base.__closure__)
+        compiled.__kwdefaults__ = base.__kwdefaults__
+        # numba keys its disk cache on the qualified name, not the globals
+        compiled.__qualname__ = base.__qualname__ + ("_parallel" if parallel else "")
+        compiled.__module__ = base.__module__
+        compiled.__doc__ = base.__doc__
+
+    if backend == "numba":
+        warnings.warn(
+            "experimental numba support")
+        from numba import jit  # pylint: disable=import-outside-toplevel
+        compiled = jit(**(
+            {"nopython": True} if options is None else {"cache": True, **options}
+        ))(compiled)
+
+    if not fresh:
+        __compiled__[(func, backend, parallel)] = compiled
+
+    return compiled
+
+
 @jxt(nopython=True)
 def term_util(term, orig):
     """ regularize term
@@ -71,11 +223,765 @@ def func_util(func, _vals, _vars, **kwargs):
     return func(_vals, _vars, **kwargs) if callable(func) else func
 
 
+Grid = namedtuple("Grid", (
+    "vars_", "uniform", "step", "edges",
+    "inv_span", "inv_span2", "inv_wide", "inv_wide2",
+    "faces", "widths",
+))
+Grid.__doc__ = """ grid x with its spacings precomputed
+
+    vars_:      x
+    uniform:    whether x is evenly spaced
+    step:       min Δx
+    edges:      (1/(x[1] - x[0]), 1/(x[-1] - x[-2]))
+    inv_span:   1/(x[i+1] - x[i-1]) for i in 1..N-2
+    inv_span2:  1/((x[i+1] - x[i-1])/2)^2 for i in 1..N-2
+    inv_wide:   1/(x[i+2] - x[i-2]) for i in 2..N-3
+    inv_wide2:  1/((x[i+2] - x[i-2])/4)^2 for i in 2..N-3
+    faces:      the N+1 cell edges around x, halfway between
+                neighbours and mirrored at both ends
+    widths:     faces[i+1] - faces[i], the N cell widths
+
+    the inv_* terms are scalars on uniform grids
+"""
+
+
+@jxt(nopython=True)
+def grid_arrays_util(vars_):
+    """ utility to precompute the spacings of any grid as arrays """
+
+    vars_ = xnp.asarray(vars_, dtype=xnp.float64)
+
+    span = vars_[2:] - vars_[:-2]
+    wide = vars_[4:] - vars_[:-4]
+    diff = vars_[1:] - vars_[:-1]
+
+    faces = xnp.empty(vars_.size + 1)
+    faces[1:-1] = 0.5 * (vars_[1:] + vars_[:-1])
+    faces[0] = vars_[0] - 0.5 * diff[0]
+    faces[-1] = vars_[-1] + 0.5 * diff[-1]
+
+    return Grid(
+        vars_,
+        xnp.abs(diff - diff[0]).max() <= 1e-10 * xnp.abs(diff[0]),
+        diff.min(),
+        (1.0 / diff[0], 1.0 / diff[-1]),
+        1.0 / span,
+        4.0 / span**2,
+        1.0 / wide,
+        16.0 / wide**2,
+        faces,
+        faces[1:] - faces[:-1],
+    )
+
+
+def set_grid(vars_, backend="numpy"):
+    """ precompute the spacings of grid x
+
+        uniform grids hold scalar inverse spacings so that the
+        derivative kernels multiply by a scalar 1/Δx instead of
+        reading a whole array of inverse spacings
+    """
+
+    grid = compile_util(grid_arrays_util, backend)(vars_)
+
+    if not grid.uniform:
+        return grid
+
+    diff = (grid.vars_[-1] - grid.vars_[0]) / (grid.vars_.size - 1)
+
+    return grid._replace(
+        edges=(1.0 / diff, 1.0 / diff),
+        inv_span=0.5 / diff,
+        inv_span2=1.0 / diff**2,
+        inv_wide=0.25 / diff,
+        inv_wide2=1.0 / diff**2,
+    )
+
+
+def grid_util(vars_):
+    """ utility to accept either a grid or raw x """
+
+    return vars_ if isinstance(vars_, Grid) else set_grid(vars_)
+
+
+@oxt(grid_util)
+def grid_util_overload(vars_):
+    """ numba: dispatch grid_util on the type of vars_ """
+
+    from numba import types as nbtypes  # pylint: disable=import-outside-toplevel
+
+    if isinstance(vars_, nbtypes.BaseNamedTuple):
+        return lambda vars_: vars_
+
+    arrays_util = compile_util(grid_arrays_util, "numba")
+
+    def impl(vars_):
+        return arrays_util(vars_)
+
+    return impl
+
+
+@jxt(nopython=True)
+def spans_arrays_util(vars_, half=1, power=1):
+    """ utility to compute only the inverse spacings of raw x """
+
+    vars_ = xnp.asarray(vars_, dtype=xnp.float64)
+    span = vars_[2 * half:] - vars_[:-2 * half]
+    edges = (1.0 / (vars_[1] - vars_[0]), 1.0 / (vars_[-1] - vars_[-2]))
+
+    if power == 1:
+        return 1.0 / span, edges
+
+    return (2.0 * half / span)**2, edges
+
+
+def spans_util(vars_, half=1, power=1):
+    """ utility to get the inverse spacings of a grid or raw x
+
+        returns inv_span (half=1) or inv_wide (half=2), or their
+        inv_span2 or inv_wide2 (power=2), and the edges of Grid x;
+        from raw x, only these are computed instead of a Grid
+    """
+
+    if not isinstance(vars_, Grid):
+        return spans_arrays_util(vars_, half, power)
+
+    if half == 1:
+        return (vars_.inv_span if power == 1 else vars_.inv_span2), vars_.edges
+
+    return (vars_.inv_wide if power == 1 else vars_.inv_wide2), vars_.edges
+
+
+@oxt(spans_util)
+def spans_util_overload(vars_, half=1, power=1):
+    """ numba: dispatch spans_util on the type of vars_ """
+    # pylint: disable=unused-argument
+
+    from numba import types as nbtypes  # pylint: disable=import-outside-toplevel
+
+    if not isinstance(vars_, nbtypes.BaseNamedTuple):
+        arrays_util = compile_util(spans_arrays_util, "numba")
+        return lambda vars_, half=1, power=1: arrays_util(vars_, half, power)
+
+    def impl(vars_, half=1, power=1):
+        if half == 1:
+            inv = vars_.inv_span if power == 1 else vars_.inv_span2
+        else:
+            inv = vars_.inv_wide if power == 1 else vars_.inv_wide2
+        return inv, vars_.edges
+
+    return impl
+
+
+def points_util(vars_):
+    """ utility to get the points x of a grid or raw x """
+
+    return vars_.vars_ if isinstance(vars_, Grid) else np.asarray(
+        vars_, dtype=np.float64)
+
+
+@oxt(points_util)
+def points_util_overload(vars_):
+    """ numba: dispatch points_util on the type of vars_ """
+
+    from numba import types as nbtypes  # pylint: disable=import-outside-toplevel
+
+    if isinstance(vars_, nbtypes.BaseNamedTuple):
+        return lambda vars_: vars_.vars_
+
+    return lambda vars_: np.asarray(vars_, dtype=np.float64)
+
+
+@jxt(nopython=True)
+def widths_arrays_util(vars_):
+    """ utility to compute only the cell widths of raw x """
+
+    vars_ = xnp.asarray(vars_, dtype=xnp.float64)
+
+    widths = xnp.empty(vars_.size)
+    widths[1:-1] = 0.5 * (vars_[2:] - vars_[:-2])
+    widths[0] = vars_[1] - vars_[0]
+    widths[-1] = vars_[-1] - vars_[-2]
+
+    return widths
+
+
+def widths_util(vars_):
+    """ utility to get the cell widths of a grid or raw x """
+
+    return vars_.widths if isinstance(vars_, Grid) else widths_arrays_util(vars_)
+
+
+@oxt(widths_util)
+def widths_util_overload(vars_):
+    """ numba: dispatch widths_util on the type of vars_ """
+
+    from numba import types as nbtypes  # pylint: disable=import-outside-toplevel
+
+    if isinstance(vars_, nbtypes.BaseNamedTuple):
+        return lambda vars_: vars_.widths
+
+    arrays_util = compile_util(widths_arrays_util, "numba")
+
+    return lambda vars_: arrays_util(vars_)  # pylint: disable=unnecessary-lambda
+
+
 @jxt(nopython=True)
 def time_step_util(vars_vals, flux_term, stability=0.98):
     """ utility to calculate the default time_step
     """
 
-    return (xnp.asarray(stability) * xnp.asarray(
-        vars_vals[1:] - vars_vals[:-1]
-    ).min() / xnp.asarray(flux_term).max()).item()
+    return (xnp.asarray(stability) * grid_util(vars_vals).step / xnp.abs(
+        xnp.asarray(flux_term)).max()).item()
+
+
+@jxt(nopython=True)
+def steps_util(time, time_, snaps=100, stride=0, dense=False):
+    """ utility to lay out the time steps and mark the saved ones
+
+        returns the step times and a mask of the steps to save;
+        with `dense`, each interval of `time` is split into equal
+        steps no larger than `time_` so that the saved steps land
+        exactly on `time`; otherwise, the steps are `time_` apart
+        and saved every `stride` steps (if positive) or about
+        `snaps` times over the run
+    """
+
+    if dense:
+        subs = xnp.maximum(
+            1, xnp.ceil((time[1:] - time[:-1]) / time_)).astype(xnp.int64)
+
+        tidx = xnp.empty(subs.sum() + 1)
+        marks = xnp.zeros(tidx.size, dtype=xnp.bool_)
+
+        tidx[0], marks[0] = time[0], True
+
+        last = 0
+        for jdx in range(subs.size):
+            tidx[last + 1:last + subs[jdx] + 1] = time[jdx] + (
+                time[jdx + 1] - time[jdx]
+            ) * xnp.arange(1, subs[jdx] + 1) / subs[jdx]
+
+            last += subs[jdx]
+            tidx[last], marks[last] = time[jdx + 1], True
+
+        return tidx, marks
+
+    tidx = xnp.arange(time[0], time[-1] + time_, time_)
+    marks = xnp.zeros(tidx.size, dtype=xnp.bool_)
+
+    marks[::stride if stride > 0 else max(1, tidx.size // max(1, snaps))] = True
+
+    return tidx, marks
+
+
+@jxt(nopython=True)
+def snaps_util(tidx, marks, init_):
+    """ utility to preallocate the saved snapshots
+
+        returns the (k,) saved times and the (k, ..., N) solutions
+        with the initial (N,) or batched (..., N) state in place
+    """
+
+    tims = tidx[marks]
+    sols = xnp.empty((tims.size,) + init_.shape)
+
+    sols[0] = init_
+
+    return tims, sols
+
+
+@jxt(nopython=True)
+def spacing_util(inv):
+    """ utility to view scalar or array inverse spacings as an array """
+
+    return xnp.atleast_1d(xnp.asarray(inv, dtype=xnp.float64))
+
+
+@jxt(nopython=True)
+def rows_util(term, init_, work):
+    """ utility to view term as the (rows, N) rows of init_
+
+        terms not already shaped like init_ are broadcast into
+        the (..., N) buffer work first; terms shaped like init_
+        are only copied if they are not C-contiguous
+    """
+
+    term = xnp.asarray(term, dtype=xnp.float64)
+
+    if term.shape == init_.shape:
+        return xnp.ascontiguousarray(term).reshape(-1, init_.shape[-1])
+
+    work[...] = term
+
+    return work.reshape(-1, init_.shape[-1])
+
+
+Stats = namedtuple("Stats", (
+    "steps", "saves", "flux_calls", "sink_calls",
+    "user_time", "kernel_time", "other_time", "total_time",
+))
+Stats.__doc__ = """ counters and timers kept by the loops
+
+    steps:          time steps taken
+    saves:          snapshots saved after the initial one
+    flux_calls:     evaluations of f (func_ for runge_kutta)
+    sink_calls:     evaluations of g
+    user_time:      seconds spent in f and g
+    kernel_time:    seconds spent in the *_next steps
+    other_time:     seconds spent in the rest of the loop
+    total_time:     seconds for the whole solve
+
+    f and g declared with set_term are counted as calls even
+    when only looked up; runge_kutta loops call func_ within
+    their steps, so their user time is counted as kernel time;
+    the first solve of a new solver includes compilation in its
+    other_time
+"""
+
+
+Diagnostics = namedtuple("Diagnostics", (
+    "time", "mass", "moment", "minimum", "maximum", "negative",
+))
+Diagnostics.__doc__ = """ health of n at every step of a loop
+
+    time:       (k,) times of the initial state and of every step
+    mass:       (k, ...) ∫n dx, over the Grid widths
+    moment:     (k, ...) ∫x n dx
+    minimum:    (k, ...) min n
+    maximum:    (k, ...) max n
+    negative:   (k, ...) count of n < 0
+
+    ... is the batch shape of n, if any
+"""
+
+
+def set_diagnostics(tims, moms):
+    """ make Diagnostics from the diagnostics kept by a loop """
+
+    return Diagnostics(
+        tims, moms[..., 0], moms[..., 1], moms[..., 2], moms[..., 3],
+        moms[..., 4].astype(np.int64))
+
+
+def counters_util():
+    """ utility to allocate the stats kept by a loop
+
+        the loops add to steps, saves, flux_calls, sink_calls,
+        user_time, and kernel_time in this order
+    """
+
+    return np.zeros(6)
+
+
+def set_stats(stats, total_time):
+    """ make Stats from the stats kept by a loop """
+
+    return Stats(
+        int(stats[0]), int(stats[1]), int(stats[2]), int(stats[3]),
+        float(stats[4]), float(stats[5]),
+        float(total_time - stats[4] - stats[5]), float(total_time),
+    )
+
+
+def timer_util():
+    """ utility to read a monotonic clock in seconds """
+
+    return perf_counter()
+
+
+@oxt(timer_util)
+def timer_util_overload():
+    """ numba: read the clock in object mode """
+
+    from numba import objmode  # pylint: disable=import-outside-toplevel
+
+    def impl():
+        with objmode(now="float64"):
+            now = perf_counter()
+        return now
+
+    return impl
+
+
+@jxt(nopython=True)
+def count_util(stats, steps=0, saves=0, fluxes=0, sinks=0):
+    """ utility to add to the counters of stats, if kept """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if stats is None:
+        return
+
+    stats[0] += steps
+    stats[1] += saves
+    stats[2] += fluxes
+    stats[3] += sinks
+
+
+@jxt(nopython=True)
+def clock_util(stats, since=-1.0, kernel=False):
+    """ utility to time the loops, if stats are kept
+
+        returns the current time (0.0 without stats) and, given
+        the time `since`, adds the elapsed time to the kernel or
+        user time of stats; the clock is not read without stats
+    """
+
+    if stats is None:
+        return 0.0
+
+    now = timer_util()
+
+    if since >= 0.0:
+        stats[5 if kernel else 4] += now - since
+
+    return now
+
+
+@jxt(nopython=True)
+def halt_util(next_, init_, itrs, tval, time_, halt, check, event, event_):
+    """ utility to decide whether a loop stops early after step itrs
+
+        stops once the relative rate of change of n,
+        max|n(j+1) - n(j)| / (Δt max|n(j+1)|), is at most `halt`
+        (checked every `check` steps if `halt` is positive), or
+        once event(t, n), if given, changes sign from its last
+        value `event_`; returns whether to stop and the new value
+        of event
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    value = event_
+    stop = False
+
+    if event is not None:
+        value = event(tval, next_)
+        stop = value * event_ < 0.0 or (value == 0.0 and abs(event_) > 0.0)
+
+    if halt > 0.0 and (itrs + 1) % check == 0:
+        stop = stop or xnp.abs(next_ - init_).max() <= (
+            halt * time_ * xnp.abs(next_).max())
+
+    return stop, value
+
+
+@jxt(nopython=True)
+def moments_util(out, init_, vars_):
+    """ utility to reduce n to its health diagnostics
+
+        writes ∫n dx and ∫x n dx (over the Grid widths), min n,
+        max n and the count of n < 0 of each row of init_ into
+        the (..., 5) out
+    """
+
+    grid = grid_util(vars_)
+
+    size = init_.shape[-1]
+    rows = xnp.ascontiguousarray(init_).reshape(-1, size)
+    outs = out.reshape(-1, 5)
+
+    for row in range(rows.shape[0]):
+        weight = rows[row] * grid.widths
+        outs[row, 0] = weight.sum()
+        outs[row, 1] = (weight * grid.vars_).sum()
+        outs[row, 2] = rows[row].min()
+        outs[row, 3] = rows[row].max()
+        outs[row, 4] = (rows[row] < 0.0).sum()
+
+    return out
+
+
+@jxt(nopython=True)
+def diags_util(diags, size, tval, init_, vars_):
+    """ utility to allocate the diagnostics of a loop, if kept
+
+        returns the times of the steps and the (k, ..., 5)
+        moments_util of n at each, with room for `size` steps
+        and the initial tval and init_ in place; both are empty
+        without diags
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if diags is None:
+        return xnp.empty(0), xnp.empty((0,) + init_.shape[:-1] + (5,))
+
+    tims = xnp.empty(size)
+    moms = xnp.empty((size,) + init_.shape[:-1] + (5,))
+
+    tims[0] = tval
+    moments_util(moms[0], init_, vars_)
+
+    return tims, moms
+
+
+@jxt(nopython=True)
+def record_util(diags, diag, itrs, tval, next_, vars_):
+    """ utility to add the diagnostics of step itrs, if kept
+
+        the buffers of diags_util double when full, for loops
+        that do not know their number of steps up front
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if diags is None:
+        return diag
+
+    tims, moms = diag
+
+    if itrs >= tims.size:
+        grown = xnp.empty((2 * tims.size,) + moms.shape[1:])
+        grown[:tims.size] = moms
+        moms = grown
+        grown = xnp.empty(2 * tims.size)
+        grown[:tims.size] = tims
+        tims = grown
+
+    tims[itrs] = tval
+    moments_util(moms[itrs], next_, vars_)
+
+    return tims, moms
+
+
+def result_util(tims, sols, diags, diag, count):
+    """ utility to return the snapshots of a loop
+
+        with diags, the first `count` diagnostics follow as
+        their times and moments (see diags_util)
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+    if diags is None:
+        return tims, sols
+
+    return tims, sols, diag[0][:count], diag[1][:count]
+
+
+@oxt(result_util)
+def result_util_overload(tims, sols, diags, diag, count):
+    """ numba: dispatch result_util on the type of diags """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=unused-argument
+
+    from numba import types as nbtypes  # pylint: disable=import-outside-toplevel
+
+    if isinstance(diags, (nbtypes.NoneType, nbtypes.Omitted)):
+        return lambda tims, sols, diags, diag, count: (tims, sols)
+
+    return lambda tims, sols, diags, diag, count: (
+        tims, sols, diag[0][:count], diag[1][:count])
+
+
+def key_util(arg):
+    """ utility to key an argument by identity or by type
+
+        callables are keyed by identity, arrays by dtype and
+        number of dimensions, grids by whether they are uniform,
+        tuples by their items, and anything else by its type
+    """
+
+    if callable(arg):
+        return arg
+
+    if isinstance(arg, Grid):
+        return Grid, bool(arg.uniform)
+
+    if isinstance(arg, tuple):
+        return tuple(map(key_util, arg))
+
+    if hasattr(arg, "dtype") and hasattr(arg, "ndim"):
+        return arg.dtype.str, arg.ndim
+
+    return type(arg)
+
+
+def cache_util(cache, key, build, size=32):
+    """ utility to get or build an entry of a bounded LRU cache
+
+        `cache` is an OrderedDict, `build()` makes the entry on
+        a miss, and the least recently used entries beyond `size`
+        are evicted
+    """
+
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    cache[key] = build()
+
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+    return cache[key]
+
+
+Term = namedtuple("Term", ("func", "kind"))
+Term.__doc__ = """ term f or g declared with what it depends on
+
+    func:   f(n, x) or g(n, x), as passed to the loops
+    kind:   "state" (default) if it depends on n, called every step;
+            "constant" if it depends on neither n nor x;
+            "space" if it depends on x only;
+            "linear" if it is k(x) n + s(x), affine in n
+
+    the solvers evaluate all but "state" terms once and look
+    them up across runs (see terms_util)
+"""
+
+
+def set_term(func, kind="state"):
+    """ declare what term f or g depends on (see Term) """
+
+    if kind not in ("state", "constant", "space", "linear"):
+        raise ValueError("kind not supported")
+
+    return Term(func, kind)
+
+
+def eval_util(term, init_, vars_):
+    """ utility to evaluate term f or g at n and x
+
+        term is a function of (n, x), a value taken as is, or
+        the (k, s) of k n + s (see terms_util)
+    """
+
+    if callable(term):
+        return term(init_, vars_)
+
+    if isinstance(term, tuple):
+        return term[0] * init_ + term[1]
+
+    return term
+
+
+@oxt(eval_util)
+def eval_util_overload(term, init_, vars_):
+    """ numba: dispatch eval_util on the type of term """
+    # pylint: disable=unused-argument
+
+    from numba import types as nbtypes  # pylint: disable=import-outside-toplevel
+
+    if isinstance(term, nbtypes.Callable):
+        return lambda term, init_, vars_: term(init_, vars_)
+
+    if isinstance(term, nbtypes.BaseTuple):
+        return lambda term, init_, vars_: term[0] * init_ + term[1]
+
+    return lambda term, init_, vars_: term
+
+
+def linear_util(term, init_):
+    """ utility to get the (k, s) of term g declared linear in n
+
+        raises a ValueError unless g was declared with
+        set_term(g, "linear") (see terms_util)
+    """
+
+    _ = init_
+
+    if not isinstance(term, tuple):
+        raise ValueError("g must be declared with set_term(g, \"linear\")")
+
+    return term
+
+
+@oxt(linear_util)
+def linear_util_overload(term, init_):
+    """ numba: dispatch linear_util on the type of term """
+    # pylint: disable=unused-argument
+
+    from numba import types as nbtypes  # pylint: disable=import-outside-toplevel
+
+    if isinstance(term, nbtypes.BaseTuple):
+        return lambda term, init_: term
+
+    def impl(term, init_):
+        # raised at run time, typed like (k, s) for the caller
+        if init_.size >= 0:
+            raise ValueError("g must be declared with set_term(g, \"linear\")")
+        return init_, init_
+
+    return impl
+
+
+def hash_util(vars_):
+    """ utility to key grid x by its values """
+
+    import hashlib  # pylint: disable=import-outside-toplevel
+
+    vars_ = np.ascontiguousarray(
+        vars_.vars_ if isinstance(vars_, Grid) else vars_, dtype=np.float64)
+
+    return vars_.size, hashlib.sha1(vars_.tobytes()).hexdigest()
+
+
+__term_cache__ = OrderedDict()
+
+
+def terms_util(args, vars_, size=32, backend="numpy"):
+    """ utility to evaluate the declared terms among args
+
+        "constant" terms become their (1,) value, "space" terms
+        their (N,) value on x, and "linear" terms their (k, s)
+        from evaluations at n = 0 and n = 1; values are kept in
+        an LRU cache of `size` entries keyed on the function, its
+        kind and x, and "state" terms become their function;
+        without a fixed grid x (vars_ None) only "state" terms are
+        accepted, since the loops of moving or 2-D grids call f and
+        g themselves; the functions are called as compiled for
+        `backend`
+    """
+
+    def at(func, xvar, level):
+        """ evaluate func at n = level on x """
+
+        return np.ascontiguousarray(np.broadcast_to(np.asarray(
+            compile_util(func, backend)(np.full(xvar.size, level), xvar),
+            dtype=np.float64), xvar.shape))
+
+    def build(term, xvar):
+        """ evaluate a declared term once """
+
+        if term.kind == "constant":
+            return np.atleast_1d(np.asarray(
+                compile_util(term.func, backend)(np.zeros(1), np.zeros(1)),
+                dtype=np.float64))
+
+        offset = at(term.func, xvar, 0.0)
+
+        if term.kind == "space":
+            return offset
+
+        return at(term.func, xvar, 1.0) - offset, offset
+
+    def value(term):
+        """ look up a declared term, or pass anything else """
+
+        if not isinstance(term, Term):
+            return term
+
+        if term.kind == "state":
+            return term.func
+
+        if vars_ is None:
+            raise ValueError("terms need a fixed grid x")
+
+        if term.kind == "constant":
+            return cache_util(
+                __term_cache__, term, lambda: build(term, None), size)
+
+        xvar = np.asarray(
+            vars_.vars_ if isinstance(vars_, Grid) else vars_, dtype=np.float64)
+
+        return cache_util(
+            __term_cache__, term + hash_util(xvar), lambda: build(term, xvar), size)
+
+    return tuple(map(value, args))
+
+
+def load_util(path):
+    """ utility to import "module.name" on first use """
+
+    module, name = path.rsplit(".", 1)
+
+    return getattr(importlib.import_module(module), name)